@@ -0,0 +1,101 @@
+"""Archivage des mois passés (tables *_archive)
+
+Les tables availabilities et assignments ne gardent que les mois récents :
+``flask --app factory:create_cli_app archive`` déplace les lignes plus
+anciennes que ARCHIVE_HORIZON_DAYS vers availabilities_archive et
+assignments_archive (mêmes colonnes, mêmes ids). Le déplacement se fait
+par lots (INSERT ... SELECT puis DELETE, un commit par lot).
+
+La coupure tombe toujours sur un début de mois : un mois est soit
+entièrement actif, soit entièrement archivé, et le mois en cours n'est
+jamais archivé. dj_month_stats n'est pas touchée (les compteurs couvrent
+tout l'historique).
+
+Les vues de reporting (sets passés d'un DJ, exports, flux ICS) lisent
+actif + archive via les fonctions de lecture ci-dessous.
+"""
+import heapq
+from datetime import date, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from models import db, Availability, Assignment, AvailabilityArchive, AssignmentArchive
+
+ARCHIVED_MODELS = [
+    (Availability, AvailabilityArchive),
+    (Assignment, AssignmentArchive),
+]
+
+
+def archive_cutoff(horizon_days, today=None):
+    """Premier jour du mois contenant today - horizon (exclu de l'archive)"""
+    today = today or date.today()
+    return (today - timedelta(days=horizon_days)).replace(day=1)
+
+
+def _archive_table(model, archive_model, cutoff, chunk_size, log):
+    columns = [column.name for column in model.__table__.columns]
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            select(model.id).where(model.date < cutoff).order_by(model.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(archive_model.__table__.insert().from_select(
+            columns,
+            select(*[model.__table__.c[name] for name in columns]).where(model.id.in_(ids))
+        ))
+        db.session.execute(model.__table__.delete().where(model.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+        log(f"   ⏳ {model.__tablename__} : {moved} lignes archivées")
+    return moved
+
+
+def archive_before(cutoff, chunk_size=1000, log=print):
+    """Déplacer les lignes antérieures à cutoff vers les tables d'archive"""
+    moved = {}
+    for model, archive_model in ARCHIVED_MODELS:
+        moved[model.__tablename__] = _archive_table(model, archive_model, cutoff, chunk_size, log)
+    return moved
+
+
+def delete_user_history(user_id):
+    """Suppression d'un DJ : ses lignes archivées partent avec lui (commit par l'appelant)"""
+    for _, archive_model in ARCHIVED_MODELS:
+        archive_model.query.filter_by(user_id=user_id).delete()
+
+
+def assignment_history(user_id=None, start=None, end=None, descending=False, limit=None, with_user=False):
+    """Sets actifs + archivés, triés par date (objets Assignment ou AssignmentArchive)"""
+    results = []
+    for model in (Assignment, AssignmentArchive):
+        query = model.query
+        if with_user:
+            query = query.options(joinedload(model.user))
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        if start is not None:
+            query = query.filter(model.date >= start)
+        if end is not None:
+            query = query.filter(model.date <= end)
+        order = (model.date.desc(), model.id.desc()) if descending else (model.date, model.id)
+        query = query.order_by(*order)
+        if limit is not None:
+            query = query.limit(limit)
+        results.append(query.all())
+
+    merged = heapq.merge(*results, key=lambda a: (a.date, a.id), reverse=descending)
+    return list(merged)[:limit] if limit is not None else list(merged)
+
+
+def iter_assignment_history(user_id, batch_size=500):
+    """Tous les sets d'un DJ par ordre de date, sans tout charger (flux ICS)
+
+    Les lignes archivées sont toutes antérieures aux lignes actives.
+    """
+    for model in (AssignmentArchive, Assignment):
+        query = model.query.filter(model.user_id == user_id).order_by(model.date, model.id)
+        yield from query.yield_per(batch_size)
@@ -0,0 +1,123 @@
+"""Assets statiques empreintés et précompressés
+
+``flask --app factory:create_cli_app build-assets`` copie chaque fichier de
+static/ vers static/dist/ sous un nom contenant le hash de son contenu
+(``css/style.3f2a9c1b.css``), écrit leurs versions gzip et brotli à côté et
+génère static/dist/manifest.json.
+
+Au démarrage, init_assets() charge le manifest : ``url_for('static', ...)``
+renvoie alors l'URL empreintée, servie avec ``Cache-Control: immutable``
+et, si le navigateur l'accepte, directement dans sa version précompressée.
+Sans manifest (développement), les URLs et le service restent ceux de Flask.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # brotli optionnel : gzip seul
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.html'}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _fingerprint(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:8]
+
+
+def build_assets(static_folder, log=print):
+    """Générer static/dist/ et son manifest, renvoie le manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist]
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            stem, ext = os.path.splitext(relative)
+            hashed = f'{stem}.{_fingerprint(source)}{ext}'
+
+            target = os.path.join(dist, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            manifest[relative] = f'{DIST_DIR}/{hashed}'
+
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                with open(source, 'rb') as f:
+                    content = f.read()
+                with open(target + '.gz', 'wb') as f:
+                    f.write(gzip.compress(content, compresslevel=9, mtime=0))
+                sizes = f"gzip {os.path.getsize(target + '.gz')}"
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(content, quality=11))
+                    sizes += f", brotli {os.path.getsize(target + '.br')}"
+                log(f"   📦 {relative} → {hashed} ({len(content)} octets ; {sizes})")
+            else:
+                log(f"   📦 {relative} → {hashed}")
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def init_assets(app):
+    """Brancher le manifest sur url_for('static') et le service des fichiers"""
+    manifest = load_manifest(app.static_folder)
+    if not manifest:
+        return
+    hashed_files = set(manifest.values())
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]
+
+    default_static = app.view_functions['static']
+
+    def static_view(filename):
+        if filename not in hashed_files:
+            return default_static(filename=filename)
+        return send_fingerprinted(app.static_folder, filename)
+
+    app.view_functions['static'] = static_view
+
+
+def send_fingerprinted(static_folder, filename):
+    """Fichier empreinté : précompressé si possible, cache navigateur d'un an"""
+    accepted = request.accept_encodings
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[candidate] and os.path.exists(os.path.join(static_folder, filename + suffix)):
+            encoding = candidate
+            filename += suffix
+            break
+
+    response = send_from_directory(static_folder, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,273 @@
+"""Index en mémoire des disponibilités et des sets, par mois
+
+Le moteur de remplaçants, l'auto-assignation et les alertes interrogent
+cet index au lieu de relancer des requêtes ORM à chaque demande. Un mois
+est chargé par une seule requête (dispos et sets en UNION ALL) à sa
+première consultation, puis tenu à jour par le journal des changements :
+à chaque lecture, les événements postérieurs au curseur (une requête
+indexée sur id) désignent les dates à recharger. Un événement sur un
+utilisateur (activation, suppression...) vide l'index.
+
+Deux représentations d'un même mois :
+
+- par date : ``available[date] = {user_id: créneau}`` et ``assigned[date]`` ;
+- en bitmasks : ``avail_bits[créneau][user_id]`` est un entier dont le bit
+  ``jour - 1`` vaut 1 si le DJ est dispo ce jour-là sur ce créneau, et
+  ``assigned_bits[créneau]`` marque les jours où le créneau est pris.
+
+« Nuits sans personne pour le peak », « DJs libres tous les vendredis »
+ou « dates communes à deux DJs » deviennent des ET / OU sur ces entiers.
+
+L'index est propre au processus : chaque worker a le sien. Il garde au
+plus MAX_CACHED_MONTHS mois : le moins récemment consulté est retiré
+(consulter les archives ne fait pas grossir l'index indéfiniment).
+"""
+import calendar as cal
+import threading
+from datetime import date
+
+from sqlalchemy import literal, select, union_all
+
+from models import db, User, Availability, Assignment, TimeSlot, calculate_tarif
+from changelog import latest_sequence, changes_since
+
+SLOTS = tuple(TimeSlot)
+MAX_CACHED_MONTHS = 24  # Deux saisons ; day_view touche 3 mois consécutifs
+
+# Créneau à pourvoir -> {créneau de dispo qui le couvre: rang d'adéquation}
+# (0 : dispo exacte, 1 : dispo compatible, une soirée complète couvre tout)
+SLOT_FIT = {
+    TimeSlot.COMPLETE: {TimeSlot.COMPLETE: 0},
+    TimeSlot.WARMUP: {TimeSlot.WARMUP: 0, TimeSlot.COMPLETE: 1},
+    TimeSlot.PEAKTIME: {TimeSlot.PEAKTIME: 0, TimeSlot.PEAKTIME_DUO: 1, TimeSlot.COMPLETE: 1},
+    TimeSlot.PEAKTIME_DUO: {TimeSlot.PEAKTIME_DUO: 0, TimeSlot.PEAKTIME: 1, TimeSlot.COMPLETE: 1},
+}
+
+
+def _rows_query(start, end):
+    """Dispos et sets de [start, end] en une requête : (date, user_id, créneau, est_un_set)"""
+    available = select(
+        Availability.date, Availability.user_id, Availability.time_slot, literal(False)
+    ).where(Availability.date >= start, Availability.date <= end, Availability.is_available == True)
+    assigned = select(
+        Assignment.date, Assignment.user_id, Assignment.time_slot, literal(True)
+    ).where(Assignment.date >= start, Assignment.date <= end)
+    return union_all(available, assigned)
+
+
+class MonthIndex:
+    """Dispos et sets d'un mois, par date et en bitmasks"""
+
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        self.days = cal.monthrange(year, month)[1]
+        self.all_days = (1 << self.days) - 1
+        self.available = {}
+        self.assigned = {}
+        self.avail_bits = {slot: {} for slot in SLOTS}
+        self.assigned_bits = {slot: 0 for slot in SLOTS}
+
+    def load(self, users, start=None, end=None):
+        """Charger le mois entier, ou seulement [start, end]"""
+        start = start or date(self.year, self.month, 1)
+        end = end or date(self.year, self.month, self.days)
+
+        # Effacer la période dans les deux représentations
+        clear = 0
+        for day_number in range(start.day, end.day + 1):
+            clear |= 1 << (day_number - 1)
+            self.available.pop(date(self.year, self.month, day_number), None)
+            self.assigned.pop(date(self.year, self.month, day_number), None)
+        keep = ~clear
+        for slot in SLOTS:
+            bits = self.avail_bits[slot]
+            for user_id in list(bits):
+                bits[user_id] &= keep
+            self.assigned_bits[slot] &= keep
+
+        for day, user_id, slot, is_set in db.session.execute(_rows_query(start, end)):
+            bit = 1 << (day.day - 1)
+            if is_set:
+                self.assigned.setdefault(day, {})[user_id] = slot
+                if slot in self.assigned_bits:
+                    self.assigned_bits[slot] |= bit
+            elif user_id in users:
+                self.available.setdefault(day, {})[user_id] = slot
+                if slot in self.avail_bits:
+                    bits = self.avail_bits[slot]
+                    bits[user_id] = bits.get(user_id, 0) | bit
+
+    def month_load(self):
+        """Nombre de sets du mois par DJ"""
+        load = {}
+        for djs in self.assigned.values():
+            for user_id in djs:
+                load[user_id] = load.get(user_id, 0) + 1
+        return load
+
+    def month_spend(self):
+        """Cachets des sets du mois par DJ (calculate_tarif)"""
+        spend = {}
+        for day, djs in self.assigned.items():
+            for user_id, slot in djs.items():
+                spend[user_id] = spend.get(user_id, 0) + calculate_tarif(day, slot)
+        return spend
+
+    # Bitmasks
+
+    def weekday_mask(self, weekday):
+        """Jours du mois tombant un jour de semaine donné (0 = lundi)"""
+        first_weekday = date(self.year, self.month, 1).weekday()
+        mask = 0
+        for day_number in range((weekday - first_weekday) % 7 + 1, self.days + 1, 7):
+            mask |= 1 << (day_number - 1)
+        return mask
+
+    def user_mask(self, user_id, slots=SLOTS):
+        """Jours où un DJ est dispo sur l'un des créneaux donnés"""
+        mask = 0
+        for slot in slots:
+            mask |= self.avail_bits[slot].get(user_id, 0)
+        return mask
+
+    def covered_mask(self, slots=SLOTS):
+        """Jours où au moins un DJ est dispo sur l'un des créneaux donnés"""
+        mask = 0
+        for slot in slots:
+            for bits in self.avail_bits[slot].values():
+                mask |= bits
+        return mask
+
+    def dates(self, mask):
+        return [date(self.year, self.month, n + 1) for n in range(self.days) if mask >> n & 1]
+
+
+class AvailabilityIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._months = {}
+        self.users = {}  # DJs actifs : {user_id: dj_name}
+        self._cursor = None
+
+    def _reset(self):
+        self._months.clear()
+        self.users = dict(db.session.query(User.id, User.dj_name).filter(
+            User.is_admin == False,
+            User.is_active == True
+        ))
+        self._cursor = latest_sequence()
+
+    def refresh(self):
+        """Appliquer les événements du journal survenus depuis la dernière lecture"""
+        with self._lock:
+            if self._cursor is None:
+                self._reset()
+                return
+            while True:
+                events = changes_since(self._cursor)
+                if not events:
+                    return
+                self._cursor = events[-1].id
+                if any(event.entity == 'user' for event in events):
+                    self._reset()
+                    return
+                for day in {event.date for event in events if event.date}:
+                    month_index = self._months.get((day.year, day.month))
+                    if month_index:
+                        month_index.load(self.users, day, day)
+
+    def _month(self, year, month):
+        # Ordre du dict = ordre de consultation : le premier est le moins récent
+        key = (year, month)
+        month_index = self._months.pop(key, None)
+        if month_index is None:
+            month_index = MonthIndex(year, month)
+            month_index.load(self.users)
+            if len(self._months) >= MAX_CACHED_MONTHS:
+                self._months.pop(next(iter(self._months)))
+        self._months[key] = month_index
+        return month_index
+
+    def month(self, year, month):
+        with self._lock:
+            self.refresh()
+            return self._month(year, month)
+
+    def day_view(self, day):
+        """Copie cohérente de ce qu'il faut pour classer des DJs sur une date
+
+        available / assigned : {user_id: créneau} de la date
+        month_load : {user_id: sets du mois}
+        month_spend : {user_id: cachets des sets du mois}
+        set_dates : {user_id: [dates de sets du mois précédent au mois suivant]}
+        """
+        with self._lock:
+            self.refresh()
+            current = self._month(day.year, day.month)
+            set_dates = {}
+            for year, month in (_shift_month(day, -1), (day.year, day.month), _shift_month(day, 1)):
+                for d, djs in self._month(year, month).assigned.items():
+                    for user_id in djs:
+                        set_dates.setdefault(user_id, []).append(d)
+            return {
+                'available': dict(current.available.get(day, {})),
+                'assigned': dict(current.assigned.get(day, {})),
+                'month_load': current.month_load(),
+                'month_spend': current.month_spend(),
+                'set_dates': set_dates,
+                'users': dict(self.users),
+            }
+
+    def month_view(self, year, month):
+        """Copie des dispos et sets du mois : ({date: {user_id: créneau}}, idem pour les sets)"""
+        with self._lock:
+            month_index = self.month(year, month)
+            return (
+                {d: dict(djs) for d, djs in month_index.available.items()},
+                {d: dict(djs) for d, djs in month_index.assigned.items()},
+            )
+
+    # Questions en opérations bit à bit
+
+    def uncovered_nights(self, year, month, slot, start=None):
+        """Dates où aucun DJ n'est dispo pour couvrir le créneau, et où il n'est pas déjà pris"""
+        with self._lock:
+            month_index = self.month(year, month)
+            mask = month_index.all_days & ~month_index.covered_mask(SLOT_FIT[slot])
+            mask &= ~month_index.assigned_bits[slot]
+            if start is not None:
+                mask &= ~_days_before(month_index, start)
+            return month_index.dates(mask)
+
+    def free_on_all(self, year, month, weekday, slots=SLOTS):
+        """DJs dispos tous les <jour de semaine> du mois (ex. 4 : tous les vendredis)"""
+        with self._lock:
+            month_index = self.month(year, month)
+            wanted = month_index.weekday_mask(weekday)
+            return [user_id for user_id in self.users
+                    if month_index.user_mask(user_id, slots) & wanted == wanted]
+
+    def overlap(self, year, month, user_a, user_b, slots=SLOTS):
+        """Dates où deux DJs sont dispos tous les deux"""
+        with self._lock:
+            month_index = self.month(year, month)
+            return month_index.dates(month_index.user_mask(user_a, slots) & month_index.user_mask(user_b, slots))
+
+
+def _shift_month(day, offset):
+    month = day.month - 1 + offset
+    return day.year + month // 12, month % 12 + 1
+
+
+def _days_before(month_index, start):
+    """Masque des jours du mois strictement antérieurs à start"""
+    if (start.year, start.month) < (month_index.year, month_index.month):
+        return 0
+    if (start.year, start.month) > (month_index.year, month_index.month):
+        return month_index.all_days
+    return (1 << (start.day - 1)) - 1
+
+
+index = AvailabilityIndex()
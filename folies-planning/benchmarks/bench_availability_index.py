@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'index des disponibilités (bitmasks) face à l'ORM
+
+Trois questions posées sur un mois :
+- nuits où personne n'est dispo pour le peaktime ;
+- DJs dispos tous les vendredis ;
+- dates communes à deux DJs.
+
+Version ORM : chargement des Availability du mois puis dictionnaires par
+date, comme le faisait l'auto-assignation. Version index : opérations
+bit à bit sur l'index déjà chargé. Le temps de construction de l'index
+(une requête) est mesuré à part.
+
+Usage :
+    python benchmarks/bench_availability_index.py --database /tmp/bench.db
+    python benchmarks/bench_availability_index.py --database /tmp/bench.db --output index.json
+"""
+import argparse
+import calendar as cal
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FRIDAY = 4
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Base générée par generate_data.py')
+    parser.add_argument('--iterations', type=int, default=50, help='Répétitions par question')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    return parser.parse_args()
+
+
+def median_ms(func, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, result
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    os.environ['SEND_EMAIL_NOTIFICATIONS'] = 'false'
+
+    from app import app
+    from models import db, User, Availability, Assignment, TimeSlot
+    from availability_index import AvailabilityIndex, SLOT_FIT
+
+    # Mois à venir : celui que l'admin planifie
+    target = date.today().replace(day=1) + timedelta(days=32)
+    year, month = target.year, target.month
+    start = date(year, month, 1)
+    end = date(year, month, cal.monthrange(year, month)[1])
+
+    with app.app_context():
+        active = [uid for (uid,) in db.session.query(User.id).filter(
+            User.is_admin == False, User.is_active == True).order_by(User.id)]
+        if len(active) < 2:
+            sys.exit('❌ Base vide : lancer benchmarks/generate_data.py')
+        dj_a, dj_b = active[0], active[1]
+        active_ids = set(active)
+
+        def orm_month():
+            available = {}
+            for a in Availability.query.filter(
+                Availability.date >= start, Availability.date <= end, Availability.is_available == True
+            ).all():
+                if a.user_id in active_ids:
+                    available.setdefault(a.date, {})[a.user_id] = a.time_slot
+            assigned = {}
+            for a in Assignment.query.filter(Assignment.date >= start, Assignment.date <= end).all():
+                assigned.setdefault(a.date, {})[a.user_id] = a.time_slot
+            return available, assigned
+
+        def orm_uncovered():
+            available, assigned = orm_month()
+            fits = SLOT_FIT[TimeSlot.PEAKTIME]
+            return [date(year, month, n) for n in range(1, end.day + 1)
+                    if TimeSlot.PEAKTIME not in assigned.get(date(year, month, n), {}).values()
+                    and not any(slot in fits for slot in available.get(date(year, month, n), {}).values())]
+
+        def orm_fridays():
+            available, _ = orm_month()
+            fridays = [d for d in (date(year, month, n) for n in range(1, end.day + 1)) if d.weekday() == FRIDAY]
+            return [uid for uid in active if all(uid in available.get(d, {}) for d in fridays)]
+
+        def orm_overlap():
+            available, _ = orm_month()
+            return sorted(d for d, djs in available.items() if dj_a in djs and dj_b in djs)
+
+        index = AvailabilityIndex()
+
+        def build():
+            index._cursor = None
+            index.refresh()
+            return index.month(year, month)
+
+        build_ms, _ = median_ms(build, max(1, args.iterations // 5))
+
+        questions = {
+            'uncovered_peaktime': (orm_uncovered, lambda: index.uncovered_nights(year, month, TimeSlot.PEAKTIME)),
+            'free_all_fridays': (orm_fridays, lambda: index.free_on_all(year, month, FRIDAY)),
+            'overlap_two_djs': (orm_overlap, lambda: index.overlap(year, month, dj_a, dj_b)),
+        }
+
+        print(f"🗓️ Mois {month:02d}/{year} — {len(active)} DJs actifs")
+        print(f"🧱 Construction de l'index (1 requête) : {build_ms:.2f} ms")
+        results = {}
+        for name, (orm_func, index_func) in questions.items():
+            orm_ms, orm_result = median_ms(orm_func, args.iterations)
+            index_ms, index_result = median_ms(index_func, args.iterations)
+            same = sorted(orm_result) == sorted(index_result)
+            results[name] = {
+                'orm_ms': orm_ms,
+                'index_ms': index_ms,
+                'speedup': orm_ms / index_ms if index_ms else None,
+                'results': len(index_result),
+                'same_result': same,
+            }
+            flag = '✅' if same else '❌ résultats différents'
+            print(f"⏱️ {name:20s} ORM={orm_ms:8.2f}ms  index={index_ms:8.3f}ms  "
+                  f"x{results[name]['speedup']:.0f}  ({len(index_result)} résultats) {flag}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'database': os.path.abspath(args.database),
+            'month': f'{year}-{month:02d}',
+            'active_djs': len(active),
+            'iterations': args.iterations,
+        },
+        'build_ms': build_ms,
+        'questions': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Résultats sauvegardés : {args.output}")
+
+
+if __name__ == '__main__':
+    main()
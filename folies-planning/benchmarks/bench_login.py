@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark des connexions par worker (hachage des mots de passe, passwords.py)
+
+Un processus joue le rôle d'un worker gunicorn à threads (--threads N) :
+pour chaque niveau de concurrence, N threads enchaînent des POST /login
+(un client neuf par connexion). On mesure le débit de connexions, les
+latences p50/p95, les refus 503 (pool saturé) et, pendant la rafale, la
+latence d'une page légère (GET /login) servie par un thread de plus.
+
+Deuxième partie : des DJs dont le hash a été créé avec --legacy-method
+se connectent deux fois ; la première connexion recalcule le hash avec
+PASSWORD_HASH_METHOD (vérification + rehash), la seconde non.
+
+Usage :
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --threads 1,2,4,8 --hash-workers 4 --output login.json
+    python benchmarks/bench_login.py --method pbkdf2:sha256:600000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--djs', type=int, default=32, help='Comptes DJ créés')
+    parser.add_argument('--threads', default='1,2,4,8', help='Niveaux de concurrence, séparés par des virgules')
+    parser.add_argument('--logins', type=int, default=32, help='Connexions par niveau')
+    parser.add_argument('--method', help='PASSWORD_HASH_METHOD (défaut : celui de config.py)')
+    parser.add_argument('--hash-workers', type=int, help='PASSWORD_HASH_WORKERS (défaut : celui de config.py)')
+    parser.add_argument('--legacy-method', default='pbkdf2:sha256:600000', help='Méthode des hashes à mettre à niveau')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def login_once(app, username):
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post('/login', data={'username': username, 'password': f'pw-{username}'})
+    return response.status_code, time.perf_counter() - start
+
+
+def run_burst(app, usernames, threads, total):
+    latencies, statuses, page_latencies = [], [], []
+    lock = threading.Lock()
+    counter = iter(range(total))
+    done = threading.Event()
+
+    def worker():
+        for i in counter:
+            status, elapsed = login_once(app, usernames[i % len(usernames)])
+            with lock:
+                statuses.append(status)
+                latencies.append(elapsed)
+
+    def page_probe():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/login')
+            page_latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    probe = threading.Thread(target=page_probe)
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    probe.start()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+
+    ok = statuses.count(302)
+    return {
+        'threads': threads,
+        'logins': len(statuses),
+        'ok': ok,
+        'rejected_503': statuses.count(503),
+        'logins_per_s': ok / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'page_p95_ms': percentile(page_latencies, 95) * 1000 if page_latencies else None,
+    }
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='bench-login-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'login.db')}"
+    os.environ['SEND_EMAIL_NOTIFICATIONS'] = 'false'
+    if args.method:
+        os.environ['PASSWORD_HASH_METHOD'] = args.method
+    if args.hash_workers:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+
+    from app import app
+    from models import db, User
+    from passwords import hash_many, needs_rehash, _settings
+    from werkzeug.security import generate_password_hash
+
+    logging.getLogger().setLevel(logging.ERROR)  # Une ligne de log par connexion sinon
+
+    current = [f'dj{i:03d}' for i in range(args.djs)]
+    legacy = [f'old{i:03d}' for i in range(args.djs)]
+    with app.app_context():
+        hashes = hash_many([f'pw-{name}' for name in current])
+        rows = [{'username': name, 'email': f'{name}@bench.local', 'dj_name': name, 'password_hash': pw_hash,
+                 'is_admin': False, 'is_active': True} for name, pw_hash in zip(current, hashes)]
+        rows += [{'username': name, 'email': f'{name}@bench.local', 'dj_name': name,
+                  'password_hash': generate_password_hash(f'pw-{name}', args.legacy_method),
+                  'is_admin': False, 'is_active': True} for name in legacy]
+        db.session.execute(User.__table__.insert(), rows)
+        db.session.commit()
+
+    print(f"🔐 {_settings['method']} — pool de {_settings['workers']} threads, "
+          f"{_settings['max_pending']} places, {os.cpu_count()} CPU")
+    bursts = []
+    for threads in [int(t) for t in args.threads.split(',')]:
+        result = run_burst(app, current, threads, args.logins)
+        bursts.append(result)
+        print(f"⏱️ {threads:2d} threads  {result['logins_per_s']:6.1f} connexions/s  "
+              f"p50={result['p50_ms']:7.1f}ms p95={result['p95_ms']:7.1f}ms  "
+              f"503={result['rejected_503']}  page légère p95={result['page_p95_ms'] or 0:.1f}ms")
+
+    first = [login_once(app, name)[1] for name in legacy[:8]]
+    second = [login_once(app, name)[1] for name in legacy[:8]]
+    with app.app_context():
+        upgraded = sum(not needs_rehash(u.password_hash) for u in User.query.filter(User.username.in_(legacy[:8])))
+    rehash = {
+        'legacy_method': args.legacy_method,
+        'first_login_ms': percentile(first, 50) * 1000,
+        'second_login_ms': percentile(second, 50) * 1000,
+        'upgraded': upgraded,
+    }
+    print(f"♻️ {args.legacy_method} → {_settings['method']} : 1re connexion {rehash['first_login_ms']:.1f}ms "
+          f"(vérif + rehash), 2e {rehash['second_login_ms']:.1f}ms, {upgraded}/8 hashes mis à niveau")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'method': _settings['method'],
+            'hash_workers': _settings['workers'],
+            'max_pending': _settings['max_pending'],
+            'cpu_count': os.cpu_count(),
+        },
+        'bursts': bursts,
+        'rehash': rehash,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Résultats sauvegardés : {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark des routes principales (client de test Flask + charge multi-thread)
+
+Pour chaque route : latences p50/p95/p99 en séquentiel, débit sous charge
+concurrente et nombre de requêtes SQL par requête HTTP. Le résultat est
+sauvegardé en JSON pour comparer deux runs.
+
+Usage :
+    python benchmarks/generate_data.py --database /tmp/bench.db
+    python benchmarks/bench_routes.py --database /tmp/bench.db --output bench.json
+    python benchmarks/bench_routes.py --database /tmp/bench.db --compare bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Base générée par generate_data.py')
+    parser.add_argument('--iterations', type=int, default=20, help='Requêtes séquentielles par route')
+    parser.add_argument('--threads', type=int, default=8, help='Threads du driver de charge')
+    parser.add_argument('--load-requests', type=int, default=80, help='Requêtes par route sous charge')
+    parser.add_argument('--routes', help='Sous-ensemble de routes, séparées par des virgules')
+    parser.add_argument('--accept-encoding', default='br, gzip', help='En-tête Accept-Encoding envoyé ("" : sans compression)')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    parser.add_argument('--compare', help='JSON d\'un run précédent à comparer')
+    return parser.parse_args()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class QueryCounter:
+    """Compte les requêtes SQL exécutées par thread"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self._local = threading.local()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def login(app, username, password, accept_encoding=''):
+    client = app.test_client()
+    client.environ_base['HTTP_ACCEPT_ENCODING'] = accept_encoding
+    response = client.post('/login', data={'username': username, 'password': password})
+    if response.status_code != 302:
+        raise RuntimeError(f'Connexion impossible pour {username}')
+    return client
+
+
+def build_routes(sample_date):
+    """(nom, rôle, méthode, url, corps JSON)"""
+    month, year = sample_date.month, sample_date.year
+    return [
+        ('admin_dashboard', 'admin', 'GET', f'/admin/dashboard?month={month}&year={year}', None),
+        ('dj_dashboard', 'dj', 'GET', f'/dj/dashboard?month={month}&year={year}', None),
+        ('planning_mensuel', 'dj', 'GET', f'/planning-mensuel?month={month}&year={year}', None),
+        ('auto_assign', 'admin', 'POST', '/admin/auto-assign', {'month': month, 'year': year}),
+        ('season_plan', 'admin', 'POST', '/admin/season-plan', {'month': month, 'year': year, 'months': 3}),
+        ('export_pdf', 'admin', 'GET', f'/admin/export-planning-pdf?month={month}&year={year}', None),
+        ('day_details', 'admin', 'GET', f'/admin/day-details?date={sample_date.isoformat()}', None),
+        ('export_year', 'admin', 'GET', f'/admin/api/export?kind=availabilities&from={year - 1}-{month:02d}-01&to={year}-{month:02d}-01', None),
+    ]
+
+
+def call(client, method, url, body):
+    """Taille de la réponse telle qu'envoyée sur le réseau (compressée ou non)"""
+    if method == 'POST':
+        response = client.post(url, json=body)
+    else:
+        response = client.get(url)
+    data = response.get_data()
+    if response.status_code != 200:
+        raise RuntimeError(f'{method} {url} -> {response.status_code}')
+    return len(data)
+
+
+def run_sequential(clients, counter, route, iterations):
+    name, role, method, url, body = route
+    latencies, queries = [], []
+    size = call(clients[role], method, url, body)  # échauffement (templates, caches)
+    for _ in range(iterations):
+        counter.reset()
+        start = time.perf_counter()
+        call(clients[role], method, url, body)
+        latencies.append(time.perf_counter() - start)
+        queries.append(counter.count)
+    return latencies, queries, size
+
+
+def run_load(make_clients, route, threads, total):
+    name, role, method, url, body = route
+    per_thread = max(1, total // threads)
+    clients = [make_clients()[role] for _ in range(threads)]
+    errors = []
+
+    def worker(client):
+        try:
+            for _ in range(per_thread):
+                call(client, method, url, body)
+        except Exception as e:
+            errors.append(str(e))
+
+    pool = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(errors[0])
+    return per_thread * threads / elapsed
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(previous, current):
+    print(f"\n📊 Comparaison avec {previous['meta'].get('revision')} ({previous['meta'].get('timestamp')})")
+    for name, result in current['routes'].items():
+        old = previous['routes'].get(name)
+        if not old:
+            continue
+        delta = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+        print(f"   {name:18s} p50 {old['p50_ms']:8.1f} → {result['p50_ms']:8.1f} ms ({delta:+.0f}%)  "
+              f"sql {old['queries_per_request']:.0f} → {result['queries_per_request']:.0f}  "
+              f"débit {old['throughput_rps']:.1f} → {result['throughput_rps']:.1f} req/s  "
+              f"{old.get('response_bytes', 0) / 1024:.0f} → {result['response_bytes'] / 1024:.0f} Ko")
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    os.environ['SEND_EMAIL_NOTIFICATIONS'] = 'false'
+
+    from app import app
+    from config import Config
+    from models import db, User, Availability, Assignment
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        dj = User.query.filter_by(is_admin=False, is_active=True).order_by(User.id).first()
+        counts = {
+            'users': User.query.count(),
+            'availabilities': Availability.query.count(),
+            'assignments': Assignment.query.count(),
+        }
+    if dj is None:
+        sys.exit('❌ Base vide : lancer benchmarks/generate_data.py')
+
+    # Un vendredi dans 10 jours environ : mois avec historique et dispos futures
+    sample = date.today() + timedelta(days=10)
+    sample += timedelta(days=(4 - sample.weekday()) % 7)
+
+    def make_clients():
+        return {
+            'admin': login(app, Config.DEFAULT_ADMIN_USERNAME, Config.DEFAULT_ADMIN_PASSWORD, args.accept_encoding),
+            'dj': login(app, dj.username, 'bench', args.accept_encoding),
+        }
+
+    routes = build_routes(sample)
+    if args.routes:
+        wanted = set(args.routes.split(','))
+        routes = [r for r in routes if r[0] in wanted]
+
+    clients = make_clients()
+    results = {}
+    for route in routes:
+        latencies, queries, size = run_sequential(clients, counter, route, args.iterations)
+        throughput = run_load(make_clients, route, args.threads, args.load_requests)
+        results[route[0]] = {
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'mean_ms': sum(latencies) / len(latencies) * 1000,
+            'throughput_rps': throughput,
+            'queries_per_request': sum(queries) / len(queries),
+            'response_bytes': size,
+        }
+        r = results[route[0]]
+        print(f"⏱️ {route[0]:18s} p50={r['p50_ms']:7.1f}ms p95={r['p95_ms']:7.1f}ms p99={r['p99_ms']:7.1f}ms "
+              f"{r['throughput_rps']:6.1f} req/s  {r['queries_per_request']:.0f} requêtes SQL  {size / 1024:.0f} Ko")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'database': os.path.abspath(args.database),
+            'rows': counts,
+            'iterations': args.iterations,
+            'threads': args.threads,
+            'sample_date': sample.isoformat(),
+            'accept_encoding': args.accept_encoding,
+        },
+        'routes': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Résultats sauvegardés : {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
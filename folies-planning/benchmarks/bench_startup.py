@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage à froid (worker web, cron, commandes CLI)
+
+Chaque scénario est lancé dans un interpréteur neuf ; on mesure le temps
+total et, via ``python -X importtime``, le coût d'import des modules les
+plus lourds. Résultats en JSON pour suivre l'évolution d'un run à l'autre.
+
+Usage :
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --compare startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'web_worker': 'import app',
+    'cli_context': 'from factory import create_cli_app; create_cli_app()',
+    'cron_import': 'import cron_reminders',
+}
+# Modules suivis dans le détail -X importtime
+TRACKED_MODULES = ['flask', 'sqlalchemy', 'flask_mail', 'reportlab', 'openpyxl', 'views.admin', 'factory']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    parser.add_argument('--compare', help='JSON d\'un run précédent à comparer')
+    return parser.parse_args()
+
+
+def run(code, env, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', code]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr):
+    """Temps cumulé (ms) des modules suivis"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [p.strip() for p in line[len('import time:'):].split('|')]
+        try:
+            cumulative[parts[2]] = int(parts[1]) / 1000
+        except (ValueError, IndexError):
+            continue
+    return {name: cumulative[name] for name in TRACKED_MODULES if name in cumulative}
+
+
+def main():
+    args = parse_args()
+    tmpdir = tempfile.mkdtemp(prefix='folies-startup-')
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'startup.db')}",
+               SEND_EMAIL_NOTIFICATIONS='false')
+
+    # Base créée une fois : on mesure un redémarrage, pas la création des tables
+    run(SCENARIOS['web_worker'], env)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        timings = sorted(run(code, env)[0] for _ in range(args.runs))
+        _, stderr = run(code, env, importtime=True)
+        results[name] = {
+            'median_ms': timings[len(timings) // 2] * 1000,
+            'min_ms': timings[0] * 1000,
+            'imports_ms': parse_importtime(stderr),
+        }
+        r = results[name]
+        heavy = ', '.join(f'{m}={t:.0f}ms' for m, t in r['imports_ms'].items())
+        print(f"🚀 {name:12s} médiane={r['median_ms']:6.0f}ms min={r['min_ms']:6.0f}ms  [{heavy}]")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'runs': args.runs,
+        },
+        'scenarios': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Résultats sauvegardés : {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\n📊 Comparaison avec le run du {previous['meta'].get('timestamp')}")
+        for name, result in results.items():
+            old = previous['scenarios'].get(name)
+            if old:
+                print(f"   {name:12s} {old['median_ms']:6.0f} → {result['median_ms']:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
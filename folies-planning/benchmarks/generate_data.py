@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Générateur de données synthétiques pour les benchmarks
+
+Remplit users, availabilities et assignments avec des distributions
+réalistes : quelques DJs très actifs et une longue traîne d'occasionnels,
+dispos concentrées sur Jeudi/Vendredi/Samedi, nuits couvertes en soirée
+complète ou en warm-up + peak (solo ou à 2).
+
+Usage :
+    python benchmarks/generate_data.py --database /tmp/bench.db --djs 500 --years 3
+
+À lancer sur une base dédiée : la base ciblée est vidée avant génération.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Probabilité qu'un DJ "moyen" soit dispo, par jour de semaine (0=Lundi)
+WEEKDAY_AVAILABILITY = [0.05, 0.05, 0.08, 0.35, 0.45, 0.45, 0.10]
+# Créneaux demandés dans les dispos
+SLOT_WEIGHTS = {'complete': 0.40, 'warmup': 0.25, 'peaktime': 0.25, 'peaktime_duo': 0.10}
+# Nuits réellement programmées, par jour de semaine
+WEEKDAY_OPEN = [0.0, 0.0, 0.1, 0.9, 1.0, 1.0, 0.1]
+# Fenêtre future ouverte aux dispos (jours)
+FUTURE_DAYS = 60
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Fichier SQLite cible (vidé)')
+    parser.add_argument('--djs', type=int, default=500)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=2026)
+    return parser.parse_args()
+
+
+def pick_slot(rng):
+    return rng.choices(list(SLOT_WEIGHTS), weights=list(SLOT_WEIGHTS.values()))[0]
+
+
+def build_users(rng, count, password_hash):
+    users = []
+    activity = {}
+    now = datetime.utcnow()
+    for i in range(1, count + 1):
+        users.append({
+            'username': f'dj{i:04d}',
+            'email': f'dj{i:04d}@bench.lesfolies.test',
+            'password_hash': password_hash,
+            'dj_name': f'DJ Bench {i:04d}',
+            'phone': f'+33 6 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}',
+            'is_admin': False,
+            'is_active': rng.random() > 0.05,
+            'created_at': now,
+        })
+        # Loi de Pareto : quelques résidents, beaucoup d'occasionnels
+        activity[i] = min(1.0, rng.paretovariate(2.5) / 4)
+    return users, activity
+
+
+def build_rows(rng, user_ids, activity, start, end, today, calculate_tarif):
+    availabilities = []
+    assignments = []
+    now = datetime.utcnow()
+
+    day = start
+    while day <= end:
+        weekday = day.weekday()
+        night_avail = []
+        for user_id in user_ids:
+            if rng.random() < WEEKDAY_AVAILABILITY[weekday] * activity[user_id] * 2:
+                slot = pick_slot(rng)
+                availabilities.append({
+                    'user_id': user_id, 'date': day, 'is_available': True,
+                    'time_slot': slot, 'created_at': now, 'updated_at': now,
+                })
+                night_avail.append((user_id, slot))
+
+        # Programmation : passé entier + premières semaines futures
+        if night_avail and day <= today + timedelta(days=21) and rng.random() < WEEKDAY_OPEN[weekday]:
+            rng.shuffle(night_avail)
+            by_slot = {}
+            for user_id, slot in night_avail:
+                by_slot.setdefault(slot, []).append(user_id)
+
+            picks = []
+            if by_slot.get('complete') and rng.random() < 0.5:
+                picks.append((by_slot['complete'][0], 'complete'))
+            else:
+                if by_slot.get('warmup'):
+                    picks.append((by_slot['warmup'][0], 'warmup'))
+                if len(by_slot.get('peaktime_duo', [])) >= 2:
+                    picks += [(uid, 'peaktime_duo') for uid in by_slot['peaktime_duo'][:2]]
+                elif by_slot.get('peaktime'):
+                    picks.append((by_slot['peaktime'][0], 'peaktime'))
+
+            for user_id, slot in picks:
+                assignments.append({
+                    'user_id': user_id, 'date': day, 'time_slot': slot,
+                    'tarif': calculate_tarif(day, slot), 'created_by': 1,
+                    'created_at': now, 'updated_at': now,
+                })
+        day += timedelta(days=1)
+
+    return availabilities, assignments
+
+
+def main():
+    args = parse_args()
+    database = os.path.abspath(args.database)
+    if os.path.exists(database):
+        os.remove(database)
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ.setdefault('SEND_EMAIL_NOTIFICATIONS', 'false')
+
+    from app import app
+    from models import db, User, Availability, Assignment, TimeSlot, calculate_tarif
+    from stats import rebuild_stats
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    start = today - timedelta(days=int(args.years * 365))
+    end = today + timedelta(days=FUTURE_DAYS)
+
+    t0 = time.perf_counter()
+    with app.app_context():
+        # Un seul hash partagé : le hachage est volontairement lent
+        users, activity = build_users(rng, args.djs, generate_password_hash('bench'))
+        db.session.execute(User.__table__.insert(), users)
+        user_ids = [uid for (uid,) in db.session.query(User.id).filter_by(is_admin=False).order_by(User.id)]
+        activity = dict(zip(user_ids, activity.values()))
+
+        availabilities, assignments = build_rows(
+            rng, user_ids, activity, start, end, today,
+            lambda day, slot: calculate_tarif(day, TimeSlot.parse(slot)))
+        for table, rows in ((Availability.__table__, availabilities), (Assignment.__table__, assignments)):
+            for i in range(0, len(rows), 5000):
+                db.session.execute(table.insert(), rows[i:i + 5000])
+        db.session.commit()
+        stats_rows = rebuild_stats()
+
+    print(f"✅ Base générée : {database}")
+    print(f"   {len(users)} DJs, {len(availabilities)} dispos, {len(assignments)} sets, "
+          f"{stats_rows} lignes dj_month_stats ({start} → {end})")
+    print(f"   {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
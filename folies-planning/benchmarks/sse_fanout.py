@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Harnais local : diffusion SSE vers N abonnés
+
+Chaque abonné consomme le même générateur que la route /admin/live, dans son
+propre thread. On publie des événements et on vérifie que chaque abonné les
+reçoit tous, avec la latence de diffusion.
+
+Usage : python benchmarks/sse_fanout.py [--subscribers 100] [--events 50]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live import ChangeBroker, sse_stream
+
+
+def subscriber(broker, year, month, expected, latencies, ready):
+    stream = sse_stream(broker, year, month, keepalive=1)
+    next(stream)  # 'retry:' initial -> abonnement effectif
+    ready.release()
+    received = 0
+    for chunk in stream:
+        if not chunk.startswith('event: change'):
+            continue
+        data = json.loads(chunk.split('data: ', 1)[1])
+        latencies.append(time.perf_counter() - data['sent_at'])
+        received += 1
+        if received == expected:
+            break
+    stream.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=100)
+    parser.add_argument('--events', type=int, default=50)
+    args = parser.parse_args()
+
+    broker = ChangeBroker()
+    today = date.today()
+    latencies = []
+    ready = threading.Semaphore(0)
+
+    threads = [
+        threading.Thread(target=subscriber,
+                         args=(broker, today.year, today.month, args.events, latencies, ready))
+        for _ in range(args.subscribers)
+    ]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        ready.acquire()
+
+    print(f"👂 {broker.subscriber_count()} abonnés connectés")
+
+    start = time.perf_counter()
+    for i in range(args.events):
+        delivered = broker.publish(today.year, today.month, {
+            'kind': 'availability',
+            'date': today.isoformat(),
+            'seq': i,
+            'sent_at': time.perf_counter()
+        })
+        assert delivered == args.subscribers
+    for t in threads:
+        t.join(timeout=30)
+    elapsed = time.perf_counter() - start
+
+    expected = args.subscribers * args.events
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+    print(f"📨 {len(latencies)}/{expected} messages livrés en {elapsed:.3f}s")
+    print(f"⏱️ Latence de diffusion : p50={p50:.2f}ms p99={p99:.2f}ms")
+    print(f"🔌 Abonnés restants après fermeture : {broker.subscriber_count()}")
+
+    if len(latencies) != expected or broker.subscriber_count():
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Journal des changements (append-only) et lecture par curseur
+
+Chaque route d'écriture ajoute un ChangeEvent dans la MÊME transaction que
+l'écriture elle-même : si le commit échoue, l'événement disparaît avec.
+
+Les consommateurs (invalidation de cache, flux ICS, notifications, flux
+live) lisent uniquement les événements postérieurs à leur curseur :
+
+    events = changes_since(cursor)
+    ...
+    cursor = events[-1].id
+
+Les consommateurs hors process (cron) persistent leur curseur avec
+iter_new_changes('nom_du_consommateur').
+"""
+from models import db, ChangeEvent, ChangeCursor
+
+
+def record_change(entity, entity_id, kind, day_date=None, user_id=None):
+    """Ajouter un événement à la session courante (commit par l'appelant)"""
+    event = ChangeEvent(
+        entity=entity,
+        entity_id=entity_id,
+        kind=kind,
+        date=day_date,
+        user_id=user_id
+    )
+    db.session.add(event)
+    return event
+
+
+def record_availability(availability, kind):
+    return record_change('availability', availability.id, kind,
+                         day_date=availability.date, user_id=availability.user_id)
+
+
+def record_assignment(assignment, kind):
+    return record_change('assignment', assignment.id, kind,
+                         day_date=assignment.date, user_id=assignment.user_id)
+
+
+def record_user(user, kind):
+    return record_change('user', user.id, kind, user_id=user.id)
+
+
+def record_changes(events):
+    """Événements en masse (dicts entity, entity_id, kind, date, user_id) : un seul executemany"""
+    if events:
+        db.session.execute(ChangeEvent.__table__.insert(), events)
+
+
+def latest_sequence():
+    """Dernière séquence écrite (0 si journal vide)"""
+    return db.session.query(db.func.max(ChangeEvent.id)).scalar() or 0
+
+
+def latest_user_sequence(user_id, entity):
+    """Dernière séquence concernant un DJ pour une entité (0 si aucune)
+
+    Sert de version : elle ne change que quand ces données du DJ changent.
+    """
+    return db.session.query(db.func.max(ChangeEvent.id)).filter(
+        ChangeEvent.user_id == user_id,
+        ChangeEvent.entity == entity
+    ).scalar() or 0
+
+
+def changes_since(cursor, limit=500, entity=None, user_id=None):
+    """Événements de séquence > cursor, dans l'ordre du journal"""
+    query = ChangeEvent.query.filter(ChangeEvent.id > cursor)
+    if entity:
+        query = query.filter(ChangeEvent.entity == entity)
+    if user_id is not None:
+        query = query.filter(ChangeEvent.user_id == user_id)
+    return query.order_by(ChangeEvent.id).limit(limit).all()
+
+
+def get_cursor(consumer):
+    row = db.session.get(ChangeCursor, consumer)
+    return row.position if row else 0
+
+
+def save_cursor(consumer, position):
+    row = db.session.get(ChangeCursor, consumer)
+    if row:
+        row.position = position
+    else:
+        db.session.add(ChangeCursor(consumer=consumer, position=position))
+    db.session.commit()
+
+
+def iter_new_changes(consumer, batch_size=500, entity=None):
+    """Parcourir les nouveaux événements d'un consommateur persistant, par lots
+
+    Le curseur n'avance qu'après le traitement complet de chaque lot : un
+    consommateur interrompu reprend au dernier lot non terminé.
+    """
+    cursor = get_cursor(consumer)
+    while True:
+        events = changes_since(cursor, limit=batch_size, entity=entity)
+        if not events:
+            return
+        yield events
+        cursor = events[-1].id
+        save_cursor(consumer, cursor)
+        if len(events) < batch_size:
+            return
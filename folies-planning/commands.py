@@ -0,0 +1,61 @@
+"""Commandes flask (``flask --app factory:create_cli_app <commande>``)"""
+import click
+
+
+def register_commands(app):
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Créer les tables manquantes et l'admin par défaut"""
+        from factory import bootstrap_database
+        bootstrap_database()
+        print("✅ Base de données initialisée")
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_command():
+        """Recalculer la table dj_month_stats depuis les dispos et assignments"""
+        from stats import rebuild_stats
+        print(f"📊 dj_month_stats recalculée : {rebuild_stats()} lignes")
+
+    @app.cli.command('migrate')
+    @click.option('--chunk-size', default=1000, help='Taille des lots de backfill')
+    def migrate_command(chunk_size):
+        """Appliquer les migrations en attente (voir migrations.py)"""
+        from migrations import run_migrations
+        run_migrations(chunk_size=chunk_size)
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Empreinter et précompresser static/ (static/dist/manifest.json)"""
+        from assets import build_assets
+        manifest = build_assets(app.static_folder)
+        print(f"✅ {len(manifest)} assets générés")
+
+    @app.cli.command('archive')
+    @click.option('--horizon-days', type=int, help='Défaut : ARCHIVE_HORIZON_DAYS')
+    @click.option('--chunk-size', default=1000, help='Lignes déplacées par transaction')
+    def archive_command(horizon_days, chunk_size):
+        """Déplacer les mois anciens vers les tables d'archive"""
+        from archive import archive_cutoff, archive_before
+        if horizon_days is None:
+            horizon_days = app.config['ARCHIVE_HORIZON_DAYS']
+        cutoff = archive_cutoff(horizon_days)
+        print(f"🗄️ Archivage des lignes antérieures au {cutoff}")
+        moved = archive_before(cutoff, chunk_size=chunk_size)
+        print(f"✅ Archivé : {moved}")
+
+    @app.cli.command('import-csv')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--kind', type=click.Choice(['users', 'availabilities']), required=True)
+    @click.option('--dry-run', is_flag=True, help='Valider sans écrire')
+    @click.option('--chunk-size', default=1000, help='Lignes validées et écrites par transaction')
+    def import_csv_command(path, kind, dry_run, chunk_size):
+        """Importer des DJs ou des disponibilités depuis un CSV (voir csv_import.py)"""
+        from csv_import import import_csv
+        with open(path, encoding='utf-8-sig', newline='') as lines:
+            report = import_csv(kind, lines, dry_run=dry_run, chunk_size=chunk_size)
+        label = 'Simulation' if dry_run else 'Import'
+        print(f"{'🔎' if dry_run else '✅'} {label} {kind} : {report['rows']} lignes, {report['created']} créées, "
+              f"{report['updated']} mises à jour, {report['rejected']} rejetées ({report['elapsed_ms']} ms)")
+        for error in report['errors']:
+            print(f"   ⚠️ ligne {error['line']} : {error['error']}")
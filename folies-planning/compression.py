@@ -0,0 +1,146 @@
+"""Compression des réponses (middleware WSGI)
+
+Les pages HTML (dashboard admin : calendrier du mois + équipe) et les
+réponses JSON (auto-assignation avec ses alternatives) partent compressées
+en brotli ou gzip selon l'en-tête Accept-Encoding du navigateur.
+
+La compression est faite au fil de l'eau : chaque morceau produit par
+l'application est compressé puis envoyé, les réponses en streaming restent
+en streaming. Sont laissés tels quels : les petites réponses (sous
+min_size octets), les types déjà compressés (PDF, images), le flux live
+(text/event-stream) et les réponses qui ont déjà un Content-Encoding
+(assets précompressés).
+
+Une réponse compressée n'a pas les mêmes octets que l'originale : son
+ETag reçoit le suffixe de l'encodage ("abc" -> "abc-gzip"), comme le fait
+Apache. Les routes qui comparent If-None-Match acceptent ces variantes
+(etag_variants).
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli optionnel : gzip seul
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/calendar',
+    'application/json', 'application/javascript', 'application/x-ndjson', 'image/svg+xml',
+}
+
+ENCODINGS = ('br', 'gzip')
+
+
+def encoded_etag(etag, encoding):
+    """ETag de la représentation compressée : '"abc"' -> '"abc-gzip"', 'W/"abc"' -> 'W/"abc-gzip"'"""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_variants(etag):
+    """ETag (sans guillemets) et ses variantes compressées, pour If-None-Match"""
+    return [etag] + [f'{etag}-{encoding}' for encoding in ENCODINGS]
+
+
+class CompressionMiddleware:
+
+    def __init__(self, app, min_size=500, level=6, brotli_quality=5):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, environ):
+        accepted = [part.split(';')[0].strip().lower()
+                    for part in environ.get('HTTP_ACCEPT_ENCODING', '').split(',')]
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def __call__(self, environ, start_response):
+        encoding = self.choose_encoding(environ)
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+
+        captured = {}
+        pending = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured['status'], captured['headers'], captured['exc_info'] = status, headers, exc_info
+            return pending.append
+
+        body = self.app(environ, capture_start_response)
+        return self._respond(body, captured, pending, encoding, start_response)
+
+    def _should_compress(self, status, headers):
+        if status[:3] in ('204', '206', '304'):
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in values or 'no-transform' in values.get('cache-control', ''):
+            return False
+        content_type = values.get('content-type', '').split(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        length = values.get('content-length')
+        return length is None or int(length) >= self.min_size
+
+    def _compressor(self, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.flush, compressor.finish
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+        return (compressor.compress,
+                lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+                compressor.flush)
+
+    def _respond(self, body, captured, pending, encoding, start_response):
+        try:
+            iterator = iter(body)
+            # Premier morceau : start_response est appelé au plus tard ici
+            chunks = list(pending)
+            for chunk in iterator:
+                chunks.append(chunk)
+                break
+            status, headers = captured['status'], captured['headers']
+
+            if not self._should_compress(status, headers):
+                start_response(status, headers, captured['exc_info'])
+                yield from chunks
+                yield from iterator
+                return
+
+            # Taille inconnue (streaming) : on bufferise jusqu'au seuil
+            size = sum(len(c) for c in chunks)
+            while size < self.min_size:
+                chunk = next(iterator, None)
+                if chunk is None:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+            if size < self.min_size:
+                start_response(status, headers, captured['exc_info'])
+                yield from chunks
+                return
+
+            headers = [(name, encoded_etag(value, encoding) if name.lower() == 'etag' else value)
+                       for name, value in headers if name.lower() != 'content-length']
+            headers.append(('Content-Encoding', encoding))
+            vary = ', '.join(value for name, value in headers if name.lower() == 'vary')
+            if 'accept-encoding' not in vary.lower():
+                vary = f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'
+            headers = [(name, value) for name, value in headers if name.lower() != 'vary']
+            headers.append(('Vary', vary))
+            start_response(status, headers, captured['exc_info'])
+
+            compress, flush, finish = self._compressor(encoding)
+            yield compress(b''.join(chunks)) + flush()
+            for chunk in iterator:
+                if chunk:
+                    yield compress(chunk) + flush()
+            yield finish()
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
@@ -6,12 +6,44 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'folies_secret_key_2026_super_secure'
     
     # Database
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///folies_planning.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///folies_planning.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Session
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
+    USER_CACHE_TTL = 30  # Secondes avant relecture de l'utilisateur connecté en base
     
+    # Compression des réponses HTML/JSON (voir compression.py)
+    COMPRESSION_MIN_SIZE = 500  # Octets
+    COMPRESSION_LEVEL = 6
+
+    # Archivage : les mois plus anciens que cet horizon quittent les tables actives
+    ARCHIVE_HORIZON_DAYS = int(os.environ.get('ARCHIVE_HORIZON_DAYS', 365))
+
+    # Planification de saison (voir planner.py)
+    SEASON_MAX_MONTHS = 6
+    PLANNER_WORKERS = int(os.environ.get('PLANNER_WORKERS', min(4, os.cpu_count() or 1)))
+    PLANNER_TIME_BUDGET = 10  # Secondes pour évaluer tous les scénarios
+
+    # Métriques Prometheus (/metrics) : jeton Bearer exigé s'il est défini, sinon accès local seulement
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ROW_COUNT_TTL = 300  # Secondes entre deux comptages des lignes par table
+
+    # Logs JSON sur stdout (voir logs.py) ; connexions aussi dans AUTH_LOG_FILE pour fail2ban
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    AUTH_LOG_FILE = '/var/log/folies-planning-auth.log'
+
+    # Profilage des routes admin (voir profiling.py) : en-tête X-Profile: 1 ou échantillonnage
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # 0.01 = 1 % des requêtes admin
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')  # Défaut : instance/profiles
+    PROFILE_MAX_FILES = 200
+
+    # Mots de passe (voir passwords.py) : méthode Werkzeug et pool de hachage borné, par processus
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING = 16  # Calculs en cours + en attente avant de refuser
+    PASSWORD_HASH_TIMEOUT = 5  # Secondes d'attente d'une place (sinon 503 sur /login)
+
     # Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max
     
@@ -31,4 +63,8 @@ class Config:
     # Notification settings
     SEND_EMAIL_NOTIFICATIONS = os.environ.get('SEND_EMAIL_NOTIFICATIONS', 'true').lower() in ['true', 'on', '1']
     NOTIFICATION_REMINDER_DAYS = 7  # Rappel 7 jours avant
+    ADMIN_ALERT_DAYS = 14  # Fenêtre du digest quotidien des soirées à couvrir
+    ADMIN_ALERT_CRITICAL_HOURS = 48
+    # Alerte immédiate si un créneau des prochaines 48h a au plus ce nombre de DJs dispos (vide : désactivé)
+    ADMIN_ALERT_CRITICAL_THRESHOLD = int(os.environ['ADMIN_ALERT_CRITICAL_THRESHOLD']) if os.environ.get('ADMIN_ALERT_CRITICAL_THRESHOLD') else None
     ADMIN_EMAIL = 'tbhone.pro@protonmail.com'  # Email de l'admin
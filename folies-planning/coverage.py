@@ -0,0 +1,184 @@
+"""Couverture des soirées et conflits, calculés en SQL
+
+Une soirée est couverte (full) par un set complet, ou par un warm-up plus
+un peak time (un DJ en solo ou deux DJs en duo). Si elle n'a que certains
+de ces créneaux, elle est partiellement couverte (partial). Sans aucun
+set, elle n'est pas couverte (none).
+
+Les candidats d'une date sont les DJs disponibles qui n'y sont pas déjà
+assignés. Un conflit est une date future, pas encore couverte, avec au
+moins deux candidats : l'admin doit choisir.
+
+Tout est calculé par une seule requête d'agrégation (GROUP BY date) : le
+coût ne dépend pas du nombre de dispos chargées en Python. Le digest
+quotidien des alertes admin (cron_reminders.py) s'appuie sur la même
+requête via uncovered_nights().
+"""
+import json
+from datetime import timedelta
+
+from sqlalchemy import case, func, literal, null, select, union_all
+
+from models import db, User, Availability, Assignment, TimeSlot
+
+COVERAGE_NONE = 'none'
+COVERAGE_PARTIAL = 'partial'
+COVERAGE_FULL = 'full'
+
+# Dispos qui peuvent tenir le warm-up / le peak time
+WARMUP_SLOTS = (TimeSlot.WARMUP, TimeSlot.COMPLETE)
+PEAK_SLOTS = (TimeSlot.PEAKTIME, TimeSlot.PEAKTIME_DUO, TimeSlot.COMPLETE)
+
+CLUB_NIGHTS = (3, 4, 5)  # Jeudi, Vendredi, Samedi
+
+
+def _coverage_rows(start, end):
+    """Lignes (date, créneau assigné, candidat) de la période"""
+    assigned = select(
+        Assignment.date.label('date'),
+        Assignment.time_slot.label('assigned_slot'),
+        null().label('candidate_id'),
+        null().label('candidate_name'),
+        null().label('candidate_slot'),
+    ).where(Assignment.date >= start, Assignment.date <= end)
+
+    already_assigned = select(literal(1)).where(
+        Assignment.user_id == Availability.user_id,
+        Assignment.date == Availability.date
+    ).exists()
+    candidates = select(
+        Availability.date,
+        null(),
+        Availability.user_id,
+        User.dj_name,
+        Availability.time_slot,
+    ).join(User, User.id == Availability.user_id).where(
+        Availability.date >= start,
+        Availability.date <= end,
+        Availability.is_available == True,
+        ~already_assigned
+    )
+    return union_all(assigned, candidates).subquery()
+
+
+def coverage_query(start, end):
+    """SELECT par date : compteurs de sets, état de couverture, candidats"""
+    rows = _coverage_rows(start, end)
+
+    def slot_count(slot):
+        return func.sum(case((rows.c.assigned_slot == slot, 1), else_=0))
+
+    complete, warmup = slot_count(TimeSlot.COMPLETE), slot_count(TimeSlot.WARMUP)
+    peaktime, peaktime_duo = slot_count(TimeSlot.PEAKTIME), slot_count(TimeSlot.PEAKTIME_DUO)
+    assigned = func.count(rows.c.assigned_slot)
+    candidates = func.count(rows.c.candidate_id)
+
+    def candidate_count(slots):
+        return func.sum(case((rows.c.candidate_slot.in_([int(slot) for slot in slots]), 1), else_=0))
+
+    coverage = case(
+        ((complete >= 1) | ((warmup >= 1) & ((peaktime >= 1) | (peaktime_duo >= 2))), COVERAGE_FULL),
+        (assigned > 0, COVERAGE_PARTIAL),
+        else_=COVERAGE_NONE
+    )
+    return select(
+        rows.c.date,
+        coverage.label('coverage'),
+        assigned.label('assigned'),
+        candidates.label('candidates'),
+        complete.label('complete'),
+        warmup.label('warmup'),
+        peaktime.label('peaktime'),
+        peaktime_duo.label('peaktime_duo'),
+        candidate_count(WARMUP_SLOTS).label('warmup_candidates'),
+        candidate_count(PEAK_SLOTS).label('peak_candidates'),
+        func.json_group_array(
+            case((rows.c.candidate_id.isnot(None),
+                  func.json_array(rows.c.candidate_id, rows.c.candidate_name)))
+        ).label('candidate_djs'),
+    ).group_by(rows.c.date).order_by(rows.c.date)
+
+
+def _as_dict(row):
+    return {
+        'date': row.date,
+        'coverage': row.coverage,
+        'assigned': row.assigned,
+        'candidates': row.candidates,
+        'sets': {TimeSlot.COMPLETE: row.complete, TimeSlot.WARMUP: row.warmup,
+                 TimeSlot.PEAKTIME: row.peaktime, TimeSlot.PEAKTIME_DUO: row.peaktime_duo},
+        'warmup_candidates': row.warmup_candidates,
+        'peak_candidates': row.peak_candidates,
+        'djs': [{'id': dj_id, 'dj_name': name}
+                for dj_id, name in (pair for pair in json.loads(row.candidate_djs) if pair)],
+    }
+
+
+def period_coverage(start, end):
+    """{date: couverture} pour les dates ayant au moins un set ou un candidat"""
+    return {row.date: _as_dict(row) for row in db.session.execute(coverage_query(start, end))}
+
+
+def find_conflicts(start, end):
+    """Dates pas encore couvertes avec au moins deux candidats (HAVING)"""
+    query = coverage_query(start, end)
+    coverage = query.selected_columns.coverage
+    candidates = query.selected_columns.candidates
+    query = query.having((coverage != COVERAGE_FULL) & (candidates >= 2))
+    return [_as_dict(row) for row in db.session.execute(query)]
+
+
+def coverage_summary(days, today):
+    """Compteurs du dashboard à partir de period_coverage()
+
+    days : résultat de period_coverage() sur la période [start, end]
+    """
+    future = [day for d, day in days.items() if d >= today]
+    return {
+        'full': sum(1 for day in future if day['coverage'] == COVERAGE_FULL),
+        'partial': sum(1 for day in future if day['coverage'] == COVERAGE_PARTIAL),
+        'conflicts': [day for day in future
+                      if day['coverage'] != COVERAGE_FULL and day['candidates'] >= 2],
+    }
+
+
+def missing_slots(day):
+    """Créneaux encore à pourvoir d'une soirée : TimeSlot.WARMUP et/ou TimeSlot.PEAKTIME"""
+    sets = day['sets']
+    if sets[TimeSlot.COMPLETE]:
+        return []
+    missing = []
+    if not sets[TimeSlot.WARMUP]:
+        missing.append(TimeSlot.WARMUP)
+    if not sets[TimeSlot.PEAKTIME] and sets[TimeSlot.PEAKTIME_DUO] < 2:
+        missing.append(TimeSlot.PEAKTIME)
+    return missing
+
+
+def uncovered_nights(start, end, weekdays=CLUB_NIGHTS):
+    """Soirées de club de [start, end] pas ou partiellement couvertes (une requête)
+
+    Chaque soirée porte ses créneaux manquants (missing) et le nombre de
+    candidats pour le warm-up et pour le peak time.
+    """
+    days = period_coverage(start, end)
+    nights = []
+    current = start
+    while current <= end:
+        if current.weekday() in weekdays:
+            day = days.get(current) or {
+                'date': current, 'coverage': COVERAGE_NONE, 'assigned': 0, 'candidates': 0,
+                'sets': dict.fromkeys(TimeSlot, 0),
+                'warmup_candidates': 0, 'peak_candidates': 0, 'djs': [],
+            }
+            if day['coverage'] != COVERAGE_FULL:
+                day['missing'] = missing_slots(day)
+                nights.append(day)
+        current += timedelta(days=1)
+    return nights
+
+
+def is_critical(night, threshold):
+    """Au moins un créneau manquant avec threshold candidats ou moins"""
+    counts = {TimeSlot.WARMUP: night['warmup_candidates'], TimeSlot.PEAKTIME: night['peak_candidates']}
+    return any(counts[slot] <= threshold for slot in night['missing'])
@@ -2,145 +2,168 @@
 """
 Script cron pour envoyer les rappels automatiques
 À exécuter quotidiennement via crontab
+
+    python cron_reminders.py                  # rappels DJs + digest admin
+    python cron_reminders.py --critical-only  # alertes critiques seules (ex. toutes les heures)
 """
 
-from app import app, db
-from models import Assignment, User, Availability
-from notifications import send_reminder_notification, send_admin_alert
+import logging
+import sys
+
+from factory import create_cli_app
+from models import db, Assignment, ChangeEvent, ChangeCursor
+from notifications import build_digest, send_batch, send_admin_digest
+from coverage import uncovered_nights, is_critical
+from changelog import save_cursor
 from datetime import date, timedelta
 from config import Config
+from logs import configure_logging, new_request_id
+
+logger = logging.getLogger('cron')
+
+# Curseur par soirée signalée : alerte-critique:2026-03-14 (supprimé une fois la date passée)
+ALERT_CURSOR_PREFIX = 'alerte-critique:'
+
+# Contexte léger : ni blueprints, ni ReportLab, ni bootstrap de la base
+app = create_cli_app()
 
 def send_reminders():
-    """Envoyer les rappels aux DJs (uniquement Jeudi, Vendredi, Samedi)"""
+    """Envoyer les rappels aux DJs (uniquement Jeudi, Vendredi, Samedi)
+
+    Un seul email par DJ regroupe ses rappels du jour (7 jours et 24h), et
+    tous les emails partent sur une seule connexion SMTP.
+    """
     with app.app_context():
         today = date.today()
         reminder_date_7 = today + timedelta(days=Config.NOTIFICATION_REMINDER_DAYS)
         reminder_date_1 = today + timedelta(days=1)
         
-        print(f"📅 Aujourd'hui: {today}")
-        print(f"🔔 Rappels 7j pour: {reminder_date_7}")
-        print(f"⏰ Rappels 24h pour: {reminder_date_1}")
-        print("-" * 50)
+        logger.info("Rappels DJs", extra={'today': today, 'reminder_7': reminder_date_7, 'reminder_1': reminder_date_1})
         
-        # Rappels 7 jours avant (seulement Jeudi=3, Vendredi=4, Samedi=5)
-        assignments_7days = Assignment.query.filter_by(date=reminder_date_7).all()
-        for assignment in assignments_7days:
-            # Vérifier que c'est Jeudi, Vendredi ou Samedi
-            day_of_week = assignment.date.weekday()  # 0=Lundi, 3=Jeudi, 4=Vendredi, 5=Samedi
-            if day_of_week not in [3, 4, 5]:
-                print(f"⏭️ Skip {assignment.user.dj_name} - {assignment.date} n'est pas Jeu/Ven/Sam")
-                continue
-            
-            try:
-                send_reminder_notification(
-                    app,
-                    assignment.user,
-                    assignment,
-                    Config.NOTIFICATION_REMINDER_DAYS
-                )
-                print(f"✅ Rappel 7j envoyé à {assignment.user.dj_name} ({assignment.user.email}) pour {assignment.date.strftime('%A %d/%m')}")
-            except Exception as e:
-                print(f"❌ Erreur rappel 7j pour {assignment.user.dj_name}: {e}")
+        # Rappels 7 jours et 24h avant, regroupés par DJ
+        items_by_dj = {}
+        counts = {Config.NOTIFICATION_REMINDER_DAYS: 0, 1: 0}
+        for reminder_date, days_left in ((reminder_date_7, Config.NOTIFICATION_REMINDER_DAYS), (reminder_date_1, 1)):
+            for assignment in Assignment.query.filter_by(date=reminder_date).all():
+                # Vérifier que c'est Jeudi, Vendredi ou Samedi
+                day_of_week = assignment.date.weekday()  # 0=Lundi, 3=Jeudi, 4=Vendredi, 5=Samedi
+                if day_of_week not in [3, 4, 5]:
+                    logger.info("Skip : pas un Jeu/Ven/Sam", extra={'dj': assignment.user.dj_name, 'date': assignment.date})
+                    continue
+                if not assignment.user.is_active:
+                    continue
+                items_by_dj.setdefault(assignment.user, []).append({'assignment': assignment, 'days_left': days_left})
+                counts[days_left] += 1
         
-        # Rappels 24h avant (seulement Jeudi, Vendredi, Samedi)
-        assignments_1day = Assignment.query.filter_by(date=reminder_date_1).all()
-        for assignment in assignments_1day:
-            # Vérifier que c'est Jeudi, Vendredi ou Samedi
-            day_of_week = assignment.date.weekday()
-            if day_of_week not in [3, 4, 5]:
-                print(f"⏭️ Skip {assignment.user.dj_name} - {assignment.date} n'est pas Jeu/Ven/Sam")
-                continue
-            
+        messages = []
+        for dj, items in items_by_dj.items():
             try:
-                send_reminder_notification(
-                    app,
-                    assignment.user,
-                    assignment,
-                    1
-                )
-                print(f"✅ Rappel 24h envoyé à {assignment.user.dj_name} ({assignment.user.email}) pour {assignment.date.strftime('%A %d/%m')}")
-            except Exception as e:
-                print(f"❌ Erreur rappel 24h pour {assignment.user.dj_name}: {e}")
+                first = min(item['days_left'] for item in items)
+                messages.append(build_digest(
+                    dj, items,
+                    subject=f"⏰ Rappel: Set dans {first} jour{'s' if first > 1 else ''}" if len(items) == 1
+                            else f"⏰ Rappel: {len(items)} sets à venir",
+                    title='Rappel — Ton set approche' if len(items) == 1 else 'Rappel — Tes sets approchent',
+                    intro='Prepare tes tracks pour LES FOLIES !',
+                    color='#ffab00'
+                ))
+                sets = [f"{item['assignment'].date.isoformat()} (J-{item['days_left']})" for item in items]
+                logger.info("Rappel préparé", extra={'dj': dj.dj_name, 'email': dj.email, 'sets': sets})
+            except Exception:
+                logger.exception("Erreur rappel", extra={'dj': dj.dj_name})
         
-        # Compter les rappels envoyés (seulement ceux des bons jours)
-        rappels_7j_sent = sum(1 for a in assignments_7days if a.date.weekday() in [3, 4, 5])
-        rappels_24h_sent = sum(1 for a in assignments_1day if a.date.weekday() in [3, 4, 5])
+        send_batch(app, messages, background=False)
         
-        print(f"🎉 Rappels terminés : {rappels_7j_sent} rappels 7j, {rappels_24h_sent} rappels 24h")
+        logger.info("Rappels terminés", extra={'reminders_7': counts[Config.NOTIFICATION_REMINDER_DAYS],
+                                               'reminders_1': counts[1], 'emails': len(messages)})
+
+def check_availability_alerts(already_alerted=()):
+    """Un seul email à l'admin listant les soirées Jeu/Ven/Sam à couvrir
 
-def check_availability_alerts():
-    """Alerter l'admin pour dates sans DJ (uniquement Jeudi, Vendredi, Samedi)"""
+    Une requête d'agrégation sur la fenêtre (coverage.uncovered_nights) donne,
+    par soirée, les créneaux manquants et le nombre de DJs dispos pour chacun.
+    Les soirées qui viennent de partir en alerte critique (already_alerted)
+    ne sont pas répétées dans le digest.
+    """
     with app.app_context():
         today = date.today()
-        check_until = today + timedelta(days=14)  # Vérifier les 2 prochaines semaines
+        check_until = today + timedelta(days=Config.ADMIN_ALERT_DAYS)
         
-        print(f"🔍 Vérification disponibilités jusqu'au {check_until}")
-        print("-" * 50)
+        logger.info("Vérification disponibilités", extra={'until': check_until})
         
-        current_date = today
-        alerts_sent = 0
+        nights = [night for night in uncovered_nights(today, check_until)
+                  if night['date'] not in already_alerted]
+        for night in nights:
+            logger.warning("Soirée à couvrir", extra={
+                'date': night['date'], 'missing': [slot.key for slot in night['missing']],
+                'warmup_candidates': night['warmup_candidates'], 'peak_candidates': night['peak_candidates']
+            })
         
-        while current_date <= check_until:
-            # Vérifier uniquement Jeudi (3), Vendredi (4), Samedi (5)
-            day_of_week = current_date.weekday()
-            if day_of_week not in [3, 4, 5]:
-                current_date += timedelta(days=1)
-                continue
-            
-            # Vérifier si déjà assigné
-            assignments = Assignment.query.filter_by(date=current_date).all()
-            assigned_slots = {a.time_slot for a in assignments}
-            
-            # Si soirée complète assignée, pas besoin d'alerte
-            if 'complete' in assigned_slots:
-                current_date += timedelta(days=1)
+        if nights:
+            send_admin_digest(app, Config.ADMIN_EMAIL, nights, end=check_until, background=False)
+        logger.info("Alertes admin terminées", extra={'nights': len(nights)})
+
+def check_critical_alerts():
+    """Alerte immédiate pour les soirées critiques des prochaines ADMIN_ALERT_CRITICAL_HOURS
+
+    Critique : un créneau manquant avec ADMIN_ALERT_CRITICAL_THRESHOLD DJs dispos
+    ou moins. Désactivé si le seuil n'est pas configuré. Une soirée n'est
+    signalée qu'une fois tant que rien ne change à sa date (journal des
+    changements), même si le cron tourne toutes les heures. Les curseurs des
+    soirées passées sont supprimés à chaque passage.
+
+    Retourne les dates envoyées dans l'alerte.
+    """
+    threshold = Config.ADMIN_ALERT_CRITICAL_THRESHOLD
+    if threshold is None:
+        return set()
+    
+    with app.app_context():
+        today = date.today()
+        hours = Config.ADMIN_ALERT_CRITICAL_HOURS
+        until = today + timedelta(days=hours // 24)
+        
+        # Dates ISO : l'ordre des chaînes suit celui des dates
+        pruned = ChangeCursor.query.filter(
+            ChangeCursor.consumer.like(f'{ALERT_CURSOR_PREFIX}%'),
+            ChangeCursor.consumer < f'{ALERT_CURSOR_PREFIX}{today.isoformat()}'
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if pruned:
+            logger.info("Curseurs d'alertes passées supprimés", extra={'cursors': pruned})
+        
+        critical = []
+        for night in uncovered_nights(today, until):
+            if not is_critical(night, threshold):
                 continue
-            
-            # Si warmup ET peaktime assignés, pas besoin d'alerte
-            if 'warmup' in assigned_slots and 'peaktime' in assigned_slots:
-                current_date += timedelta(days=1)
+            consumer = f"{ALERT_CURSOR_PREFIX}{night['date'].isoformat()}"
+            version = db.session.query(db.func.max(ChangeEvent.id)).filter(
+                ChangeEvent.date == night['date']
+            ).scalar() or 0
+            alerted = db.session.get(ChangeCursor, consumer)
+            if alerted and alerted.position == version:
+                logger.info("Soirée déjà signalée, rien n'a changé depuis", extra={'date': night['date']})
                 continue
-            
-            # Compter les DJs disponibles
-            availabilities = Availability.query.filter_by(
-                date=current_date,
-                is_available=True
-            ).all()
-            
-            warmup_count = sum(1 for a in availabilities if a.time_slot in ['warmup', 'complete'])
-            peaktime_count = sum(1 for a in availabilities if a.time_slot in ['peaktime', 'complete'])
-            
-            # Alerte si manque de DJs
-            needs_warmup = 'warmup' not in assigned_slots and warmup_count == 0
-            needs_peaktime = 'peaktime' not in assigned_slots and peaktime_count == 0
-            
-            if needs_warmup or needs_peaktime:
-                try:
-                    send_admin_alert(
-                        app,
-                        Config.ADMIN_EMAIL,
-                        current_date,
-                        len(availabilities)
-                    )
-                    alerts_sent += 1
-                    print(f"⚠️ Alerte envoyée pour {current_date.strftime('%A %d/%m')} (warmup: {warmup_count}, peak: {peaktime_count})")
-                except Exception as e:
-                    print(f"❌ Erreur alerte admin pour {current_date}: {e}")
-            
-            current_date += timedelta(days=1)
+            critical.append((night, consumer, version))
         
-        print(f"🔔 Alertes admin terminées : {alerts_sent} alertes envoyées")
+        if critical:
+            send_admin_digest(app, Config.ADMIN_EMAIL, [night for night, _, _ in critical],
+                              critical=True, hours=hours, background=False)
+            for night, consumer, version in critical:
+                save_cursor(consumer, version)
+        logger.info("Alertes critiques terminées", extra={'nights': len(critical)})
+        return {night['date'] for night, _, _ in critical}
 
 if __name__ == '__main__':
-    print("=" * 50)
-    print("🚀 CRON LES FOLIES PLANNING - Démarrage")
-    print(f"⏰ Exécution: {date.today()}")
-    print("=" * 50)
+    configure_logging(level=Config.LOG_LEVEL)
+    new_request_id(prefix='cron-')
+    critical_only = '--critical-only' in sys.argv
+    logger.info("CRON LES FOLIES PLANNING - Démarrage", extra={'critical_only': critical_only})
     
-    send_reminders()
-    print()
-    check_availability_alerts()
+    if critical_only:
+        check_critical_alerts()
+    else:
+        send_reminders()
+        check_availability_alerts(already_alerted=check_critical_alerts())
     
-    print("=" * 50)
-    print("✅ Tâches terminées")
-    print("=" * 50)
+    logger.info("Tâches terminées")
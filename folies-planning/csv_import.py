@@ -0,0 +1,350 @@
+"""Import CSV des DJs et des disponibilités (début de saison)
+
+Deux types de fichiers, une ligne d'en-tête, séparateur ``,`` ou ``;`` :
+
+- users : username, email, dj_name, phone (facultatif), password
+  (obligatoire pour un nouveau DJ ; vide = mot de passe inchangé) ;
+- availabilities : username, date (AAAA-MM-JJ ou JJ/MM/AAAA), time_slot
+  (complete, warmup, peaktime, peaktime_duo ; défaut complete),
+  is_available (facultatif, défaut 1).
+
+Le fichier est lu en flux par lots de chunk_size lignes. Chaque lot est
+validé (colonnes, doublons dans le fichier, conflits en base : email d'un
+autre compte, date passée ou déjà assignée), puis écrit par des UPSERT en
+executemany, avec les événements du journal et les compteurs de
+dj_month_stats dans la même transaction (un commit par lot). Les lignes
+invalides sont ignorées et listées dans le rapport.
+
+Les mots de passe sont hachés dans le pool partagé de passwords.py, sans
+en prendre plus de PASSWORD_HASH_WORKERS places (les connexions gardent
+le reste) : pour un fichier de DJs, c'est le hachage qui fixe le débit.
+En dry_run, rien n'est haché ni écrit : le rapport donne ce qui serait
+créé, mis à jour ou rejeté.
+
+Les DJs doivent exister avant l'import de leurs disponibilités.
+"""
+import csv
+import time
+from datetime import date, datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db, User, Availability, Assignment, TimeSlot
+from changelog import record_changes
+from passwords import hash_many
+from stats import apply_availability_days
+from user_cache import invalidate_user
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_COLUMNS = {
+    'users': (['username', 'email', 'dj_name', 'password'], ['phone']),
+    'availabilities': (['username', 'date'], ['time_slot', 'is_available']),
+}
+
+TRUE_VALUES = {'1', 'true', 'oui', 'yes', 'x'}
+FALSE_VALUES = {'0', 'false', 'non', 'no'}
+
+csv.register_dialect('excel-semicolon', 'excel', delimiter=';')  # Export Excel français
+
+
+class ImportFileError(ValueError):
+    """Fichier inexploitable (en-tête absent ou colonnes manquantes)"""
+
+
+def _reader(lines):
+    header = next(lines, None)
+    if header is None:
+        raise ImportFileError('Fichier vide')
+    dialect = 'excel-semicolon' if header.count(';') > header.count(',') else 'excel'
+    columns = [name.strip().lower() for name in next(csv.reader([header], dialect=dialect))]
+    return columns, csv.reader(lines, dialect=dialect)
+
+
+def iter_chunks(lines, kind, chunk_size=CHUNK_SIZE):
+    """Lots de (numéro de ligne, dict) ; lines : itérable de lignes texte"""
+    required, optional = IMPORT_COLUMNS[kind]
+    columns, reader = _reader(iter(lines))
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ImportFileError(f"Colonnes manquantes : {', '.join(missing)}")
+    wanted = [(index, name) for index, name in enumerate(columns) if name in required or name in optional]
+
+    chunk = []
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        row = {name: values[index].strip() if index < len(values) else '' for index, name in wanted}
+        chunk.append((reader.line_num + 1, row))  # + 1 : l'en-tête est lu à part
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _new_report(kind, dry_run):
+    return {'kind': kind, 'dry_run': dry_run, 'rows': 0, 'created': 0, 'updated': 0,
+            'rejected': 0, 'errors': []}
+
+
+def _reject(report, line, message):
+    report['rejected'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'line': line, 'error': message})
+
+
+# --- DJs ---
+
+def _validate_users(chunk, seen, report):
+    valid = []
+    for line, row in chunk:
+        if not row['username'] or not row['email'] or not row['dj_name']:
+            _reject(report, line, 'username, email et dj_name sont obligatoires')
+        elif len(row['username']) > 80 or len(row['email']) > 120 or len(row['dj_name']) > 100 or len(row.get('phone', '')) > 20:
+            _reject(report, line, 'Valeur trop longue')
+        elif '@' not in row['email']:
+            _reject(report, line, f"Email invalide : {row['email']}")
+        elif row['username'] in seen['usernames']:
+            _reject(report, line, f"username en double dans le fichier : {row['username']}")
+        elif row['email'].lower() in seen['emails']:
+            _reject(report, line, f"Email en double dans le fichier : {row['email']}")
+        else:
+            seen['usernames'].add(row['username'])
+            seen['emails'].add(row['email'].lower())
+            valid.append((line, row))
+    if not valid:
+        return [], {}
+
+    existing = {
+        user.username: user for user in db.session.execute(
+            select(User.id, User.username, User.is_admin).where(User.username.in_([row['username'] for _, row in valid]))
+        )
+    }
+    email_owners = dict(db.session.execute(
+        select(db.func.lower(User.email), User.username)
+        .where(db.func.lower(User.email).in_([row['email'].lower() for _, row in valid]))
+    ).all())
+
+    accepted = []
+    for line, row in valid:
+        user = existing.get(row['username'])
+        owner = email_owners.get(row['email'].lower())
+        if user is not None and user.is_admin:
+            _reject(report, line, f"{row['username']} est un compte admin")
+        elif owner is not None and owner != row['username']:
+            _reject(report, line, f"Email déjà utilisé par {owner}")
+        elif user is None and not row['password']:
+            _reject(report, line, f"Mot de passe obligatoire pour le nouveau DJ {row['username']}")
+        else:
+            accepted.append((line, row))
+    return accepted, existing
+
+
+def _write_users(accepted, existing):
+    hashes = iter(hash_many([row['password'] for _, row in accepted if row['password']]))
+    now = datetime.utcnow()
+    rows = [{
+        'username': row['username'],
+        'email': row['email'],
+        'dj_name': row['dj_name'],
+        'phone': row.get('phone') or None,
+        'password_hash': next(hashes) if row['password'] else '',
+        'is_admin': False,
+        'is_active': True,
+        'created_at': now,
+    } for _, row in accepted]
+
+    table = User.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['username'],
+        set_={
+            'email': stmt.excluded.email,
+            'dj_name': stmt.excluded.dj_name,
+            'phone': stmt.excluded.phone,
+            # Mot de passe vide dans le fichier : on garde l'actuel
+            'password_hash': db.func.coalesce(db.func.nullif(stmt.excluded.password_hash, ''), table.c.password_hash),
+            # Token ICS généré par défaut pour chaque ligne : gardé seulement si le DJ n'en avait pas
+            'ics_token': db.func.coalesce(table.c.ics_token, stmt.excluded.ics_token),
+        }
+    )
+    db.session.execute(stmt, rows)
+
+    ids = dict(db.session.execute(
+        select(User.username, User.id).where(User.username.in_([row['username'] for row in rows]))
+    ).all())
+    record_changes([{
+        'entity': 'user', 'entity_id': ids[row['username']], 'user_id': ids[row['username']], 'date': None,
+        'kind': 'updated' if row['username'] in existing else 'created',
+    } for row in rows])
+    return [user.id for user in existing.values()]
+
+
+def import_users(lines, dry_run=False, chunk_size=CHUNK_SIZE):
+    report = _new_report('users', dry_run)
+    seen = {'usernames': set(), 'emails': set()}
+    for chunk in iter_chunks(lines, 'users', chunk_size):
+        report['rows'] += len(chunk)
+        accepted, existing = _validate_users(chunk, seen, report)
+        updated = sum(1 for _, row in accepted if row['username'] in existing)
+        report['created'] += len(accepted) - updated
+        report['updated'] += updated
+        if dry_run or not accepted:
+            continue
+        try:
+            updated_ids = _write_users(accepted, existing)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for user_id in updated_ids:
+            invalidate_user(user_id)
+    return report
+
+
+# --- Disponibilités ---
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, '%d/%m/%Y').date()
+
+
+def _parse_bool(value):
+    value = value.lower()
+    if not value or value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f'is_available invalide : {value}')
+
+
+def _validate_availabilities(chunk, users, seen, today, report):
+    unknown = {row['username'] for _, row in chunk} - users.keys()
+    if unknown:
+        for user in db.session.execute(
+            select(User.id, User.username, User.is_admin).where(User.username.in_(unknown))
+        ):
+            users[user.username] = None if user.is_admin else user.id
+
+    valid = []
+    for line, row in chunk:
+        user_id = users.get(row['username'])
+        if user_id is None:
+            _reject(report, line, f"DJ inconnu : {row['username']}")
+            continue
+        try:
+            day = _parse_date(row['date'])
+            is_available = _parse_bool(row.get('is_available', ''))
+            time_slot = TimeSlot.parse(row.get('time_slot') or 'complete') if is_available else None
+        except ValueError as e:
+            _reject(report, line, str(e))
+            continue
+        if day < today:
+            _reject(report, line, f'Date passée : {day}')
+        elif (user_id, day) in seen:
+            _reject(report, line, f"{row['username']} le {day} en double dans le fichier")
+        else:
+            seen.add((user_id, day))
+            valid.append((line, {'user_id': user_id, 'date': day, 'is_available': is_available, 'time_slot': time_slot}))
+    if not valid:
+        return [], {}
+
+    keys = [(row['user_id'], row['date']) for _, row in valid]
+    assigned = set(db.session.execute(
+        select(Assignment.user_id, Assignment.date).where(tuple_(Assignment.user_id, Assignment.date).in_(keys))
+    ).all())
+    existing = {
+        (user_id, day): (availability_id, bool(was_available))
+        for availability_id, user_id, day, was_available in db.session.execute(
+            select(Availability.id, Availability.user_id, Availability.date, Availability.is_available)
+            .where(tuple_(Availability.user_id, Availability.date).in_(keys))
+        )
+    }
+
+    accepted = []
+    for line, row in valid:
+        if (row['user_id'], row['date']) in assigned:
+            _reject(report, line, f"Date déjà assignée : {row['date']}")
+        else:
+            accepted.append(row)
+    return accepted, existing
+
+
+def _write_availabilities(accepted, existing):
+    now = datetime.utcnow()
+    table = Availability.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'date'],
+        set_={
+            'is_available': stmt.excluded.is_available,
+            'time_slot': stmt.excluded.time_slot,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    db.session.execute(stmt, [dict(row, created_at=now, updated_at=now) for row in accepted])
+
+    created_keys = [(row['user_id'], row['date']) for row in accepted if (row['user_id'], row['date']) not in existing]
+    created_ids = {}
+    if created_keys:
+        created_ids = {
+            (user_id, day): availability_id
+            for availability_id, user_id, day in db.session.execute(
+                select(Availability.id, Availability.user_id, Availability.date)
+                .where(tuple_(Availability.user_id, Availability.date).in_(created_keys))
+            )
+        }
+
+    deltas, events = {}, []
+    for row in accepted:
+        key = (row['user_id'], row['date'])
+        previous = existing.get(key)
+        was_available = previous[1] if previous else False
+        month_key = (row['user_id'], row['date'].year, row['date'].month)
+        deltas[month_key] = deltas.get(month_key, 0) + int(row['is_available']) - int(was_available)
+        events.append({
+            'entity': 'availability', 'entity_id': previous[0] if previous else created_ids[key],
+            'kind': 'updated' if previous else 'created', 'date': row['date'], 'user_id': row['user_id'],
+        })
+    apply_availability_days(deltas)
+    record_changes(events)
+
+
+def import_availabilities(lines, dry_run=False, chunk_size=CHUNK_SIZE, today=None):
+    report = _new_report('availabilities', dry_run)
+    today = today or date.today()
+    users, seen = {}, set()
+    for chunk in iter_chunks(lines, 'availabilities', chunk_size):
+        report['rows'] += len(chunk)
+        accepted, existing = _validate_availabilities(chunk, users, seen, today, report)
+        updated = sum(1 for row in accepted if (row['user_id'], row['date']) in existing)
+        report['created'] += len(accepted) - updated
+        report['updated'] += updated
+        if dry_run or not accepted:
+            continue
+        try:
+            _write_availabilities(accepted, existing)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return report
+
+
+def import_csv(kind, lines, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Importer un fichier (users ou availabilities) et renvoyer le rapport"""
+    start = time.perf_counter()
+    if kind == 'users':
+        report = import_users(lines, dry_run, chunk_size)
+    elif kind == 'availabilities':
+        report = import_availabilities(lines, dry_run, chunk_size)
+    else:
+        raise ImportFileError(f"Type d'import inconnu : {kind}")
+    report['errors'].sort(key=lambda error: error['line'])
+    report['elapsed_ms'] = round((time.perf_counter() - start) * 1000)
+    return report
@@ -0,0 +1,175 @@
+"""Brouillon d'auto-assignation persistant, re-calculé par morceaux
+
+Le premier « Auto-assigner » d'un mois résout tout le mois (planner.py)
+et enregistre les suggestions dans draft_plans / draft_suggestions, avec
+la graine du tirage et la position atteinte dans le journal des
+changements. Les appels suivants ne lisent que les événements postérieurs
+et ne re-résolvent que :
+
+- les dates touchées par un événement (dispo ou set créé, modifié, supprimé) ;
+- les dates où est dispo un DJ dont le total du mois (sets existants +
+  suggestions conservées) a bougé : son rang d'équité a changé.
+
+Les autres suggestions restent telles quelles. Le tirage est propre à
+chaque date (graine du brouillon + date) : re-résoudre une date sans
+changement redonne la même suggestion.
+
+Un événement sur un utilisateur (activation, suppression...) ou un
+nouveau tirage demandé par l'admin refait tout le mois.
+"""
+import json
+import random
+from calendar import monthrange
+from datetime import date
+
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db, DraftPlan, DraftSuggestion, ChangeEvent, TimeSlot
+from changelog import latest_sequence
+from availability_index import index as availability_index
+from planner import plan_month, count_sets
+
+
+def _changes_since(plan, first_day, last_day):
+    """(dates du mois touchées depuis le brouillon, True si un utilisateur a changé)"""
+    events = db.session.query(ChangeEvent.entity, ChangeEvent.date).filter(
+        ChangeEvent.id > plan.sequence,
+        db.or_(ChangeEvent.entity == 'user', ChangeEvent.date.between(first_day, last_day))
+    )
+    dates = set()
+    for entity, day in events:
+        if entity == 'user':
+            return dates, True
+        dates.add(day)
+    return dates, False
+
+
+def _create_plan(year, month):
+    """Ligne draft_plans du mois, insérée si absente
+
+    Deux « Auto-assigner » simultanés sur un mois sans brouillon : le second
+    INSERT ne fait rien (ON CONFLICT DO NOTHING) au lieu de heurter
+    unique_draft_plan_month, et les deux relisent la même ligne.
+    """
+    db.session.execute(
+        insert(DraftPlan.__table__)
+        .values(year=year, month=month, seed=random.randrange(2 ** 31))
+        .on_conflict_do_nothing(index_elements=['year', 'month'])
+    )
+    return DraftPlan.query.filter_by(year=year, month=month).one()
+
+
+def _to_row(suggestion):
+    return DraftSuggestion(
+        date=date.fromisoformat(suggestion['date']),
+        user_id=suggestion['dj_id'],
+        time_slot=suggestion['time_slot'],
+        original_slot=suggestion['original_slot'],
+        tarif=suggestion['tarif'],
+        alternatives=json.dumps([{**alt, 'time_slot': alt['time_slot'].key} for alt in suggestion['alternatives']])
+    )
+
+
+def _to_dict(row, names):
+    return {
+        'date': row.date.strftime('%Y-%m-%d'),
+        'date_formatted': row.date.strftime('%A %d/%m'),
+        'dj_id': row.user_id,
+        'dj_name': names.get(row.user_id, '?'),
+        'time_slot': row.time_slot,
+        'original_slot': row.original_slot,
+        'tarif': row.tarif,
+        'alternatives': [{**alt, 'time_slot': TimeSlot.parse(alt['time_slot'])} for alt in json.loads(row.alternatives)]
+    }
+
+
+def _resolve(plan, rows, dates, year, month, available, assigned, start, names):
+    """Re-résoudre des dates du brouillon, les autres suggestions comptant pour l'équité"""
+    planned = {}
+    for d, row in rows.items():
+        if d < start or d in dates:
+            plan.suggestions.remove(row)
+        else:
+            planned[row.user_id] = planned.get(row.user_id, 0) + 1
+    db.session.flush()  # Supprimer avant de ré-insérer les mêmes dates
+    result = plan_month(year, month, available, assigned, start, names=names,
+                        seed=plan.seed, only=dates, planned=planned)
+    for suggestion in result['suggestions']:
+        plan.suggestions.append(_to_row(suggestion))
+    return result
+
+
+def draft_plan(year, month, start, reset=False):
+    """Suggestions du brouillon du mois, mises à jour depuis le journal
+
+    Renvoie un dict : suggestions (par date), total_dates, existing
+    ({user_id: sets existants du mois}), incremental et resolved_dates
+    (dates re-résolues).
+    """
+    first_day = date(year, month, 1)
+    last_day = date(year, month, monthrange(year, month)[1])
+
+    # Position du journal AVANT la lecture : un changement concurrent sera relu
+    sequence = latest_sequence()
+    available, assigned = availability_index.month_view(year, month)
+    names = availability_index.users
+    existing = count_sets(assigned)
+
+    plan = DraftPlan.query.filter_by(year=year, month=month).first()
+    incremental = plan is not None and not reset
+    if incremental:
+        dirty, user_changed = _changes_since(plan, first_day, last_day)
+        incremental = not user_changed
+
+    if incremental:
+        rows = {row.date: row for row in plan.suggestions}
+        old_totals = {int(k): v for k, v in json.loads(plan.existing).items()}
+        for d, row in rows.items():
+            if d >= start:
+                old_totals[row.user_id] = old_totals.get(row.user_id, 0) + 1
+
+        # 1. Dates touchées par un événement
+        result = _resolve(plan, rows, dirty, year, month, available, assigned, start, names)
+
+        # 2. DJs dont le total a bougé : leurs autres dates de dispo sont à revoir
+        new_totals = dict(existing)
+        for d, row in rows.items():
+            if d >= start and d not in dirty:
+                new_totals[row.user_id] = new_totals.get(row.user_id, 0) + 1
+        for suggestion in result['suggestions']:
+            new_totals[suggestion['dj_id']] = new_totals.get(suggestion['dj_id'], 0) + 1
+        moved = {user_id for user_id in old_totals.keys() | new_totals.keys()
+                 if old_totals.get(user_id, 0) != new_totals.get(user_id, 0)}
+        moved_dates = {d for d, djs in available.items()
+                       if d >= start and d not in dirty and not moved.isdisjoint(djs)}
+        if moved_dates:
+            rows = {row.date: row for row in plan.suggestions}
+            _resolve(plan, rows, moved_dates, year, month, available, assigned, start, names)
+
+        fillable = result['fillable']
+        resolved = len(fillable & (dirty | moved_dates))
+    else:
+        if plan is None:
+            plan = _create_plan(year, month)
+        # Brouillon relu après une création concurrente : il a peut-être déjà des suggestions
+        plan.suggestions.clear()
+        db.session.flush()
+        plan.seed = random.randrange(2 ** 31)
+        result = plan_month(year, month, available, assigned, start, names=names, seed=plan.seed)
+        for suggestion in result['suggestions']:
+            plan.suggestions.append(_to_row(suggestion))
+        fillable = result['fillable']
+        resolved = len(fillable)
+
+    plan.sequence = sequence
+    plan.existing = json.dumps(existing)
+    db.session.commit()
+
+    rows = sorted((row for row in plan.suggestions if row.date in fillable), key=lambda row: row.date)
+    return {
+        'suggestions': [_to_dict(row, names) for row in rows],
+        'total_dates': len(fillable),
+        'existing': existing,
+        'incremental': incremental,
+        'resolved_dates': resolved,
+    }
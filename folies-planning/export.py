@@ -0,0 +1,122 @@
+"""Export des disponibilités et des sets sur une période (NDJSON ou CSV)
+
+/admin/api/export?kind=assignments&from=2024-01-01&to=2026-12-31&format=csv
+
+Les lignes sont lues page par page en pagination par clé sur (date, id) :
+chaque page est une requête ``UNION ALL`` tables actives + archives, triée
+et limitée à page_size lignes, qui reprend après la dernière (date, id)
+envoyée. La mémoire reste constante quelle que soit la période, et le nom
+du DJ vient d'une jointure SQL (pas de chargement paresseux par ligne).
+
+Chaque page produit un morceau de réponse : le middleware de compression
+les compresse au fil de l'eau (text/csv et application/x-ndjson). Les
+créneaux sortent en texte ('warmup'), comme dans les autres API.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import or_, select, union_all
+
+from models import db, User, Availability, Assignment, AvailabilityArchive, AssignmentArchive, TimeSlot
+
+PAGE_SIZE = 1000
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+EXPORT_KINDS = {
+    'availabilities': ((Availability, AvailabilityArchive),
+                       ['id', 'date', 'user_id', 'is_available', 'time_slot', 'notes', 'created_at', 'updated_at']),
+    'assignments': ((Assignment, AssignmentArchive),
+                    ['id', 'date', 'user_id', 'time_slot', 'tarif', 'notes', 'created_by', 'created_at', 'updated_at']),
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_columns(kind):
+    _, columns = EXPORT_KINDS[kind]
+    return columns[:3] + ['dj_name'] + columns[3:]
+
+
+def _page_query(kind, start, end, after, page_size):
+    models, columns = EXPORT_KINDS[kind]
+    branches = []
+    for model in models:
+        table = model.__table__
+        conditions = []
+        if start is not None:
+            conditions.append(table.c.date >= start)
+        if end is not None:
+            conditions.append(table.c.date <= end)
+        if after is not None:
+            last_date, last_id = after
+            # Forme date >= x AND (...) : l'index sur date reste utilisable
+            conditions.append(table.c.date >= last_date)
+            conditions.append(or_(table.c.date > last_date, table.c.id > last_id))
+        branch = (
+            select(*[table.c[name] for name in columns], User.dj_name)
+            .select_from(table.outerjoin(User.__table__, User.id == table.c.user_id))
+            .where(*conditions)
+            .order_by(table.c.date, table.c.id)
+            .limit(page_size)
+            .subquery()
+        )
+        # SQLite refuse ORDER BY/LIMIT dans une branche d'UNION : sous-requête
+        branches.append(select(*branch.c))
+    union = union_all(*branches).subquery()
+    return select(*[union.c[name] for name in export_columns(kind)]).order_by(union.c.date, union.c.id).limit(page_size)
+
+
+def iter_pages(kind, start=None, end=None, page_size=PAGE_SIZE):
+    """Pages de lignes (dicts) triées par (date, id), actif + archive"""
+    after = None
+    while True:
+        rows = db.session.execute(_page_query(kind, start, end, after, page_size)).mappings().all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]['date'], rows[-1]['id'])
+
+
+def _value(value):
+    if isinstance(value, TimeSlot):
+        return value.key
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(kind, start=None, end=None, page_size=PAGE_SIZE):
+    columns = export_columns(kind)
+    for rows in iter_pages(kind, start, end, page_size):
+        yield ''.join(
+            _encode({name: _value(row[name]) for name in columns}) + '\n'
+            for row in rows
+        )
+
+
+def iter_csv(kind, start=None, end=None, page_size=PAGE_SIZE):
+    columns = export_columns(kind)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in iter_pages(kind, start, end, page_size):
+        writer.writerows([_value(row[name]) for name in columns] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # Période vide : l'en-tête seul
+
+
+def export_stream(kind, fmt, start=None, end=None, page_size=PAGE_SIZE):
+    if fmt == 'csv':
+        return iter_csv(kind, start, end, page_size)
+    return iter_ndjson(kind, start, end, page_size)
@@ -0,0 +1,121 @@
+"""Création de l'application Flask
+
+create_app()     : application web complète (blueprints, login, logs, bootstrap DB)
+create_cli_app() : contexte léger pour le cron et les scripts (config + DB + mail)
+
+Les dépendances lourdes (ReportLab) sont importées à la demande par les
+routes qui en ont besoin : ni le cron ni le démarrage d'un worker ne les
+chargent.
+"""
+import logging
+
+from flask import Flask, current_app
+from flask_login import LoginManager
+
+from config import Config
+from models import db, User, TimeSlot
+from notifications import mail
+from commands import register_commands
+from user_cache import get_user
+from assets import init_assets
+from compression import CompressionMiddleware
+from metrics import init_metrics
+from logs import configure_logging, init_request_ids, AUTH_LOGGER
+from profiling import init_profiling
+from passwords import init_passwords
+
+logger = logging.getLogger(__name__)
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
+login_manager.login_message = 'Connectez-vous pour accéder à cette page.'
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return get_user(int(user_id), ttl=current_app.config['USER_CACHE_TTL'])
+
+
+def create_cli_app(config_object=Config):
+    """Application minimale pour le cron, les migrations et les commandes flask"""
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+
+    db.init_app(app)
+    mail.init_app(app)
+    init_passwords(app)
+    register_commands(app)
+    # Templates (pages et emails du cron) : comparer les créneaux à TimeSlot.WARMUP...
+    app.jinja_env.globals['TimeSlot'] = TimeSlot
+
+    return app
+
+
+def create_app(config_object=Config):
+    """Application web complète"""
+    app = create_cli_app(config_object)
+
+    # Avant le premier accès à app.logger : Flask n'ajoute alors pas son handler stderr
+    configure_logging(
+        level=app.config['LOG_LEVEL'],
+        auth_log=None if app.debug or app.testing else app.config['AUTH_LOG_FILE'],
+        auth_logger=AUTH_LOGGER
+    )
+    init_request_ids(app)
+    login_manager.init_app(app)
+    init_assets(app)
+    init_metrics(app)
+    init_profiling(app)
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config['COMPRESSION_MIN_SIZE'],
+        level=app.config['COMPRESSION_LEVEL']
+    )
+
+    from views.auth import auth_bp
+    from views.dj import dj_bp
+    from views.admin import admin_bp
+    from views.planning import planning_bp
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(dj_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(planning_bp)
+
+    app.logger.info('LES FOLIES Planning startup')
+
+    with app.app_context():
+        bootstrap_database()
+
+    return app
+
+
+def bootstrap_database():
+    """Création de la base de données et admin par défaut"""
+    from migrations import stamp_head, pending_migrations
+
+    # Base neuve : create_all produit directement le schéma à jour
+    is_new_database = not db.inspect(db.engine).has_table(User.__tablename__)
+    if not is_new_database:
+        # Les modèles suivent le schéma à jour : la moindre requête échouerait (colonne absente)
+        pending = pending_migrations()
+        if pending:
+            versions = ', '.join(str(version) for version, _, _ in pending)
+            raise RuntimeError(f"Migrations en attente ({versions}) : lancer python migrate_db.py avant de démarrer")
+    db.create_all()
+    if is_new_database:
+        stamp_head()
+
+    # Créer l'admin si inexistant
+    if not User.query.filter_by(username=Config.DEFAULT_ADMIN_USERNAME).first():
+        admin = User(
+            username=Config.DEFAULT_ADMIN_USERNAME,
+            email='admin@lesfolies.com',
+            dj_name='Administrateur',
+            is_admin=True,
+            phone='+33 6 00 00 00 00'
+        )
+        admin.set_password(Config.DEFAULT_ADMIN_PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+        logger.info("Admin créé : %s / %s", Config.DEFAULT_ADMIN_USERNAME, Config.DEFAULT_ADMIN_PASSWORD)
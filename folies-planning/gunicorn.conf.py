@@ -0,0 +1,31 @@
+"""Configuration gunicorn (chargée automatiquement : gunicorn app:app)
+
+Seuls les hooks des métriques Prometheus et des logs sont définis ici ;
+workers, threads et bind restent passés en ligne de commande.
+
+Les workers pré-forkés écrivent leurs métriques dans PROMETHEUS_MULTIPROC_DIR :
+le dossier est vidé au démarrage du master, et les fichiers d'un worker
+mort sont marqués pour que ses gauges ne comptent plus (voir metrics.py).
+"""
+import os
+import shutil
+
+multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/folies-planning-metrics')
+# Avec --preload, l'application (et ses métriques) est chargée avant on_starting
+os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Avec --preload, le thread d'écriture des logs (logs.py) ne survit pas au fork
+    from logs import restart_listener
+    restart_listener()
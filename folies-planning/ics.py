@@ -0,0 +1,131 @@
+"""Flux iCalendar des sets d'un DJ (/dj/<token>/sets.ics)
+
+Les applis calendrier interrogent le flux très souvent. La version du flux
+est la dernière séquence du journal des changements concernant les
+assignments du DJ (changelog.latest_user_sequence) : une requête indexée.
+
+- ETag fort dérivé de cette version (suffixé -gzip/-br par la compression) :
+  If-None-Match renvoie un 304 sans toucher aux assignments ;
+- corps sérialisé gardé en mémoire par DJ tant que la version ne change
+  pas ;
+- sinon, génération en streaming (les longs historiques ne sont jamais
+  chargés d'un bloc), le corps complet est mis en cache à la fin.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from models import TimeSlot
+from archive import iter_assignment_history
+from changelog import latest_user_sequence
+from metrics import cache_lookup
+
+# À incrémenter quand le format généré change (invalide ETags et cache)
+FEED_FORMAT = 1
+MAX_CACHED_FEEDS = 1000
+
+# Horaires des créneaux : la soirée du jour J se joue dans la nuit de J à J+1
+SLOT_HOURS = {
+    TimeSlot.COMPLETE: (0, 6, 'Soirée complète'),
+    TimeSlot.WARMUP: (0, 2, 'Warm-up'),
+    TimeSlot.PEAKTIME: (2, 6, 'Peak time'),
+    TimeSlot.PEAKTIME_DUO: (2, 6, 'Peak time à 2'),
+}
+
+_feeds = {}
+_lock = threading.Lock()
+
+
+def feed_version(user_id):
+    return latest_user_sequence(user_id, 'assignment')
+
+
+def feed_etag(user_id, version):
+    return f'ics-{FEED_FORMAT}-{user_id}-{version}'
+
+
+def cached_feed(user_id, version):
+    entry = _feeds.get(user_id)
+    hit = entry is not None and entry[0] == version
+    cache_lookup('ics', hit)
+    return entry[1] if hit else None
+
+
+def _store(user_id, version, body):
+    with _lock:
+        _feeds.pop(user_id, None)
+        if len(_feeds) >= MAX_CACHED_FEEDS:
+            _feeds.pop(next(iter(_feeds)))
+        _feeds[user_id] = (version, body)
+
+
+def _escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _line(content):
+    """Ligne iCalendar pliée à 75 octets (RFC 5545 §3.1)"""
+    data = content.encode('utf-8')
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # Ne pas couper au milieu d'un caractère UTF-8
+        while cut and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+    parts.append(data)
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def _event(assignment, stamp):
+    start_hour, end_hour, label = SLOT_HOURS[assignment.time_slot]
+    night = datetime.combine(assignment.date + timedelta(days=1), datetime.min.time())
+    start = night + timedelta(hours=start_hour)
+    end = night + timedelta(hours=end_hour)
+    updated = assignment.updated_at or assignment.created_at or stamp
+
+    description = f'{label} — {assignment.tarif or 0}€'
+    if assignment.notes:
+        description += f'\n{assignment.notes}'
+
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:assignment-{assignment.id}@planning.lesfolies',
+        f"DTSTAMP:{updated.strftime('%Y%m%dT%H%M%SZ')}",
+        # Heure locale flottante : affichée à l'heure du téléphone (Lille)
+        f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+        f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}",
+        f'SUMMARY:{_escape(f"LES FOLIES - {label}")}',
+        f'DESCRIPTION:{_escape(description)}',
+        'LOCATION:LES FOLIES\\, Lille',
+        'END:VEVENT',
+    ]
+    return b''.join(_line(line) for line in lines)
+
+
+def generate_feed(user, batch_size=500):
+    """Corps du flux, morceau par morceau (un VEVENT par set)"""
+    stamp = datetime.utcnow()
+    yield b''.join(_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//LES FOLIES//Planning DJ//FR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(f"LES FOLIES - {user.dj_name}")}',
+        'X-PUBLISHED-TTL:PT1H',
+    ])
+    for assignment in iter_assignment_history(user.id, batch_size):
+        yield _event(assignment, stamp)
+    yield _line('END:VCALENDAR')
+
+
+def stream_and_cache(user, version):
+    """Streamer le flux et le mettre en cache une fois complet"""
+    user_id = user.id
+    chunks = []
+    for chunk in generate_feed(user):
+        chunks.append(chunk)
+        yield chunk
+    _store(user_id, version, b''.join(chunks))
@@ -0,0 +1,169 @@
+"""Flux en direct des changements du planning (Server-Sent Events)
+
+Un broker pub/sub en mémoire diffuse les changements (dispo modifiée,
+assignation créée ou retirée) aux onglets admin abonnés à un mois donné.
+Un onglet inactif ne coûte qu'une connexion ouverte et un keep-alive :
+aucune requête SQL, aucun re-rendu du dashboard.
+
+Les événements viennent du journal des changements (changelog.py), lu par
+une seule tâche de fond par process : un changement fait dans un autre
+worker gunicorn (ou par le cron) est donc diffusé lui aussi.
+
+Note déploiement : chaque connexion SSE reste ouverte, il faut donc des
+workers gunicorn threadés (``--worker-class gthread --threads N``).
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+from models import db
+from changelog import changes_since, latest_sequence
+
+logger = logging.getLogger(__name__)
+
+# Nombre max d'événements en attente par abonné avant de le considérer en retard
+SUBSCRIBER_QUEUE_SIZE = 100
+# Intervalle des commentaires keep-alive (secondes)
+KEEPALIVE_SECONDS = 15
+# Intervalle de lecture du journal par la tâche de fond (secondes)
+POLL_SECONDS = 1.0
+
+
+class ChangeBroker:
+    """Pub/sub en mémoire : une file par abonné, regroupées par (année, mois)"""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, year, month):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault((year, month), set()).add(q)
+        return q
+
+    def unsubscribe(self, year, month, q):
+        with self._lock:
+            subscribers = self._subscribers.get((year, month))
+            if subscribers:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._subscribers[(year, month)]
+
+    def subscriber_count(self, year=None, month=None):
+        with self._lock:
+            if year is None:
+                return sum(len(s) for s in self._subscribers.values())
+            return len(self._subscribers.get((year, month), ()))
+
+    def publish(self, year, month, event):
+        """Diffuser un événement à tous les abonnés du mois (sérialisé une seule fois)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get((year, month), ()))
+        if not subscribers:
+            return 0
+
+        payload = json.dumps(event)
+        for q in subscribers:
+            try:
+                q.put_nowait(payload)
+            except queue.Full:
+                # Abonné trop lent : on vide sa file et on lui demande de recharger
+                _drain(q)
+                q.put_nowait(None)
+        return len(subscribers)
+
+
+def _drain(q):
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def sse_stream(broker, year, month, keepalive=KEEPALIVE_SECONDS):
+    """Générateur SSE pour un abonné ; se désabonne à la fermeture de la connexion"""
+    q = broker.subscribe(year, month)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                payload = q.get(timeout=keepalive)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if payload is None:
+                yield 'event: resync\ndata: {}\n\n'
+                continue
+            yield f'event: change\ndata: {payload}\n\n'
+    finally:
+        broker.unsubscribe(year, month, q)
+
+
+class ChangeFeedPoller:
+    """Tâche de fond unique par process : lit le journal et alimente le broker
+
+    Le journal n'est lu que s'il y a des abonnés ; sans abonné, le curseur
+    est simplement recalé sur la dernière séquence au prochain réveil.
+    """
+
+    def __init__(self, broker, handler, interval=POLL_SECONDS):
+        self.app = None
+        self.broker = broker
+        self.handler = handler
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self._cursor = None
+
+    def ensure_started(self, app):
+        """Démarrer la tâche si besoin (appelé depuis la route, avec un app context)"""
+        with self._lock:
+            self.app = app
+            # Curseur calé sur le journal au moment où le premier abonné arrive
+            if self._cursor is None:
+                self._cursor = latest_sequence()
+            # Démarrage paresseux : un thread créé avant le fork gunicorn ne survivrait pas
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self.broker.subscriber_count():
+                with self._lock:
+                    self._cursor = None
+                continue
+            with self.app.app_context():
+                try:
+                    with self._lock:
+                        if self._cursor is None:
+                            self._cursor = latest_sequence()
+                        cursor = self._cursor
+                    events = changes_since(cursor)
+                    if events:
+                        with self._lock:
+                            self._cursor = events[-1].id
+                        self.handler(events)
+                except Exception:
+                    logger.exception("Erreur lecture du journal (flux live)")
+                finally:
+                    db.session.remove()
+
+
+broker = ChangeBroker()
+
+
+def publish_change(kind, day_date, **data):
+    """Publier un changement sur le mois concerné
+
+    kind : '<entité>_<type>' du journal, ex. 'availability_updated', 'assignment_deleted'
+    """
+    event = {'kind': kind, 'date': day_date.isoformat()}
+    event.update(data)
+    return broker.publish(day_date.year, day_date.month, event)
@@ -0,0 +1,175 @@
+"""Logs structurés (JSON) et non bloquants
+
+Tous les loggers passent par un QueueHandler : le thread appelant (requête,
+envoi d'email, cron) ne fait que poser l'enregistrement dans une file, et un
+QueueListener écrit sur stdout (une ligne JSON par log) et dans le log des
+connexions lu par fail2ban (format texte inchangé).
+
+Chaque ligne porte un request_id : celui de la requête HTTP (en-tête
+X-Request-ID reçu ou généré, renvoyé dans la réponse), propagé aux threads
+d'envoi d'email lancés par spawn() ; le cron utilise un identifiant cron-xxxx.
+"""
+import atexit
+import copy
+import contextvars
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, request
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributs standards d'un LogRecord : tout le reste vient de extra={...}
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'taskName'}
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_TRACEBACK = logging.Formatter()
+
+# Logger des connexions : seul à alimenter le fichier lu par fail2ban
+AUTH_LOGGER = 'auth'
+
+_listener = None
+_listener_args = None  # (file, handlers) : pour recréer le listener après un fork
+
+
+class RequestIdFilter(logging.Filter):
+    """Attache le request_id courant, lu sur le thread qui émet le log"""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Message figé et trace mise en texte côté appelant ; les champs extra restent séparés
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level='INFO', auth_log=None, auth_logger=None):
+    """Brancher la file de logs (une seule fois par processus)
+
+    auth_log : fichier des connexions (fail2ban), alimenté par le logger auth_logger.
+    """
+    global _listener, _listener_args
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    handlers = [stream]
+
+    if auth_log:
+        file_handler = RotatingFileHandler(auth_log, maxBytes=10240000, backupCount=10)
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+        ))
+        file_handler.setLevel(logging.INFO)
+        if auth_logger:
+            file_handler.addFilter(logging.Filter(auth_logger))
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener_args = (log_queue, handlers)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+
+
+def _stop_listener():
+    """Vider la file puis arrêter le thread d'écriture (à la sortie du processus)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def restart_listener():
+    """Nouveau thread d'écriture après un fork (gunicorn --preload), mêmes file et handlers
+
+    Le thread du listener hérité n'existe pas dans le processus enfant.
+    """
+    global _listener
+    if _listener_args is not None:
+        log_queue, handlers = _listener_args
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def new_request_id(prefix=''):
+    rid = prefix + uuid.uuid4().hex[:16]
+    request_id.set(rid)
+    return rid
+
+
+def spawn(target, *args):
+    """Thread d'arrière-plan qui garde le request_id de l'appelant"""
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target, *args))
+    thread.start()
+    return thread
+
+
+def _start_request():
+    incoming = request.headers.get('X-Request-ID', '')
+    if _VALID_REQUEST_ID.match(incoming):
+        request_id.set(incoming)
+        g.request_id = incoming
+    else:
+        g.request_id = new_request_id()
+
+
+def _tag_response(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+
+def _end_request(exc):
+    request_id.set(None)
+
+
+def init_request_ids(app):
+    """Un request_id par requête, renvoyé dans l'en-tête X-Request-ID"""
+    app.before_request(_start_request)
+    app.after_request(_tag_response)
+    app.teardown_request(_end_request)
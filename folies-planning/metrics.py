@@ -0,0 +1,175 @@
+"""Métriques Prometheus exposées sur /metrics
+
+- latence des requêtes HTTP par endpoint (histogramme) et nombre de réponses par statut ;
+- requêtes SQL : nombre par endpoint et durée (histogramme) ;
+- emails : file d'envoi en cours, envoyés, échecs ;
+- caches (utilisateur connecté, flux ICS) : hits et misses ;
+- temps de calcul de l'auto-assignation et de génération des PDF ;
+- hachage des mots de passe : durée (attente dans le pool comprise) et refus quand le pool est plein ;
+- taille du fichier SQLite, lue au scrape, et nombre de lignes par table, recompté au
+  plus toutes les METRICS_ROW_COUNT_TTL secondes (un COUNT(*) parcourt toute la table).
+
+Sous gunicorn (pré-fork), chaque worker écrit ses valeurs dans
+PROMETHEUS_MULTIPROC_DIR et /metrics agrège tous les workers
+(voir gunicorn.conf.py, qui prépare ce dossier et nettoie les workers morts).
+Sans cette variable (serveur de développement), les valeurs restent en mémoire.
+
+Si METRICS_TOKEN est défini, /metrics exige ``Authorization: Bearer <token>``.
+Sinon, seules les requêtes directes depuis la machine (127.0.0.1, ::1, sans
+X-Forwarded-For : un reverse proxy local ne suffit pas) sont servies, les
+autres reçoivent un 404.
+"""
+import hmac
+import os
+import threading
+import time
+
+from flask import Response, abort, current_app, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+from models import db
+
+REQUEST_LATENCY = Histogram(
+    'folies_http_request_duration_seconds', 'Durée des requêtes HTTP', ['endpoint', 'method'])
+REQUESTS = Counter(
+    'folies_http_requests_total', 'Requêtes HTTP', ['endpoint', 'method', 'status'])
+DB_QUERIES = Counter(
+    'folies_db_queries_total', 'Requêtes SQL exécutées', ['endpoint'])
+DB_QUERY_DURATION = Histogram(
+    'folies_db_query_duration_seconds', 'Durée des requêtes SQL',
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5))
+EMAIL_QUEUE = Gauge(
+    'folies_email_queue_depth', 'Emails en attente d\'envoi', multiprocess_mode='livesum')
+EMAILS_SENT = Counter('folies_emails_sent_total', 'Emails envoyés')
+EMAIL_FAILURES = Counter('folies_email_failures_total', 'Emails en échec')
+CACHE_REQUESTS = Counter(
+    'folies_cache_requests_total', 'Lectures de cache', ['cache', 'result'])
+AUTO_ASSIGN_DURATION = Histogram(
+    'folies_auto_assign_seconds', 'Calcul des suggestions d\'auto-assignation', ['mode'])
+PDF_DURATION = Histogram(
+    'folies_pdf_generation_seconds', 'Génération du PDF du planning',
+    buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10))
+PASSWORD_HASH_DURATION = Histogram(
+    'folies_password_hash_seconds', 'Hachage / vérification de mot de passe, attente comprise', ['operation'],
+    buckets=(.025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+PASSWORD_HASH_REJECTED = Counter(
+    'folies_password_hash_rejected_total', 'Hachages refusés (pool saturé)')
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def _endpoint():
+    """Endpoint Flask courant (hors requête : cron, commandes)"""
+    try:
+        return request.endpoint or 'unknown'
+    except RuntimeError:
+        return 'none'
+
+
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1'}
+
+_row_counts = {'at': None, 'counts': []}  # Dernier comptage (par processus)
+_row_counts_lock = threading.Lock()
+
+
+def _count_rows():
+    inspector = db.inspect(db.engine)
+    return [(table.name, db.session.execute(db.select(db.func.count()).select_from(table)).scalar())
+            for table in db.metadata.sorted_tables if inspector.has_table(table.name)]
+
+
+def table_row_counts(ttl):
+    """Lignes par table, recomptées au plus toutes les ttl secondes"""
+    with _row_counts_lock:
+        now = time.monotonic()
+        if _row_counts['at'] is None or now - _row_counts['at'] >= ttl:
+            _row_counts.update(at=now, counts=_count_rows())
+        return _row_counts['counts']
+
+
+class DatabaseCollector:
+    """Taille du fichier SQLite (à chaque scrape) et lignes par table (cache de ttl secondes)"""
+
+    def __init__(self, row_count_ttl=300):
+        self.row_count_ttl = row_count_ttl
+
+    def collect(self):
+        path = db.engine.url.database
+        if db.engine.url.get_backend_name() == 'sqlite' and path and path != ':memory:':
+            size = GaugeMetricFamily('folies_db_size_bytes', 'Taille des fichiers SQLite', labels=['file'])
+            for suffix in ('', '-wal'):
+                if os.path.exists(path + suffix):
+                    size.add_metric([os.path.basename(path + suffix)], os.path.getsize(path + suffix))
+            yield size
+
+        rows = GaugeMetricFamily('folies_table_rows', 'Lignes par table', labels=['table'])
+        for table, count in table_row_counts(self.row_count_ttl):
+            rows.add_metric([table], count)
+        yield rows
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _observe_request(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        endpoint = request.endpoint or 'unknown'
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERY_DURATION.observe(time.perf_counter() - conn.info['metrics_start'].pop())
+    DB_QUERIES.labels(_endpoint()).inc()
+
+
+def _handle_error(context):
+    # Requête en échec : after_cursor_execute ne sera pas appelé
+    if context.connection is not None and context.connection.info.get('metrics_start'):
+        context.connection.info['metrics_start'].pop()
+
+
+def _authorized():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    return request.remote_addr in LOOPBACK_ADDRESSES and 'X-Forwarded-For' not in request.headers
+
+
+def metrics_view():
+    if not _authorized():
+        abort(401 if current_app.config.get('METRICS_TOKEN') else 404)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    database = CollectorRegistry(auto_describe=False)
+    database.register(DatabaseCollector(current_app.config['METRICS_ROW_COUNT_TTL']))
+
+    return Response(generate_latest(registry) + generate_latest(database), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Brancher la mesure des requêtes HTTP et SQL, et exposer /metrics"""
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.engine, 'handle_error', _handle_error)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
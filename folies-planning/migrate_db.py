@@ -1,35 +1,37 @@
-from app import app, db
-from models import Availability, Assignment, calculate_tarif
-
-with app.app_context():
-    # Ajouter les colonnes manquantes
-    try:
-        db.session.execute(db.text('ALTER TABLE availabilities ADD COLUMN time_slot VARCHAR(20) DEFAULT "complete"'))
-        print("✅ Colonne time_slot ajoutée à availabilities")
-    except Exception as e:
-        print(f"⚠️ Colonne time_slot existe déjà dans availabilities: {e}")
-    
-    try:
-        db.session.execute(db.text('ALTER TABLE assignments ADD COLUMN time_slot VARCHAR(20) DEFAULT "complete"'))
-        print("✅ Colonne time_slot ajoutée à assignments")
-    except Exception as e:
-        print(f"⚠️ Colonne time_slot existe déjà dans assignments: {e}")
-    
-    try:
-        db.session.execute(db.text('ALTER TABLE assignments ADD COLUMN tarif INTEGER DEFAULT 0'))
-        print("✅ Colonne tarif ajoutée à assignments")
-    except Exception as e:
-        print(f"⚠️ Colonne tarif existe déjà dans assignments: {e}")
-    
-    db.session.commit()
-    
-    # Mettre à jour les tarifs existants
-    assignments = Assignment.query.all()
-    for assignment in assignments:
-        if not assignment.time_slot:
-            assignment.time_slot = 'complete'
-        if not assignment.tarif:
-            assignment.tarif = calculate_tarif(assignment.date, assignment.time_slot)
-    
-    db.session.commit()
-    print(f"✅ Migration terminée ! {len(assignments)} assignments mis à jour.")
+#!/usr/bin/env python3
+"""
+Appliquer les migrations de la base (voir migrations.py)
+
+Usage :
+    python migrate_db.py                  # appliquer les migrations en attente
+    python migrate_db.py --status         # version actuelle et migrations en attente
+    python migrate_db.py --chunk-size 500 # taille des lots de backfill
+
+Une migration interrompue reprend au dernier lot validé si on relance le script.
+"""
+import argparse
+
+from factory import create_cli_app
+from migrations import run_migrations, current_version, pending_migrations, DEFAULT_CHUNK_SIZE
+
+app = create_cli_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help='Afficher la version sans migrer')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--target', type=int, help='Version maximale à appliquer')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.status:
+            print(f"📦 Version actuelle : {current_version()}")
+            for version, name, _ in pending_migrations():
+                print(f"   ⏳ {version} : {name}")
+            return
+        run_migrations(chunk_size=args.chunk_size, target=args.target)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,493 @@
+"""Migrations versionnées de la base
+
+Chaque migration a un numéro de version et n'est appliquée qu'une fois :
+la table schema_version garde la trace des versions appliquées.
+
+Les migrations de données (backfills) avancent par lots paginés sur l'id
+(keyset, ``WHERE id > :dernier_id``) avec un commit par lot : la mémoire
+reste constante et le verrou d'écriture SQLite est relâché entre deux
+lots. La position atteinte est enregistrée dans migration_progress dans la
+même transaction que le lot : une migration interrompue reprend là où elle
+s'était arrêtée.
+
+Les migrations n'utilisent que du SQL brut : elles doivent rester valables
+même quand les modèles SQLAlchemy auront évolué.
+"""
+from datetime import date, datetime
+
+from models import db, calculate_tarif, TimeSlot
+
+DEFAULT_CHUNK_SIZE = 1000
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Enregistrer une migration (fonction recevant un MigrationContext)"""
+    def decorator(func):
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+
+def _execute(sql, params=None):
+    return db.session.execute(db.text(sql), params or {})
+
+
+def ensure_version_tables():
+    _execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+    _execute("""
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    db.session.commit()
+
+
+def applied_versions():
+    ensure_version_tables()
+    return {row[0] for row in _execute('SELECT version FROM schema_version')}
+
+
+def current_version():
+    return max(applied_versions(), default=0)
+
+
+def head_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def pending_migrations():
+    applied = applied_versions()
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+
+def _mark_applied(version, name):
+    _execute('INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)',
+             {'v': version, 'n': name, 't': datetime.utcnow()})
+    _execute('DELETE FROM migration_progress WHERE version = :v', {'v': version})
+    db.session.commit()
+
+
+def stamp_head():
+    """Base neuve créée par create_all : toutes les migrations sont déjà reflétées"""
+    for version, name, _ in pending_migrations():
+        _mark_applied(version, name)
+
+
+class MigrationContext:
+    """Outils mis à disposition d'une migration"""
+
+    def __init__(self, version, chunk_size=DEFAULT_CHUNK_SIZE, log=print):
+        self.version = version
+        self.chunk_size = chunk_size
+        self.log = log
+
+    def execute(self, sql, params=None):
+        return _execute(sql, params)
+
+    def table_exists(self, table):
+        row = _execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :t", {'t': table}).first()
+        return row is not None
+
+    def column_exists(self, table, column):
+        return any(row[1] == column for row in _execute(f'PRAGMA table_info({table})'))
+
+    def add_column(self, table, column, ddl):
+        """ALTER TABLE idempotent"""
+        if self.column_exists(table, column):
+            self.log(f"   ⏭️ {table}.{column} existe déjà")
+            return
+        _execute(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+        db.session.commit()
+        self.log(f"   ✅ Colonne {column} ajoutée à {table}")
+
+    def execute_atomic(self, statements):
+        """Plusieurs ordres (DDL compris) dans une seule transaction SQLite
+
+        pysqlite n'ouvre de transaction qu'avant un INSERT/UPDATE/DELETE : un
+        DROP TABLE ou un ALTER TABLE isolé est validé tout seul. La connexion
+        passe en mode manuel (isolation_level = None) le temps d'un
+        BEGIN ... COMMIT explicite.
+        """
+        db.session.commit()
+        raw = db.session.connection().connection.dbapi_connection
+        previous = raw.isolation_level
+        raw.isolation_level = None
+        try:
+            cursor = raw.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+        finally:
+            raw.isolation_level = previous
+
+    def _progress(self):
+        row = _execute('SELECT last_id FROM migration_progress WHERE version = :v', {'v': self.version}).first()
+        return row[0] if row else 0
+
+    def backfill(self, label, select_sql, process_chunk, count_sql=None):
+        """Backfill par lots paginés sur l'id, un commit par lot, reprise possible
+
+        select_sql : SELECT dont la première colonne est ``id``, avec la condition
+                     ``id > :last_id`` et ``ORDER BY id LIMIT :limit``.
+        process_chunk(rows) : écrit le lot (sans commit).
+        """
+        last_id = self._progress()
+        if last_id:
+            self.log(f"   ↩️ Reprise de « {label} » après l'id {last_id}")
+        total = _execute(count_sql, {'last_id': last_id}).scalar() if count_sql else None
+
+        done = 0
+        while True:
+            rows = _execute(select_sql, {'last_id': last_id, 'limit': self.chunk_size}).fetchall()
+            if not rows:
+                break
+            process_chunk(rows)
+            last_id = rows[-1][0]
+            _execute("""
+                INSERT INTO migration_progress (version, last_id) VALUES (:v, :l)
+                ON CONFLICT(version) DO UPDATE SET last_id = excluded.last_id
+            """, {'v': self.version, 'l': last_id})
+            db.session.commit()
+
+            done += len(rows)
+            if total:
+                self.log(f"   ⏳ {label} : {done}/{total} ({done * 100 // total}%)")
+            else:
+                self.log(f"   ⏳ {label} : {done} lignes")
+        return done
+
+
+def run_migrations(chunk_size=DEFAULT_CHUNK_SIZE, target=None, log=print):
+    """Appliquer les migrations en attente, dans l'ordre des versions"""
+    pending = [m for m in pending_migrations() if target is None or m[0] <= target]
+    if not pending:
+        log(f"✅ Base à jour (version {current_version()})")
+        return []
+
+    applied = []
+    for version, name, func in pending:
+        log(f"🔧 Migration {version} : {name}")
+        try:
+            func(MigrationContext(version, chunk_size, log))
+        except Exception:
+            db.session.rollback()
+            log(f"❌ Migration {version} interrompue (relancer pour reprendre)")
+            raise
+        _mark_applied(version, name)
+        applied.append(version)
+    log(f"✅ Base migrée en version {current_version()}")
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Migrations
+# ---------------------------------------------------------------------------
+
+@migration(1, 'Colonnes time_slot et tarif')
+def add_time_slot_and_tarif(ctx):
+    ctx.add_column('availabilities', 'time_slot', "VARCHAR(20) DEFAULT 'complete'")
+    ctx.add_column('assignments', 'time_slot', "VARCHAR(20) DEFAULT 'complete'")
+    ctx.add_column('assignments', 'tarif', 'INTEGER DEFAULT 0')
+
+
+@migration(2, 'Backfill des tarifs des assignments')
+def backfill_assignment_tarifs(ctx):
+    condition = '(time_slot IS NULL OR tarif IS NULL OR tarif = 0)'
+
+    def process(rows):
+        updates = []
+        for assignment_id, day, time_slot in rows:
+            time_slot = time_slot or 'complete'
+            updates.append({
+                'id': assignment_id,
+                'time_slot': time_slot,
+                'tarif': calculate_tarif(date.fromisoformat(str(day)), TimeSlot.parse(time_slot))
+            })
+        # executemany : une seule instruction préparée pour tout le lot
+        ctx.execute('UPDATE assignments SET time_slot = :time_slot, tarif = :tarif WHERE id = :id', updates)
+
+    ctx.backfill(
+        'tarifs',
+        f'SELECT id, date, time_slot FROM assignments WHERE id > :last_id AND {condition} ORDER BY id LIMIT :limit',
+        process,
+        count_sql=f'SELECT COUNT(*) FROM assignments WHERE id > :last_id AND {condition}'
+    )
+
+
+@migration(3, 'Tables change_events, change_cursors et dj_month_stats')
+def create_log_and_stats_tables(ctx):
+    from models import ChangeEvent, ChangeCursor, DjMonthStats
+    for model in (ChangeEvent, ChangeCursor, DjMonthStats):
+        model.__table__.create(db.session.connection(), checkfirst=True)
+    db.session.commit()
+
+
+@migration(4, 'Calcul initial de dj_month_stats')
+def build_dj_month_stats(ctx):
+    if ctx.execute('SELECT 1 FROM dj_month_stats LIMIT 1').first():
+        ctx.log('   ⏭️ dj_month_stats déjà remplie')
+        return
+
+    # Agrégation en SQL, mois par mois de l'historique, un commit par mois
+    months = ctx.execute("""
+        SELECT DISTINCT CAST(strftime('%Y', date) AS INTEGER), CAST(strftime('%m', date) AS INTEGER)
+        FROM (SELECT date FROM assignments UNION SELECT date FROM availabilities)
+        ORDER BY 1, 2
+    """).fetchall()
+    for index, (year, month) in enumerate(months, 1):
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        ctx.execute("""
+            INSERT INTO dj_month_stats (user_id, year, month, sets_complete, sets_warmup, sets_peaktime,
+                                        sets_peaktime_duo, availability_days, total_tarif)
+            SELECT user_id, :year, :month,
+                   SUM(complete), SUM(warmup), SUM(peaktime), SUM(peaktime_duo), SUM(avail), SUM(tarif)
+            FROM (
+                SELECT user_id,
+                       CASE WHEN time_slot = 'complete' THEN 1 ELSE 0 END AS complete,
+                       CASE WHEN time_slot = 'warmup' THEN 1 ELSE 0 END AS warmup,
+                       CASE WHEN time_slot = 'peaktime' THEN 1 ELSE 0 END AS peaktime,
+                       CASE WHEN time_slot = 'peaktime_duo' THEN 1 ELSE 0 END AS peaktime_duo,
+                       0 AS avail, COALESCE(tarif, 0) AS tarif
+                FROM assignments WHERE date >= :start AND date < :end
+                UNION ALL
+                SELECT user_id, 0, 0, 0, 0, 1, 0
+                FROM availabilities WHERE date >= :start AND date < :end AND is_available = 1
+            )
+            GROUP BY user_id
+        """, {'year': year, 'month': month, 'start': start.isoformat(), 'end': end.isoformat()})
+        db.session.commit()
+        ctx.log(f"   ⏳ dj_month_stats : {index}/{len(months)} mois")
+
+
+def _backfill_ics_tokens(ctx):
+    """Token ICS pour les comptes qui n'en ont pas (les nouveaux le reçoivent à la création)"""
+    from models import new_ics_token
+    ctx.backfill(
+        'users.ics_token',
+        'SELECT id FROM users WHERE id > :last_id AND ics_token IS NULL ORDER BY id LIMIT :limit',
+        lambda rows: ctx.execute('UPDATE users SET ics_token = :token WHERE id = :id',
+                                 [{'id': row[0], 'token': new_ics_token()} for row in rows]),
+        count_sql='SELECT COUNT(*) FROM users WHERE id > :last_id AND ics_token IS NULL'
+    )
+
+
+@migration(5, 'Lien du flux ICS des DJs')
+def add_ics_token(ctx):
+    ctx.add_column('users', 'ics_token', 'VARCHAR(64)')
+    ctx.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_users_ics_token ON users (ics_token)')
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_change_event_user_entity ON change_events (user_id, entity, id)')
+    db.session.commit()
+    _backfill_ics_tokens(ctx)
+
+
+@migration(6, 'Tables d\'archive availabilities_archive et assignments_archive')
+def create_archive_tables(ctx):
+    from models import AvailabilityArchive, AssignmentArchive
+    for model in (AvailabilityArchive, AssignmentArchive):
+        model.__table__.create(db.session.connection(), checkfirst=True)
+    db.session.commit()
+
+
+@migration(7, 'Tables draft_plans et draft_suggestions')
+def create_draft_tables(ctx):
+    from models import DraftPlan, DraftSuggestion
+    for model in (DraftPlan, DraftSuggestion):
+        model.__table__.create(db.session.connection(), checkfirst=True)
+    db.session.commit()
+
+
+# Ancienne valeur texte -> SMALLINT (TimeSlot). Une valeur inconnue (-1) fait échouer
+# la contrainte CHECK. NULL reste NULL pour les dispos (indisponible) et vaut
+# « soirée complète » pour les sets, comme dans la migration 2.
+TIME_SLOT_SQL = """CASE {value}
+    WHEN 'complete' THEN 1 WHEN 'warmup' THEN 2 WHEN 'peaktime' THEN 3 WHEN 'peaktime_duo' THEN 4
+    ELSE {otherwise}
+END"""
+NULLABLE_SLOT_TABLES = ('availabilities', 'availabilities_archive')
+
+TIME_SLOT_TABLES = [
+    ('availabilities', """
+        CREATE TABLE availabilities_new (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            is_available BOOLEAN,
+            time_slot SMALLINT,
+            notes VARCHAR(200),
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT unique_user_date_availability UNIQUE (user_id, date),
+            CONSTRAINT check_time_slot CHECK (time_slot IN (1, 2, 3, 4)),
+            FOREIGN KEY(user_id) REFERENCES users (id)
+        )
+    """, ['id', 'user_id', 'date', 'is_available', 'time_slot', 'notes', 'created_at', 'updated_at'], [
+        'CREATE INDEX IF NOT EXISTS idx_availability_date ON availabilities (date)',
+    ]),
+    ('assignments', """
+        CREATE TABLE assignments_new (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            time_slot SMALLINT NOT NULL,
+            tarif INTEGER,
+            notes VARCHAR(200),
+            created_by INTEGER,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT unique_date_timeslot_user_assignment UNIQUE (date, time_slot, user_id),
+            CONSTRAINT check_time_slot CHECK (time_slot IN (1, 2, 3, 4)),
+            FOREIGN KEY(user_id) REFERENCES users (id),
+            FOREIGN KEY(created_by) REFERENCES users (id)
+        )
+    """, ['id', 'user_id', 'date', 'time_slot', 'tarif', 'notes', 'created_by', 'created_at', 'updated_at'], [
+        'CREATE INDEX IF NOT EXISTS idx_assignment_date ON assignments (date)',
+    ]),
+    ('availabilities_archive', """
+        CREATE TABLE availabilities_archive_new (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            is_available BOOLEAN,
+            time_slot SMALLINT,
+            notes VARCHAR(200),
+            created_at DATETIME,
+            updated_at DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            CONSTRAINT check_time_slot CHECK (time_slot IN (1, 2, 3, 4))
+        )
+    """, ['id', 'user_id', 'date', 'is_available', 'time_slot', 'notes', 'created_at', 'updated_at', 'archived_at'], [
+        'CREATE INDEX IF NOT EXISTS idx_availability_archive_user_date ON availabilities_archive (user_id, date)',
+    ]),
+    ('assignments_archive', """
+        CREATE TABLE assignments_archive_new (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            time_slot SMALLINT NOT NULL,
+            tarif INTEGER,
+            notes VARCHAR(200),
+            created_by INTEGER,
+            created_at DATETIME,
+            updated_at DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id),
+            CONSTRAINT check_time_slot CHECK (time_slot IN (1, 2, 3, 4))
+        )
+    """, ['id', 'user_id', 'date', 'time_slot', 'tarif', 'notes', 'created_by', 'created_at', 'updated_at', 'archived_at'], [
+        'CREATE INDEX IF NOT EXISTS idx_assignment_archive_date ON assignments_archive (date)',
+        'CREATE INDEX IF NOT EXISTS idx_assignment_archive_user_date ON assignments_archive (user_id, date)',
+    ]),
+]
+
+
+def _column_type(table, column):
+    for row in _execute(f'PRAGMA table_info({table})'):
+        if row[1] == column:
+            return row[2].upper()
+    return None
+
+
+@migration(8, 'time_slot en SMALLINT avec contrainte CHECK')
+def time_slot_smallint(ctx):
+    """SQLite ne sait pas changer le type d'une colonne : chaque table est
+    reconstruite (<table>_new remplie par lots, puis échangée avec l'ancienne)
+
+    L'échange (DROP, RENAME, index) et la remise à zéro de la progression se
+    font dans une seule transaction explicite (execute_atomic) : une reprise
+    après interruption repart de la table en cours. Une base laissée avec
+    seulement <table>_new (échange interrompu par une version antérieure)
+    est terminée par le renommage.
+    """
+    for table, create_sql, columns, indexes in TIME_SLOT_TABLES:
+        if not ctx.table_exists(table) and ctx.table_exists(f'{table}_new'):
+            ctx.execute_atomic(
+                [(f'ALTER TABLE {table}_new RENAME TO {table}', ())]
+                + [(index_sql, ()) for index_sql in indexes]
+                + [('DELETE FROM migration_progress WHERE version = ?', (ctx.version,))]
+            )
+            ctx.log(f"   ↩️ {table} : échange interrompu terminé")
+            continue
+        if _column_type(table, 'time_slot') == 'SMALLINT':
+            ctx.log(f"   ⏭️ {table} déjà convertie")
+            continue
+        if not ctx.table_exists(f'{table}_new'):
+            ctx.execute(create_sql)
+            db.session.commit()
+
+        if table in NULLABLE_SLOT_TABLES:
+            converted = TIME_SLOT_SQL.format(value='time_slot', otherwise='CASE WHEN time_slot IS NULL THEN NULL ELSE -1 END')
+        else:
+            converted = TIME_SLOT_SQL.format(value="COALESCE(time_slot, 'complete')", otherwise='-1')
+        selected = ', '.join(converted if c == 'time_slot' else c for c in columns)
+        ctx.backfill(
+            table,
+            f'SELECT id, {selected} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit',
+            lambda rows, table=table, columns=columns: ctx.execute(
+                f"INSERT INTO {table}_new ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})",
+                [dict(zip(columns, row[1:])) for row in rows]
+            ),
+            count_sql=f'SELECT COUNT(*) FROM {table} WHERE id > :last_id'
+        )
+
+        ctx.execute_atomic(
+            [(f'DROP TABLE {table}', ()), (f'ALTER TABLE {table}_new RENAME TO {table}', ())]
+            + [(index_sql, ()) for index_sql in indexes]
+            + [('DELETE FROM migration_progress WHERE version = ?', (ctx.version,))]
+        )
+        ctx.log(f"   ✅ {table} : time_slot en SMALLINT")
+
+    # Brouillons d'auto-assignation : recalculés à la demande, inutile de les convertir
+    if _column_type('draft_suggestions', 'time_slot') != 'SMALLINT':
+        ctx.execute_atomic([
+            ('DROP TABLE IF EXISTS draft_suggestions', ()),
+            ('DELETE FROM draft_plans', ()),
+            ("""
+            CREATE TABLE draft_suggestions (
+                id INTEGER NOT NULL,
+                plan_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                user_id INTEGER NOT NULL,
+                time_slot SMALLINT NOT NULL,
+                original_slot SMALLINT NOT NULL,
+                tarif INTEGER NOT NULL,
+                alternatives TEXT NOT NULL,
+                PRIMARY KEY (id),
+                CONSTRAINT unique_draft_suggestion_date UNIQUE (plan_id, date),
+                CONSTRAINT check_time_slot CHECK (time_slot IN (1, 2, 3, 4)),
+                CONSTRAINT check_original_slot CHECK (original_slot IN (1, 2, 3, 4)),
+                FOREIGN KEY(plan_id) REFERENCES draft_plans (id)
+            )
+            """, ()),
+        ])
+        ctx.log("   ✅ Brouillons d'auto-assignation réinitialisés")
+
+
+@migration(9, 'Index sur la date des disponibilités archivées (export par période)')
+def add_availability_archive_date_index(ctx):
+    ctx.execute('CREATE INDEX IF NOT EXISTS idx_availability_archive_date ON availabilities_archive (date)')
+    db.session.commit()
+
+
+@migration(10, 'Token ICS des comptes créés avant sa génération à l\'inscription')
+def backfill_ics_tokens(ctx):
+    _backfill_ics_tokens(ctx)
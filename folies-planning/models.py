@@ -1,43 +1,91 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+import enum
+import secrets
 
 db = SQLAlchemy()
 
+class TimeSlot(enum.IntEnum):
+    """Créneau d'une soirée, stocké en SMALLINT
+
+    Le nom en minuscules (``TimeSlot.WARMUP.key == 'warmup'``) reste la forme
+    texte des formulaires, du JSON et des templates.
+    """
+    COMPLETE = 1      # 00h-6h
+    WARMUP = 2        # 00h-2h
+    PEAKTIME = 3      # 2h-6h
+    PEAKTIME_DUO = 4  # 2h-6h à deux DJs
+
+    @property
+    def key(self):
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, value):
+        """'warmup', 2 ou TimeSlot.WARMUP -> TimeSlot.WARMUP (ValueError sinon)"""
+        if isinstance(value, cls):
+            return value
+        try:
+            if isinstance(value, int):
+                return cls(value)
+            return cls[value.upper()]
+        except (KeyError, ValueError, AttributeError):
+            raise ValueError(f'Créneau inconnu : {value!r}') from None
+
+class TimeSlotType(db.TypeDecorator):
+    """Colonne SMALLINT lue et écrite en TimeSlot"""
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(TimeSlot.parse(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else TimeSlot(value)
+
+def time_slot_check(column='time_slot'):
+    """CHECK limitant la colonne aux valeurs de TimeSlot"""
+    values = ', '.join(str(int(slot)) for slot in TimeSlot)
+    return db.CheckConstraint(f'{column} IN ({values})', name=f'check_{column}')
+
+def new_ics_token():
+    """Secret du lien /dj/<token>/sets.ics, attribué à la création du compte"""
+    return secrets.token_urlsafe(24)
+
 def calculate_tarif(date, time_slot):
     """Calculer le tarif selon le jour et le créneau"""
     # Peaktime à 2 : tarif fixe 100€ par DJ quel que soit le jour
-    if time_slot == 'peaktime_duo':
+    if time_slot == TimeSlot.PEAKTIME_DUO:
         return 100
 
     day_of_week = date.weekday()  # 0=Lundi, 3=Jeudi, 4=Vendredi, 5=Samedi
 
     # Jeudi (3)
     if day_of_week == 3:
-        if time_slot == 'complete':
+        if time_slot == TimeSlot.COMPLETE:
             return 120
-        elif time_slot == 'warmup':
+        elif time_slot == TimeSlot.WARMUP:
             return 40
-        elif time_slot == 'peaktime':
+        elif time_slot == TimeSlot.PEAKTIME:
             return 80
 
     # Vendredi (4) et Samedi (5)
     elif day_of_week in [4, 5]:
-        if time_slot == 'complete':
+        if time_slot == TimeSlot.COMPLETE:
             return 200
-        elif time_slot == 'warmup':
+        elif time_slot == TimeSlot.WARMUP:
             return 50
-        elif time_slot == 'peaktime':
+        elif time_slot == TimeSlot.PEAKTIME:
             return 150
 
     # Autres jours (Dimanche à Mercredi)
     else:
-        if time_slot == 'complete':
+        if time_slot == TimeSlot.COMPLETE:
             return 100
-        elif time_slot == 'warmup':
+        elif time_slot == TimeSlot.WARMUP:
             return 30
-        elif time_slot == 'peaktime':
+        elif time_slot == TimeSlot.PEAKTIME:
             return 70
 
     return 0
@@ -54,6 +102,7 @@ class User(UserMixin, db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    ics_token = db.Column(db.String(64), unique=True, index=True, default=new_ics_token)  # Lien secret du flux /dj/<token>/sets.ics
     
     # Relations - AJOUTER foreign_keys
     availabilities = db.relationship('Availability', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -62,12 +111,16 @@ class User(UserMixin, db.Model):
                                   backref='user', 
                                   lazy=True, 
                                   cascade='all, delete-orphan')
+    month_stats = db.relationship('DjMonthStats', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    # Hachage dans le pool borné de passwords.py (import local : passwords -> metrics -> models)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from passwords import hash_password
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from passwords import verify_password
+        return verify_password(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username} - {self.dj_name}>'
@@ -79,7 +132,7 @@ class Availability(db.Model):
             user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
             date = db.Column(db.Date, nullable=False)
             is_available = db.Column(db.Boolean, default=True)
-            time_slot = db.Column(db.String(20), default='complete')  # 'complete', 'warmup', 'peaktime', 'peaktime_duo'
+            time_slot = db.Column(TimeSlotType, default=TimeSlot.COMPLETE)  # NULL si indisponible
             notes = db.Column(db.String(200))
             created_at = db.Column(db.DateTime, default=datetime.utcnow)
             updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -88,10 +141,11 @@ class Availability(db.Model):
             __table_args__ = (
                 db.UniqueConstraint('user_id', 'date', name='unique_user_date_availability'),
                 db.Index('idx_availability_date', 'date'),
+                time_slot_check(),
             )
             
             def __repr__(self):
-                return f'<Availability {self.user.dj_name} - {self.date} - {self.time_slot}>'
+                return f'<Availability {self.user.dj_name} - {self.date} - {self.time_slot and self.time_slot.key}>'
 
 class Assignment(db.Model):
             __tablename__ = 'assignments'
@@ -99,7 +153,7 @@ class Assignment(db.Model):
             id = db.Column(db.Integer, primary_key=True)
             user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
             date = db.Column(db.Date, nullable=False)
-            time_slot = db.Column(db.String(20), default='complete')  # 'complete', 'warmup', 'peaktime', 'peaktime_duo'
+            time_slot = db.Column(TimeSlotType, nullable=False, default=TimeSlot.COMPLETE)
             tarif = db.Column(db.Integer, default=0)  # Tarif calculé automatiquement
             notes = db.Column(db.String(200))
             created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -110,7 +164,148 @@ class Assignment(db.Model):
             __table_args__ = (
                 db.UniqueConstraint('date', 'time_slot', 'user_id', name='unique_date_timeslot_user_assignment'),
                 db.Index('idx_assignment_date', 'date'),
+                time_slot_check(),
             )
             
             def __repr__(self):
-                return f'<Assignment {self.user.dj_name} - {self.date} - {self.time_slot} - {self.tarif}€>'
+                return f'<Assignment {self.user.dj_name} - {self.date} - {self.time_slot.key} - {self.tarif}€>'
+
+class AvailabilityArchive(db.Model):
+            """Dispos des mois passés, déplacées par le job d'archivage (voir archive.py)"""
+            __tablename__ = 'availabilities_archive'
+
+            id = db.Column(db.Integer, primary_key=True)  # Même id que dans availabilities
+            user_id = db.Column(db.Integer, nullable=False)
+            date = db.Column(db.Date, nullable=False)
+            is_available = db.Column(db.Boolean, default=True)
+            time_slot = db.Column(TimeSlotType, default=TimeSlot.COMPLETE)
+            notes = db.Column(db.String(200))
+            created_at = db.Column(db.DateTime)
+            updated_at = db.Column(db.DateTime)
+            archived_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
+            user = db.relationship('User', primaryjoin='foreign(AvailabilityArchive.user_id) == User.id', viewonly=True)
+
+            __table_args__ = (
+                db.Index('idx_availability_archive_date', 'date'),
+                db.Index('idx_availability_archive_user_date', 'user_id', 'date'),
+                time_slot_check(),
+            )
+
+class AssignmentArchive(db.Model):
+            """Sets des mois passés, déplacés par le job d'archivage (voir archive.py)"""
+            __tablename__ = 'assignments_archive'
+
+            id = db.Column(db.Integer, primary_key=True)  # Même id que dans assignments
+            user_id = db.Column(db.Integer, nullable=False)
+            date = db.Column(db.Date, nullable=False)
+            time_slot = db.Column(TimeSlotType, nullable=False, default=TimeSlot.COMPLETE)
+            tarif = db.Column(db.Integer, default=0)
+            notes = db.Column(db.String(200))
+            created_by = db.Column(db.Integer)
+            created_at = db.Column(db.DateTime)
+            updated_at = db.Column(db.DateTime)
+            archived_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+
+            user = db.relationship('User', primaryjoin='foreign(AssignmentArchive.user_id) == User.id', viewonly=True)
+
+            __table_args__ = (
+                db.Index('idx_assignment_archive_date', 'date'),
+                db.Index('idx_assignment_archive_user_date', 'user_id', 'date'),
+                time_slot_check(),
+            )
+
+class DjMonthStats(db.Model):
+            """Agrégats par DJ et par mois, maintenus à chaque écriture (voir stats.py)"""
+            __tablename__ = 'dj_month_stats'
+
+            user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+            year = db.Column(db.Integer, primary_key=True)
+            month = db.Column(db.Integer, primary_key=True)
+            sets_complete = db.Column(db.Integer, nullable=False, default=0)
+            sets_warmup = db.Column(db.Integer, nullable=False, default=0)
+            sets_peaktime = db.Column(db.Integer, nullable=False, default=0)
+            sets_peaktime_duo = db.Column(db.Integer, nullable=False, default=0)
+            availability_days = db.Column(db.Integer, nullable=False, default=0)
+            total_tarif = db.Column(db.Integer, nullable=False, default=0)
+
+            __table_args__ = (
+                db.Index('idx_dj_month_stats_period', 'year', 'month'),
+            )
+
+            @property
+            def total_sets(self):
+                return self.sets_complete + self.sets_warmup + self.sets_peaktime + self.sets_peaktime_duo
+
+            def __repr__(self):
+                return f'<DjMonthStats {self.user_id} {self.month}/{self.year} - {self.total_sets} sets>'
+
+class ChangeEvent(db.Model):
+            """Journal append-only des écritures (séquence monotone = id)"""
+            __tablename__ = 'change_events'
+
+            id = db.Column(db.Integer, primary_key=True)
+            entity = db.Column(db.String(20), nullable=False)  # 'availability', 'assignment', 'user'
+            entity_id = db.Column(db.Integer, nullable=False)
+            user_id = db.Column(db.Integer)  # DJ concerné (pas de FK : l'événement survit à la suppression)
+            date = db.Column(db.Date)  # Date de la soirée concernée
+            kind = db.Column(db.String(20), nullable=False)  # 'created', 'updated', 'deleted', 'approved'...
+            created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+            # AUTOINCREMENT : SQLite ne réutilise jamais un id, la séquence reste monotone
+            __table_args__ = (
+                db.Index('idx_change_event_user', 'user_id', 'id'),
+                db.Index('idx_change_event_user_entity', 'user_id', 'entity', 'id'),
+                {'sqlite_autoincrement': True},
+            )
+
+            def __repr__(self):
+                return f'<ChangeEvent #{self.id} {self.entity}:{self.entity_id} {self.kind}>'
+
+class ChangeCursor(db.Model):
+            """Position de lecture persistée d'un consommateur du journal"""
+            __tablename__ = 'change_cursors'
+
+            consumer = db.Column(db.String(50), primary_key=True)
+            position = db.Column(db.Integer, nullable=False, default=0)
+            updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DraftPlan(db.Model):
+            """Brouillon d'auto-assignation d'un mois (voir draft.py)"""
+            __tablename__ = 'draft_plans'
+
+            id = db.Column(db.Integer, primary_key=True)
+            year = db.Column(db.Integer, nullable=False)
+            month = db.Column(db.Integer, nullable=False)
+            seed = db.Column(db.Integer, nullable=False)  # Graine du tirage entre DJs à égalité
+            sequence = db.Column(db.Integer, nullable=False, default=0)  # Journal des changements lu jusqu'ici
+            existing = db.Column(db.Text, nullable=False, default='{}')  # JSON {user_id: sets existants du mois}
+            updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+            suggestions = db.relationship('DraftSuggestion', backref='plan', lazy=True, cascade='all, delete-orphan')
+
+            __table_args__ = (
+                db.UniqueConstraint('year', 'month', name='unique_draft_plan_month'),
+            )
+
+            def __repr__(self):
+                return f'<DraftPlan {self.month}/{self.year}>'
+
+class DraftSuggestion(db.Model):
+            """Suggestion d'un brouillon : un DJ pour une date"""
+            __tablename__ = 'draft_suggestions'
+
+            id = db.Column(db.Integer, primary_key=True)
+            plan_id = db.Column(db.Integer, db.ForeignKey('draft_plans.id'), nullable=False)
+            date = db.Column(db.Date, nullable=False)
+            user_id = db.Column(db.Integer, nullable=False)
+            time_slot = db.Column(TimeSlotType, nullable=False)
+            original_slot = db.Column(TimeSlotType, nullable=False)
+            tarif = db.Column(db.Integer, nullable=False)
+            alternatives = db.Column(db.Text, nullable=False, default='[]')  # JSON, tel que renvoyé au dashboard
+
+            __table_args__ = (
+                db.UniqueConstraint('plan_id', 'date', name='unique_draft_suggestion_date'),
+                time_slot_check(),
+                time_slot_check('original_slot'),
+            )
@@ -1,7 +1,11 @@
 from flask_mail import Mail, Message
 from flask import render_template_string, render_template
-from datetime import datetime, timedelta, date
-from threading import Thread
+import logging
+
+from metrics import EMAIL_QUEUE, EMAILS_SENT, EMAIL_FAILURES
+from logs import spawn
+
+logger = logging.getLogger(__name__)
 
 mail = Mail()
 
@@ -10,25 +14,116 @@ def send_async_email(app, msg):
     with app.app_context():
         try:
             mail.send(msg)
-            print(f"✅ Email envoyé: {msg.subject}")
-        except Exception as e:
-            print(f"❌ Erreur envoi email: {str(e)}")
-
-def send_email(app, subject, recipient, html_body):
-    """Fonction générique pour envoyer un email"""
-    from config import Config
-    
-    if not Config.SEND_EMAIL_NOTIFICATIONS:
-        print(f"📧 Email désactivé: {subject} -> {recipient}")
+            EMAILS_SENT.inc()
+            logger.info("Email envoyé", extra={'subject': msg.subject, 'recipients': msg.recipients})
+        except Exception:
+            EMAIL_FAILURES.inc()
+            logger.exception("Erreur envoi email", extra={'subject': msg.subject, 'recipients': msg.recipients})
+        finally:
+            EMAIL_QUEUE.dec()
+
+def start_async_email(app, msg):
+    """Envoi en arrière-plan, compté dans la file d'envoi (métriques)"""
+    EMAIL_QUEUE.inc()
+    spawn(send_async_email, app, msg)
+
+def send_batch(app, messages, background=True):
+    """Envoyer plusieurs emails sur une seule connexion SMTP
+
+    En arrière-plan par défaut (routes web) ; le cron attend la fin de l'envoi.
+    """
+    if not messages:
         return
-    
-    msg = Message(
+    if not app.config.get('SEND_EMAIL_NOTIFICATIONS'):
+        for msg in messages:
+            logger.info("Email désactivé", extra={'subject': msg.subject, 'recipients': msg.recipients})
+        return
+
+    def run():
+        with app.app_context():
+            sent = 0
+            try:
+                with mail.connect() as connection:
+                    for msg in messages:
+                        try:
+                            connection.send(msg)
+                            sent += 1
+                            EMAILS_SENT.inc()
+                        except Exception:
+                            logger.exception("Erreur envoi email",
+                                             extra={'subject': msg.subject, 'recipients': msg.recipients})
+            except Exception:
+                logger.exception("Erreur connexion SMTP")
+            EMAIL_FAILURES.inc(len(messages) - sent)
+            EMAIL_QUEUE.dec(len(messages))
+            logger.info("Emails envoyés en une connexion", extra={'sent': sent, 'total': len(messages)})
+
+    EMAIL_QUEUE.inc(len(messages))
+
+    if background:
+        spawn(run)
+    else:
+        run()
+
+def build_digest(dj, items, subject, title, intro, color='#c8ff00'):
+    """Un seul message pour plusieurs sets d'un DJ
+
+    items : [{'assignment': Assignment, 'days_left': int ou None}, ...]
+    """
+    return Message(
         subject=subject,
-        recipients=[recipient],
-        html=html_body
+        recipients=[dj.email],
+        html=render_template('email/digest.html',
+                             dj=dj,
+                             items=sorted(items, key=lambda item: item['assignment'].date),
+                             title=title,
+                             intro=intro,
+                             color=color)
     )
-    
-    Thread(target=send_async_email, args=(app, msg)).start()
+
+def send_assignment_digests(app, assignments):
+    """Nouvelles assignations d'un lot : un email par DJ, une connexion SMTP pour le lot"""
+    if not assignments or not app.config.get('SEND_EMAIL_NOTIFICATIONS'):
+        return
+    from models import User
+
+    by_user = {}
+    for assignment in assignments:
+        by_user.setdefault(assignment.user_id, []).append(assignment)
+
+    messages = []
+    with app.app_context():
+        djs = User.query.filter(User.id.in_(list(by_user)), User.is_active == True).all()
+        for dj in djs:
+            sets = by_user[dj.id]
+            if len(sets) == 1:
+                subject = f"🎵 Nouveau set à LES FOLIES - {sets[0].date.strftime('%d/%m/%Y')}"
+            else:
+                subject = f"🎵 {len(sets)} nouveaux sets à LES FOLIES"
+            messages.append(build_digest(
+                dj, [{'assignment': a, 'days_left': None} for a in sets],
+                subject=subject,
+                title='Nouvelle assignation' if len(sets) == 1 else 'Nouvelles assignations',
+                intro='Tu as ete assigne pour un set !' if len(sets) == 1 else f'Tu as ete assigne pour {len(sets)} sets !'
+            ))
+    send_batch(app, messages)
+
+def send_admin_digest(app, admin_email, nights, end=None, critical=False, hours=48, background=True):
+    """Un seul email à l'admin listant les soirées à couvrir (voir coverage.uncovered_nights)"""
+    if not nights:
+        return
+    with app.app_context():
+        if critical:
+            subject = f"🚨 Urgent: {len(nights)} soirée(s) sans DJ dans les {hours}h"
+        else:
+            subject = f"⚠️ Planning: {len(nights)} soirée(s) à couvrir"
+        msg = Message(
+            subject=subject,
+            recipients=[admin_email],
+            html=render_template('email/admin_digest.html',
+                                 nights=nights, end=end, critical=critical, hours=hours)
+        )
+    send_batch(app, [msg], background=background)
 
 # Templates Email
 def get_assignment_email_template(dj_name, date_str, notes=None):
@@ -81,97 +176,6 @@ def get_assignment_email_template(dj_name, date_str, notes=None):
     </html>
     """
 
-def get_reminder_email_template(dj_name, date_str, days_left):
-    """Template email pour rappel"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background: #06060c; padding: 20px; color: #eeeef0; }}
-            .container {{ max-width: 600px; margin: 0 auto; }}
-            .header {{ background: linear-gradient(135deg, #0a0a14, #1a1a2e); padding: 40px 30px; text-align: center; border-bottom: 2px solid #ffab00; }}
-            .header h1 {{ margin: 0; font-size: 28px; color: #ffab00; letter-spacing: 0.1em; font-weight: 800; }}
-            .header p {{ color: #8888a0; margin: 8px 0 0; font-size: 14px; }}
-            .content {{ background: #111120; padding: 30px; }}
-            .reminder-box {{ background: rgba(255, 171, 0, 0.1); border-left: 3px solid #ffab00; padding: 15px; margin: 20px 0; border-radius: 0 8px 8px 0; }}
-            .reminder-box h2 {{ color: #ffab00; margin: 0 0 8px; font-size: 20px; }}
-            .footer {{ background: #06060c; color: #555566; padding: 20px; text-align: center; font-size: 11px; border-top: 1px solid rgba(255,255,255,0.06); }}
-            p {{ color: #eeeef0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>LES FOLIES</h1>
-                <p>Rappel &mdash; Ton set approche</p>
-            </div>
-            <div class="content">
-                <p>Salut <strong style="color: #c8ff00;">{dj_name}</strong>,</p>
-
-                <div class="reminder-box">
-                    <h2>Set dans {days_left} jours</h2>
-                    <p><strong style="color: #8888a0;">Date :</strong> {date_str}</p>
-                </div>
-
-                <p>Prepare tes tracks pour LES FOLIES !</p>
-                <p style="color: #8888a0; font-size: 14px;">
-                    En cas d'empechement, previens au plus vite.
-                </p>
-            </div>
-            <div class="footer">
-                &copy; 2026 LES FOLIES &mdash; Planning DJ
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-def get_admin_alert_email_template(date_str, available_count):
-    """Template email pour alerte admin"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif; background: #06060c; padding: 20px; color: #eeeef0; }}
-            .container {{ max-width: 600px; margin: 0 auto; }}
-            .header {{ background: linear-gradient(135deg, #0a0a14, #1a1a2e); padding: 40px 30px; text-align: center; border-bottom: 2px solid #ff1744; }}
-            .header h1 {{ margin: 0; font-size: 28px; color: #ff1744; letter-spacing: 0.1em; font-weight: 800; }}
-            .content {{ background: #111120; padding: 30px; }}
-            .alert-box {{ background: rgba(255, 23, 68, 0.1); border-left: 3px solid #ff1744; padding: 15px; margin: 20px 0; border-radius: 0 8px 8px 0; }}
-            .alert-box h2 {{ color: #ff1744; margin: 0 0 12px; font-size: 20px; }}
-            .footer {{ background: #06060c; color: #555566; padding: 20px; text-align: center; font-size: 11px; border-top: 1px solid rgba(255,255,255,0.06); }}
-            .btn {{ display: inline-block; background: #ff1744; color: white; padding: 14px 32px; text-decoration: none; border-radius: 8px; font-weight: 700; margin: 10px 0; }}
-            p {{ color: #eeeef0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>ALERTE PLANNING</h1>
-            </div>
-            <div class="content">
-                <p>Admin,</p>
-
-                <div class="alert-box">
-                    <h2>Aucun DJ disponible</h2>
-                    <p><strong style="color: #8888a0;">Date :</strong> {date_str}</p>
-                    <p><strong style="color: #8888a0;">DJs disponibles :</strong> {available_count}</p>
-                </div>
-
-                <p>Cette date n'a aucun DJ dispo. Contacte l'equipe.</p>
-
-                <a href="https://planning.tbhone.uk/admin/dashboard" class="btn">Voir le Planning</a>
-            </div>
-            <div class="footer">
-                &copy; 2026 LES FOLIES &mdash; Planning DJ
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
 def send_assignment_notification(app, dj, assignment):
     """Envoyer notification d'assignation au DJ"""
     if not app.config.get('SEND_EMAIL_NOTIFICATIONS'):
@@ -187,80 +191,22 @@ def send_assignment_notification(app, dj, assignment):
                                     assignment=assignment)
             )
             
-            thread = Thread(target=send_async_email, args=(app, msg))
-            thread.start()
+            start_async_email(app, msg)
             
-        except Exception as e:
-            print(f"Erreur envoi email assignment: {e}")
+        except Exception:
+            logger.exception("Erreur envoi email assignment", extra={'dj': dj.dj_name})
 
-def send_reminder_notification(app, dj, assignment, days_left):
-    """Envoyer rappel à un DJ"""
-    date_str = assignment.date.strftime('%A %d %B %Y')
-    subject = f"⏰ Rappel: Set dans {days_left} jours"
-    
-    html = get_reminder_email_template(
-        dj_name=dj.dj_name,
-        date_str=date_str,
-        days_left=days_left
-    )
-    
-    send_email(app, subject, dj.email, html)
-
-def send_admin_alert(app, admin_email, date_obj, available_count):
-    """Envoyer alerte à l'admin"""
-    date_str = date_obj.strftime('%A %d %B %Y')
-    subject = f"⚠️ Alerte: Aucun DJ dispo - {date_str}"
-    
-    html = get_admin_alert_email_template(date_str, available_count)
-    
-    send_email(app, subject, admin_email, html)
-
-def check_and_send_reminders(app):
-    """Vérifier et envoyer les rappels (à appeler quotidiennement)"""
-    from models import Assignment, User
-    from config import Config
-    
-    with app.app_context():
-        today = date.today()
-        reminder_date = today + timedelta(days=Config.NOTIFICATION_REMINDER_DAYS)
-        
-        # Trouver les assignments dans X jours
-        assignments = Assignment.query.filter_by(date=reminder_date).all()
-        
-        for assignment in assignments:
-            dj = User.query.get(assignment.user_id)
-            if dj and dj.is_active:
-                send_reminder_notification(app, dj, assignment, Config.NOTIFICATION_REMINDER_DAYS)
-                print(f"📧 Rappel envoyé à {dj.dj_name} pour le {reminder_date}")
+def send_reassignment_notification(app, dj, assignment):
+    """Prévenir un DJ que son set a été confié à un autre DJ (échange admin)"""
+    if not app.config.get('SEND_EMAIL_NOTIFICATIONS'):
+        return
 
-def check_availability_alerts(app):
-    """Vérifier les dates sans DJ et alerter l'admin (à appeler quotidiennement)"""
-    from models import Availability, Assignment, User
-    from datetime import timedelta
-    
     with app.app_context():
-        today = date.today()
-        next_week = today + timedelta(days=7)
-        
-        # Dates de la semaine prochaine
-        dates_to_check = [today + timedelta(days=i) for i in range(1, 8)]
-        
-        admin = User.query.filter_by(is_admin=True).first()
-        if not admin:
-            return
-        
-        for check_date in dates_to_check:
-            # Vérifier si déjà assigné
-            assignment = Assignment.query.filter_by(date=check_date).first()
-            if assignment:
-                continue
-            
-            # Compter les dispos
-            available_count = Availability.query.filter_by(
-                date=check_date,
-                is_available=True
-            ).count()
-            
-            if available_count == 0:
-                send_admin_alert(app, admin.email, check_date, available_count)
-                print(f"⚠️ Alerte admin: Aucun DJ dispo le {check_date}")
+        msg = build_digest(
+            dj, [{'assignment': assignment, 'days_left': None}],
+            subject=f"🔁 Set réattribué - {assignment.date.strftime('%d/%m/%Y')}",
+            title='Set reattribue',
+            intro="Ton set a ete confie a un autre DJ, tu n'as plus a jouer ce soir-la.",
+            color='#ffab00'
+        )
+    start_async_email(app, msg)
@@ -0,0 +1,132 @@
+"""Hachage des mots de passe dans un pool de threads borné
+
+Le hachage Werkzeug (scrypt par défaut) est volontairement lent (~0,1 s)
+et coûteux en mémoire (32 Mo par calcul avec scrypt:32768:8:1). Les
+calculs passent par un pool de PASSWORD_HASH_WORKERS threads par processus :
+scrypt et pbkdf2 libèrent le GIL, donc avec des workers gunicorn à threads
+(``--threads``) une rafale de connexions occupe plusieurs cœurs sans
+bloquer les autres requêtes du worker.
+
+Au plus PASSWORD_HASH_MAX_PENDING calculs sont en cours ou en attente ;
+au-delà, l'appelant attend une place PASSWORD_HASH_TIMEOUT secondes puis
+reçoit PasswordHashBusy (la page de connexion répond 503).
+
+PASSWORD_HASH_METHOD suit le format Werkzeug (``scrypt:32768:8:1``,
+``pbkdf2:sha256:600000``...). Un hash stocké avec d'autres paramètres est
+recalculé à la connexion réussie suivante (needs_rehash).
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_REJECTED
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+_settings = {'method': DEFAULT_METHOD, 'workers': 4, 'max_pending': 16, 'timeout': 5}
+_pool = None  # (pid, executor, places libres)
+_lock = threading.Lock()
+
+
+class PasswordHashBusy(RuntimeError):
+    def __init__(self):
+        super().__init__('Trop de connexions en cours, réessayez dans quelques secondes.')
+
+
+def configure(method=DEFAULT_METHOD, workers=4, max_pending=16, timeout=5):
+    global _pool
+    with _lock:
+        _settings.update(method=method, workers=workers, max_pending=max(max_pending, workers), timeout=timeout)
+        if _pool is not None:
+            _pool[1].shutdown(wait=False)
+            _pool = None
+
+
+def init_passwords(app):
+    configure(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT']
+    )
+
+
+def _get_pool():
+    """Pool du processus courant (recréé après un fork : gunicorn --preload)"""
+    global _pool
+    with _lock:
+        if _pool is None or _pool[0] != os.getpid():
+            _pool = (os.getpid(),
+                     ThreadPoolExecutor(max_workers=_settings['workers'], thread_name_prefix='password-hash'),
+                     threading.BoundedSemaphore(_settings['max_pending']))
+        return _pool[1], _pool[2]
+
+
+def _submit(executor, slots, fn, *args):
+    """Lancer un calcul qui occupe une place déjà prise
+
+    La place est rendue à la fin du calcul (add_done_callback), même si
+    l'appelant a cessé d'attendre, ou tout de suite si la soumission échoue
+    (pool arrêté par configure(), interpréteur en cours d'arrêt).
+    """
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _run(operation, fn, *args):
+    executor, slots = _get_pool()
+    start = time.perf_counter()
+    if not slots.acquire(timeout=_settings['timeout']):
+        PASSWORD_HASH_REJECTED.inc()
+        raise PasswordHashBusy()
+    try:
+        return _submit(executor, slots, fn, *args).result()
+    finally:
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+
+def hash_password(password):
+    return _run('hash', generate_password_hash, password, _settings['method'])
+
+
+def verify_password(password_hash, password):
+    return _run('verify', check_password_hash, password_hash, password)
+
+
+def hash_many(passwords):
+    """Hacher une liste (import CSV) sans occuper plus de workers places du pool
+
+    Les connexions gardent les autres places : elles n'attendent au pire
+    qu'une série de calculs de l'import.
+    """
+    executor, slots = _get_pool()
+    method, in_flight = _settings['method'], _settings['workers']
+    pending, hashes = deque(), []
+    for password in passwords:
+        if len(pending) >= in_flight:
+            hashes.append(pending.popleft().result())
+        slots.acquire()
+        pending.append(_submit(executor, slots, generate_password_hash, password, method))
+    hashes.extend(future.result() for future in pending)
+    return hashes
+
+
+@lru_cache(maxsize=None)
+def _method_prefix(method):
+    # Werkzeug complète les paramètres ('scrypt' -> 'scrypt:32768:8:1') : on lit ceux qu'il écrit
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def needs_rehash(password_hash):
+    """Hash stocké avec une autre méthode ou d'autres paramètres que PASSWORD_HASH_METHOD"""
+    return password_hash.split('$', 1)[0] != _method_prefix(_settings['method'])
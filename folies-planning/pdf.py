@@ -0,0 +1,100 @@
+"""Export PDF du planning mensuel (ReportLab)
+
+Module importé à la demande par la route d'export : ReportLab n'est pas
+chargé au démarrage des workers ni par le cron.
+"""
+from datetime import datetime, date
+import calendar as cal
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+
+from archive import assignment_history
+
+def generate_planning_pdf(year, month):
+    """Générer un PDF du planning mensuel"""
+    buffer = BytesIO()
+    
+    # Créer le document PDF en paysage
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
+    elements = []
+    
+    # Styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#6366f1'),
+        spaceAfter=30,
+        alignment=1  # Centré
+    )
+    
+    # Titre
+    months_fr = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+                 'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+    title = Paragraph(f"🎵 LES FOLIES - Planning {months_fr[month-1]} {year}", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 1*cm))
+    
+    # Récupérer les assignments du mois
+    first_day = date(year, month, 1)
+    last_day = date(year, month, cal.monthrange(year, month)[1])
+    
+    # Actif + archive : les vieux mois restent exportables
+    assignments = assignment_history(start=first_day, end=last_day, with_user=True)
+    
+    # Créer le tableau
+    data = [['Date', 'Jour', 'DJ', 'Notes']]
+    
+    for assignment in assignments:
+        date_str = assignment.date.strftime('%d/%m/%Y')
+        jour = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'][assignment.date.weekday()]
+        dj_name = assignment.user.dj_name
+        notes = assignment.notes or '-'
+        
+        data.append([date_str, jour, dj_name, notes])
+    
+    if len(data) == 1:
+        data.append(['Aucun set assigné', '', '', ''])
+    
+    # Style du tableau
+    table = Table(data, colWidths=[3*cm, 3*cm, 5*cm, 8*cm])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ]))
+    
+    elements.append(table)
+    elements.append(Spacer(1, 1*cm))
+    
+    # Footer
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        alignment=1
+    )
+    footer = Paragraph(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')} - © 2026 LES FOLIES", footer_style)
+    elements.append(footer)
+    
+    # Build PDF
+    doc.build(elements)
+    buffer.seek(0)
+    
+    return buffer
@@ -0,0 +1,394 @@
+"""Planification des sets : auto-assignation d'un mois et scénarios de saison
+
+``plan_month`` est l'algorithme glouton de l'auto-assignation, sans accès
+à la base : il reçoit les dispos et les sets du mois sous forme de
+dictionnaires ``{date: {user_id: créneau}}`` et renvoie des suggestions.
+
+``plan_season`` l'enchaîne sur plusieurs mois en reportant l'équité d'un
+mois sur l'autre, selon un scénario :
+
+- ``carry_over`` : poids des sets des mois précédents dans le classement
+  (0 : équité remise à zéro chaque mois, 1 : équité sur toute la saison) ;
+- ``max_sets`` : plafond de sets par DJ et par mois (None : sans plafond) ;
+- ``budget`` : plafond de dépense des suggestions sur la saison ;
+- ``seed`` : graine du tirage entre DJs à égalité (résultat reproductible).
+
+``run_scenarios`` évalue plusieurs scénarios indépendants dans un pool de
+processus, dans un budget de temps fixe. Les workers ne reçoivent qu'une
+copie des données (``season_snapshot``) : ni session SQLAlchemy, ni
+contexte Flask ne traversent le pool.
+
+Le pool est créé à la première demande, une fois par processus, et ses
+workers partent d'un serveur ``forkserver`` : un worker gunicorn a déjà
+des threads (file de logs, flux des changements, hachage des mots de
+passe) et un fork direct pourrait copier un verrou tenu par l'un d'eux.
+"""
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+
+from models import calculate_tarif, TimeSlot
+
+DEFAULT_SCENARIOS = [
+    {'name': 'Équité mensuelle', 'carry_over': 0},
+    {'name': 'Équité sur la saison', 'carry_over': 1},
+    {'name': 'Saison, 4 sets/mois max', 'carry_over': 1, 'max_sets': 4},
+]
+
+_pool = None  # (pid, workers, executor)
+_pool_lock = threading.Lock()
+
+
+def night_is_full(slots, duo_count):
+    """Soirée complète : un set complet, ou warm-up + peak (solo ou 2 DJs en duo)"""
+    if TimeSlot.COMPLETE in slots:
+        return True
+    total_peak = duo_count + (1 if TimeSlot.PEAKTIME in slots else 0)
+    return TimeSlot.WARMUP in slots and total_peak >= 2
+
+
+def _actual_slot(slot, assigned_slots):
+    """Créneau réellement tenu par une dispo, vu ce qui est déjà pris ce soir-là"""
+    peak_occupied = TimeSlot.PEAKTIME in assigned_slots or TimeSlot.PEAKTIME_DUO in assigned_slots
+    # Peaktime solo rejoint un duo existant → devient duo
+    if slot == TimeSlot.PEAKTIME and TimeSlot.PEAKTIME_DUO in assigned_slots:
+        return TimeSlot.PEAKTIME_DUO
+    if slot == TimeSlot.COMPLETE:
+        if TimeSlot.WARMUP in assigned_slots:
+            return TimeSlot.PEAKTIME
+        if peak_occupied:
+            return TimeSlot.WARMUP
+    return slot
+
+
+def _fits(slot, assigned_slots, total_peak_djs):
+    """La dispo peut-elle encore être placée ce soir-là ?"""
+    peak_occupied = TimeSlot.PEAKTIME in assigned_slots or TimeSlot.PEAKTIME_DUO in assigned_slots
+    if TimeSlot.COMPLETE in assigned_slots:
+        return False
+    if slot == TimeSlot.PEAKTIME_DUO:
+        return total_peak_djs < 2
+    if slot == TimeSlot.PEAKTIME:
+        # Peaktime solo compatible avec duo existant (rejoint en duo)
+        if TimeSlot.PEAKTIME_DUO in assigned_slots:
+            return total_peak_djs < 2
+        return not peak_occupied
+    if slot == TimeSlot.WARMUP:
+        return TimeSlot.WARMUP not in assigned_slots
+    if slot == TimeSlot.COMPLETE:
+        return not (TimeSlot.WARMUP in assigned_slots and peak_occupied)
+    return True
+
+
+def count_sets(assigned):
+    """{user_id: nombre de sets} à partir de {date: {user_id: créneau}}"""
+    counts = {}
+    for djs in assigned.values():
+        for user_id in djs:
+            counts[user_id] = counts.get(user_id, 0) + 1
+    return counts
+
+
+def plan_month(year, month, available, assigned, start, names=None, rng=random,
+               prior=None, carry_over=0, max_sets=None, budget=None,
+               seed=None, only=None, planned=None):
+    """Suggestions d'assignation pour les dates à remplir du mois
+
+    available / assigned : {date: {user_id: créneau}} (dispos actives, sets existants)
+    start : première date planifiable (les dates antérieures sont ignorées)
+    prior : {user_id: sets des mois précédents}, pondérés par carry_over
+    budget : dépense maximale des suggestions (None : illimitée)
+    seed : tirage propre à chaque date (random.Random(f'{seed}:{date}')) au lieu
+           de rng : une date donne le même résultat qu'on la résolve seule ou avec le mois
+    only : ne résoudre que ces dates (re-calcul partiel d'un brouillon)
+    planned : {user_id: suggestions conservées ailleurs}, comptées pour l'équité
+
+    Renvoie un dict : suggestions, total_dates, fillable (dates à remplir),
+    existing ({user_id: sets existants du mois}) et spend (total suggéré).
+    """
+    names = names or {}
+    prior = prior or {}
+    first_day = date(year, month, 1)
+    last_day = date(year, month, monthrange(year, month)[1])
+
+    assigned_slots = {d: set(djs.values()) for d, djs in assigned.items()}
+    duo_count = {d: sum(1 for slot in djs.values() if slot == TimeSlot.PEAKTIME_DUO) for d, djs in assigned.items()}
+    existing = count_sets(assigned)
+
+    # Dates à remplir : planifiables, avec des dispos, pas complètement assignées
+    dates_to_fill = []
+    current = max(first_day, start)
+    while current <= last_day:
+        if current in available and not night_is_full(assigned_slots.get(current, set()), duo_count.get(current, 0)):
+            dates_to_fill.append(current)
+        current += timedelta(days=1)
+
+    fillable = set(dates_to_fill)
+    if only is not None:
+        dates_to_fill = [d for d in dates_to_fill if d in only]
+
+    # Dates avec le moins de DJs disponibles en premier
+    dates_to_fill.sort(key=lambda d: len(available.get(d, {})))
+
+    counts = dict(existing)
+    for user_id, count in (planned or {}).items():
+        counts[user_id] = counts.get(user_id, 0) + count
+    dj_by_date = {d: set(djs) for d, djs in assigned.items()}
+    spend = 0
+    suggestions = []
+
+    def rank(user_id):
+        return counts.get(user_id, 0) + carry_over * prior.get(user_id, 0)
+
+    for d in dates_to_fill:
+        slots = assigned_slots.setdefault(d, set())
+        djs = dj_by_date.setdefault(d, set())
+        total_peak_djs = duo_count.get(d, 0) + (1 if TimeSlot.PEAKTIME in slots else 0)
+
+        candidates = [(user_id, slot) for user_id, slot in available[d].items()
+                      if user_id not in djs and _fits(slot, slots, total_peak_djs)]
+        if max_sets is not None:
+            candidates = [c for c in candidates if counts.get(c[0], 0) < max_sets]
+        if not candidates:
+            continue
+
+        (rng if seed is None else random.Random(f'{seed}:{d.isoformat()}')).shuffle(candidates)
+        candidates.sort(key=lambda c: rank(c[0]))
+
+        alternatives = []
+        for user_id, slot in candidates:
+            c_slot = _actual_slot(slot, slots)
+            alternatives.append({
+                'dj_id': user_id,
+                'dj_name': names.get(user_id, '?'),
+                'time_slot': c_slot,
+                'tarif': calculate_tarif(d, c_slot),
+                'count': counts.get(user_id, 0)
+            })
+
+        best = 0
+        if budget is not None:
+            best = next((i for i, alt in enumerate(alternatives) if spend + alt['tarif'] <= budget), None)
+            if best is None:
+                continue
+        user_id, original_slot = candidates[best]
+        chosen = alternatives[best]
+
+        suggestions.append({
+            'date': d.strftime('%Y-%m-%d'),
+            'date_formatted': d.strftime('%A %d/%m'),
+            'dj_id': user_id,
+            'dj_name': chosen['dj_name'],
+            'time_slot': chosen['time_slot'],
+            'original_slot': original_slot,
+            'tarif': chosen['tarif'],
+            'alternatives': alternatives
+        })
+
+        spend += chosen['tarif']
+        counts[user_id] = counts.get(user_id, 0) + 1
+        slots.add(chosen['time_slot'])
+        djs.add(user_id)
+        if chosen['time_slot'] == TimeSlot.PEAKTIME_DUO:
+            duo_count[d] = duo_count.get(d, 0) + 1
+
+    return {
+        'suggestions': suggestions,
+        'total_dates': len(fillable),
+        'fillable': fillable,
+        'existing': existing,
+        'spend': spend,
+    }
+
+
+def suggestion_json(suggestion):
+    """Suggestion prête pour le dashboard : créneaux en texte ('warmup')"""
+    return {
+        **suggestion,
+        'time_slot': suggestion['time_slot'].key,
+        'original_slot': suggestion['original_slot'].key,
+        'alternatives': [{**alt, 'time_slot': alt['time_slot'].key} for alt in suggestion['alternatives']],
+    }
+
+
+def season_months(year, month, count):
+    """[(année, mois), ...] sur count mois à partir de year/month"""
+    months = []
+    for offset in range(count):
+        m = month - 1 + offset
+        months.append((year + m // 12, m % 12 + 1))
+    return months
+
+
+def season_snapshot(months, availability_index, start):
+    """Copie picklable des données de la saison, pour les workers du pool"""
+    snapshot = {'start': start, 'names': dict(availability_index.users), 'months': []}
+    for year, month in months:
+        available, assigned = availability_index.month_view(year, month)
+        snapshot['months'].append({'year': year, 'month': month, 'available': available, 'assigned': assigned})
+    return snapshot
+
+
+def plan_season(snapshot, scenario, deadline=None):
+    """Planifier la saison selon un scénario ; s'arrête entre deux mois si deadline (time.time()) est dépassée"""
+    started = time.perf_counter()
+    rng = random.Random(scenario.get('seed', 0))
+    budget = scenario.get('budget')
+    names = snapshot['names']
+
+    prior = {}
+    suggested = {}
+    months = []
+    spend = 0
+    total_dates = filled_dates = 0
+    status = 'ok'
+
+    for data in snapshot['months']:
+        if deadline is not None and time.time() > deadline:
+            status = 'timeout'
+            break
+        result = plan_month(
+            data['year'], data['month'], data['available'], data['assigned'], snapshot['start'],
+            names=names, rng=rng, prior=prior,
+            carry_over=scenario.get('carry_over', 0),
+            max_sets=scenario.get('max_sets'),
+            budget=None if budget is None else budget - spend
+        )
+        spend += result['spend']
+        total_dates += result['total_dates']
+        filled_dates += len(result['suggestions'])
+
+        month_counts = dict(result['existing'])
+        for s in result['suggestions']:
+            month_counts[s['dj_id']] = month_counts.get(s['dj_id'], 0) + 1
+            suggested[s['dj_id']] = suggested.get(s['dj_id'], 0) + 1
+        for user_id, count in month_counts.items():
+            prior[user_id] = prior.get(user_id, 0) + count
+
+        months.append({
+            'year': data['year'],
+            'month': data['month'],
+            'total_dates': result['total_dates'],
+            'filled_dates': len(result['suggestions']),
+            'spend': result['spend'],
+            'suggestions': [{'date': s['date'], 'dj_id': s['dj_id'], 'dj_name': s['dj_name'],
+                             'time_slot': s['time_slot'].key, 'tarif': s['tarif']}
+                            for s in result['suggestions']],
+        })
+
+    # Charge de la saison (sets existants + suggérés) des DJs ayant au moins une dispo
+    with_availability = {user_id for data in snapshot['months']
+                         for djs in data['available'].values() for user_id in djs}
+    loads = [prior.get(user_id, 0) for user_id in with_availability]
+    mean = sum(loads) / len(loads) if loads else 0
+
+    return {
+        'name': scenario.get('name', '?'),
+        'scenario': scenario,
+        'status': status,
+        'months': months,
+        'coverage': {
+            'total_dates': total_dates,
+            'filled_dates': filled_dates,
+            'rate': round(filled_dates / total_dates * 100, 1) if total_dates else 100.0,
+        },
+        'spend': spend,
+        'load': {
+            'min': min(loads, default=0),
+            'max': max(loads, default=0),
+            'stdev': round(math.sqrt(sum((n - mean) ** 2 for n in loads) / len(loads)), 2) if loads else 0,
+            'djs_used': len(suggested),
+        },
+        'dj_load': sorted(
+            ({'dj_id': user_id, 'dj_name': names.get(user_id, '?'),
+              'total': prior.get(user_id, 0), 'suggested': suggested.get(user_id, 0)}
+             for user_id in prior),
+            key=lambda row: (-row['total'], row['dj_name'])
+        ),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def validate_scenario(raw):
+    """Scénario reçu en JSON -> dict normalisé (ValueError si invalide)"""
+    if not isinstance(raw, dict):
+        raise ValueError('Scénario invalide')
+    scenario = {
+        'name': str(raw.get('name') or 'Scénario')[:60],
+        'carry_over': float(raw.get('carry_over', 0)),
+        'seed': int(raw.get('seed', 0)),
+    }
+    if not 0 <= scenario['carry_over'] <= 1:
+        raise ValueError('carry_over doit être entre 0 et 1')
+    if raw.get('max_sets') is not None:
+        scenario['max_sets'] = int(raw['max_sets'])
+        if scenario['max_sets'] < 1:
+            raise ValueError('max_sets doit être positif')
+    if raw.get('budget') is not None:
+        scenario['budget'] = int(raw['budget'])
+        if scenario['budget'] < 0:
+            raise ValueError('budget doit être positif')
+    return scenario
+
+
+def _get_pool(workers):
+    """Pool du processus courant (recréé après un fork : gunicorn --preload)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] != os.getpid() or _pool[1] != workers:
+            if _pool is not None and _pool[0] == os.getpid():
+                _pool[2].shutdown(wait=False, cancel_futures=True)
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['planner'])  # Importé une fois par le serveur, pas par worker
+            _pool = (os.getpid(), workers, ProcessPoolExecutor(max_workers=workers, mp_context=context))
+        return _pool[2]
+
+
+def _drop_pool(executor):
+    """Oublier un pool cassé (worker tué) : le suivant est recréé à la demande"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[2] is executor:
+            _pool = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_scenarios(snapshot, scenarios, time_budget, workers):
+    """Évaluer les scénarios en parallèle ; ceux qui dépassent time_budget (s) sont marqués timeout
+
+    À l'échéance, les scénarios pas encore démarrés sont annulés et ceux en
+    cours s'arrêtent d'eux-mêmes au mois suivant (plan_season) : rien ne
+    tourne plus dans le pool une fois la réponse envoyée.
+    """
+    deadline = time.time() + time_budget
+    if workers <= 1 or len(scenarios) == 1:
+        return [plan_season(snapshot, scenario, deadline) for scenario in scenarios]
+
+    executor = _get_pool(workers)
+    try:
+        futures = [executor.submit(plan_season, snapshot, scenario, deadline) for scenario in scenarios]
+    except BrokenProcessPool:
+        _drop_pool(executor)
+        executor = _get_pool(workers)
+        futures = [executor.submit(plan_season, snapshot, scenario, deadline) for scenario in scenarios]
+    # Petite marge : un worker ne vérifie l'échéance qu'entre deux mois
+    wait(futures, timeout=time_budget + 1)
+
+    results = []
+    for scenario, future in zip(scenarios, futures):
+        future.cancel()  # Sans effet si le scénario a démarré
+        error = future.exception() if future.done() and not future.cancelled() else True
+        if error is None:
+            results.append(future.result())
+        else:
+            if isinstance(error, BrokenProcessPool):
+                _drop_pool(executor)
+            results.append({'name': scenario['name'], 'scenario': scenario, 'status': 'timeout'})
+    return results
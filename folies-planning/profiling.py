@@ -0,0 +1,156 @@
+"""Profilage à la demande des routes admin (cProfile)
+
+Un profil est pris autour de la vue :
+- sur demande, avec l'en-tête ``X-Profile: 1`` envoyé par un admin connecté ;
+- par échantillonnage, sur PROFILE_SAMPLE_RATE (0 à 1) des requêtes admin.
+
+Chaque profil est écrit au format pstats dans PROFILE_DIR (par défaut
+instance/profiles) sous le nom ``<horodatage>-<endpoint>-<durée>ms.pstats`` ;
+seuls les PROFILE_MAX_FILES plus récents sont gardés. Les fichiers se lisent
+avec ``python -m pstats`` ou snakeviz, et /admin/profiles résume les fonctions
+les plus coûteuses (temps cumulé) par route.
+"""
+import cProfile
+import os
+import pstats
+import random
+import time
+from datetime import datetime
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+PROFILE_HEADER = 'X-Profile'
+SUFFIX = '.pstats'
+
+
+def profile_dir(app=None):
+    app = app or current_app
+    return app.config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+
+def _wants_profile():
+    if request.blueprint != 'admin' or not current_user.is_authenticated or not current_user.is_admin:
+        return False
+    if request.headers.get(PROFILE_HEADER) == '1':
+        return True
+    rate = current_app.config.get('PROFILE_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    if not _wants_profile():
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Un autre profileur tourne déjà dans ce processus
+        return
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+
+
+def _stop_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    elapsed_ms = int((time.perf_counter() - g.pop('profile_start')) * 1000)
+
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.endpoint}-{elapsed_ms}ms{SUFFIX}"
+    profiler.dump_stats(os.path.join(directory, name))
+    rotate(directory, current_app.config.get('PROFILE_MAX_FILES', 200))
+
+    response.headers['X-Profile-File'] = name
+    return response
+
+
+def _abort_profile(exc):
+    # Exception dans la vue : after_request n'est pas appelé
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def rotate(directory, keep):
+    """Supprimer les profils les plus anciens au-delà de ``keep``"""
+    files = sorted(f for f in os.listdir(directory) if f.endswith(SUFFIX))
+    for name in files[:max(len(files) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass  # Déjà supprimé par un autre worker
+
+
+def parse_name(name):
+    """``<date>-<heure>-<µs>-<endpoint>-<durée>ms.pstats`` -> (datetime, endpoint, ms)"""
+    try:
+        day, hour, micro, endpoint, duration = name[:-len(SUFFIX)].split('-')
+        return datetime.strptime(f"{day}{hour}{micro}", '%Y%m%d%H%M%S%f'), endpoint, int(duration[:-2])
+    except ValueError:
+        return None
+
+
+def list_profiles(directory):
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for name in os.listdir(directory):
+        parsed = parse_name(name) if name.endswith(SUFFIX) else None
+        if parsed:
+            taken_at, endpoint, duration_ms = parsed
+            profiles.append({'name': name, 'taken_at': taken_at, 'endpoint': endpoint, 'duration_ms': duration_ms})
+    profiles.sort(key=lambda p: p['taken_at'], reverse=True)
+    return profiles
+
+
+def _function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # Fonction native, ex. <built-in method ...>
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def top_functions(paths, limit=20):
+    """Fonctions triées par temps cumulé, tous profils d'une route confondus"""
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        'function': _function_label(func),
+        'calls': round(nc / len(paths)),
+        'tottime_ms': round(tt * 1000 / len(paths), 2),
+        'cumtime_ms': round(ct * 1000 / len(paths), 2),
+    } for func, (cc, nc, tt, ct, callers) in rows]
+
+
+def route_summaries(directory, limit=20):
+    """Par route : nombre de profils, durée moyenne/max et fonctions les plus coûteuses (moyenne par requête)"""
+    by_endpoint = {}
+    for profile in list_profiles(directory):
+        by_endpoint.setdefault(profile['endpoint'], []).append(profile)
+
+    summaries = []
+    for endpoint, profiles in by_endpoint.items():
+        durations = [p['duration_ms'] for p in profiles]
+        summaries.append({
+            'endpoint': endpoint,
+            'count': len(profiles),
+            'mean_ms': round(sum(durations) / len(durations)),
+            'max_ms': max(durations),
+            'latest': profiles[0],
+            'functions': top_functions([os.path.join(directory, p['name']) for p in profiles], limit),
+        })
+    summaries.sort(key=lambda s: s['mean_ms'], reverse=True)
+    return summaries
+
+
+def init_profiling(app):
+    """Brancher le profilage autour des vues admin"""
+    app.before_request(_start_profile)
+    app.after_request(_stop_profile)
+    app.teardown_request(_abort_profile)
@@ -0,0 +1,557 @@
+// Dashboard admin : calendrier, equipe DJs, assignations, flux live
+
+function showDayDetails(date) {
+    fetch(`/admin/day-details?date=${date}`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('dayDetailsTitle').textContent = data.date_formatted;
+            document.getElementById('dayDetailsBody').innerHTML = data.html;
+            bootstrap.Modal.getOrCreateInstance(document.getElementById('dayDetailsModal')).show();
+        });
+}
+
+function assignDJ(date, djId) {
+    if (!confirm('Confirmer l\'assignation ?')) return;
+
+    fetch('/admin/assign-dj', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({date: date, dj_id: djId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function toggleDJStatus(djId, currentStatus) {
+    const action = currentStatus ? 'desactiver' : 'activer';
+    if (!confirm(`Voulez-vous ${action} ce DJ ?`)) return;
+
+    fetch('/admin/toggle-dj-status', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({dj_id: djId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function deleteDJ(djId) {
+    if (!confirm('ATTENTION: Supprimer ce DJ supprimera toutes ses donnees. Continuer ?')) return;
+
+    fetch('/admin/delete-dj', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({dj_id: djId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function viewDJCalendar(djId) {
+    window.location.href = `/admin/dj-calendar/${djId}`;
+}
+
+function unassignDJ(date, timeSlot) {
+    if (!confirm('Retirer cette assignation ?')) return;
+
+    fetch('/admin/unassign-dj', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({date: date, time_slot: timeSlot})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function unassignDJById(assignmentId) {
+    if (!confirm('Retirer cette assignation ?')) return;
+
+    fetch('/admin/unassign-dj-by-id', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({assignment_id: assignmentId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+const SLOT_LABELS = {complete: 'Complète', warmup: 'Warm-up', peaktime: 'Peak time', peaktime_duo: 'Peak à 2'};
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function showSubstitutes(assignmentId) {
+    fetch(`/admin/substitutes?assignment_id=${assignmentId}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                alert('Erreur: ' + data.error);
+                return;
+            }
+            const a = data.assignment;
+            let html = `<h6 class="mb-3">Remplacer ${escapeHtml(a.dj_name)} (${SLOT_LABELS[a.time_slot] || a.time_slot})</h6>`;
+            if (!data.substitutes.length) {
+                html += '<div class="alert alert-warning">Aucun DJ disponible pour ce créneau</div>';
+            } else {
+                html += '<div class="list-group mb-3">';
+                data.substitutes.forEach(s => {
+                    html += `
+                    <div class="list-group-item d-flex justify-content-between align-items-center">
+                        <span>
+                            <i class="fas fa-user me-2"></i>${escapeHtml(s.dj_name)}
+                            <span class="badge ${s.exact_slot ? 'bg-success' : 'bg-secondary'} ms-2">${SLOT_LABELS[s.available_slot] || s.available_slot}</span>
+                            <small class="ms-2" style="color: var(--text-muted);">
+                                ${s.month_sets} sets ce mois &middot; set le plus proche : ${s.days_from_nearest_set}j &middot; ${s.tarif}&euro;
+                            </small>
+                        </span>
+                        <button class="btn btn-sm btn-primary" onclick="swapAssignment(${a.id}, ${s.user_id})">Échanger</button>
+                    </div>`;
+                });
+                html += '</div>';
+            }
+            html += `<button class="btn btn-ghost btn-sm" onclick="showDayDetails('${a.date}')"><i class="fas fa-arrow-left me-1"></i>Retour</button>`;
+            document.getElementById('dayDetailsBody').innerHTML = html;
+        });
+}
+
+function swapAssignment(assignmentId, userId) {
+    if (!confirm('Confirmer le remplacement ?')) return;
+
+    fetch('/admin/swap-assignment', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({assignment_id: assignmentId, user_id: userId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function approveDJ(djId) {
+    if (!confirm('Approuver ce DJ ?')) return;
+
+    fetch('/admin/approve-dj', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({dj_id: djId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+function rejectDJ(djId) {
+    if (!confirm('Refuser et supprimer cette demande ?')) return;
+
+    fetch('/admin/reject-dj', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({dj_id: djId})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) location.reload();
+        else alert('Erreur: ' + data.error);
+    });
+}
+
+// === Auto-assignation avec drag & drop ===
+let autoAssignData = [];
+let autoAssignDraft = null;
+let djColors = {};
+const DJ_PALETTE = [
+    '#c8ff00', '#ff3366', '#00e676', '#00b0ff', '#ffab00',
+    '#e040fb', '#ff6e40', '#64ffda', '#7c4dff', '#eeff41',
+    '#ff4081', '#18ffff', '#f4511e', '#76ff03', '#536dfe'
+];
+
+function getDjColor(djName) {
+    if (!djColors[djName]) {
+        const idx = Object.keys(djColors).length % DJ_PALETTE.length;
+        djColors[djName] = DJ_PALETTE[idx];
+    }
+    return djColors[djName];
+}
+
+function getSlotInfo(slot) {
+    const map = {
+        'complete': {cls: 'success', label: 'Complete', icon: 'moon'},
+        'warmup': {cls: 'info', label: 'Warm-up', icon: 'sun'},
+        'peaktime': {cls: 'warning', label: 'Peak time', icon: 'fire'},
+        'peaktime_duo': {cls: 'magenta', label: 'Peak x2', icon: 'user-group'}
+    };
+    return map[slot] || {cls: 'secondary', label: slot, icon: 'question'};
+}
+
+function buildSummary() {
+    const summary = {};
+    autoAssignData.forEach((s, i) => {
+        if (!s.selected) return;
+        if (!summary[s.dj_id]) {
+            summary[s.dj_id] = {dj_name: s.dj_name, existing: s.existing || 0, suggested: 0, total_tarif: 0};
+        }
+        summary[s.dj_id].suggested++;
+        summary[s.dj_id].total_tarif += s.tarif;
+    });
+    return Object.values(summary);
+}
+
+function renderAutoAssign() {
+    const djSummary = buildSummary();
+    const selectedCount = autoAssignData.filter(s => s.selected).length;
+
+    let summaryHtml = '<div class="auto-assign-summary mb-3">';
+    summaryHtml += `<div class="d-flex gap-3 flex-wrap mb-3">
+        <span class="badge badge-solid-accent" style="padding: 0.5em 1em;">
+            <i class="fas fa-calendar-plus me-1"></i>${selectedCount} suggestion(s) selectionnee(s)
+        </span>
+        ${autoAssignDraft ? `<span style="color: var(--text-muted);">
+            <i class="fas fa-floppy-disk me-1"></i>${autoAssignDraft.incremental
+                ? `Brouillon mis a jour : ${autoAssignDraft.resolved_dates} date(s) recalculee(s)`
+                : 'Nouveau brouillon'} (${autoAssignDraft.elapsed_ms} ms)
+        </span>` : ''}
+    </div>`;
+    summaryHtml += '<div class="row g-2 mb-3" id="djSummaryChips">';
+    djSummary.forEach(dj => {
+        const color = getDjColor(dj.dj_name);
+        summaryHtml += `
+            <div class="col-auto">
+                <div class="auto-assign-dj-chip" style="border-left: 3px solid ${color};">
+                    <i class="fas fa-headphones" style="color: ${color};"></i>
+                    <strong>${dj.dj_name}</strong>
+                    <span class="badge bg-secondary">${dj.existing}</span>
+                    <span class="badge badge-solid-accent">+${dj.suggested}</span>
+                    <span class="badge badge-solid-success">${dj.total_tarif}&euro;</span>
+                </div>
+            </div>`;
+    });
+    summaryHtml += '</div></div>';
+
+    let tableHtml = '<div class="table-responsive"><table class="table table-hover mb-0">';
+    tableHtml += `<thead><tr>
+        <th><input type="checkbox" id="autoAssignSelectAll" ${autoAssignData.every(s=>s.selected)?'checked':''} onchange="toggleAllAutoAssign(this)"></th>
+        <th>Date</th><th>DJ</th><th>Creneau</th><th>Tarif</th><th>Changer DJ</th>
+    </tr></thead><tbody>`;
+
+    autoAssignData.forEach((s, i) => {
+        const info = getSlotInfo(s.time_slot);
+        const color = getDjColor(s.dj_name);
+        const rowClass = s.selected ? '' : 'style="opacity:0.4;"';
+        tableHtml += `<tr ${rowClass} draggable="true" data-index="${i}"
+            ondragstart="onDragStart(event)" ondragover="onDragOver(event)" ondrop="onDrop(event)">
+            <td><input type="checkbox" class="auto-assign-check" data-index="${i}" ${s.selected?'checked':''}
+                onchange="toggleSuggestion(${i}, this.checked)"></td>
+            <td><strong>${s.date_formatted}</strong></td>
+            <td>
+                <span class="aa-dj-tag" style="background: ${color}22; color: ${color}; border: 1px solid ${color}44; padding: 2px 8px; border-radius: 6px; font-weight: 700; font-size: 0.8rem;">
+                    <i class="fas fa-headphones" style="font-size: 0.65rem;"></i> ${s.dj_name}
+                </span>
+            </td>
+            <td><span class="badge badge-solid-${info.cls}"><i class="fas fa-${info.icon} me-1"></i>${info.label}</span></td>
+            <td><strong style="color: var(--success);">${s.tarif}&euro;</strong></td>
+            <td>
+                <select class="form-select form-select-sm" style="width: auto; min-width: 120px; font-size: 0.75rem;"
+                    onchange="changeDJ(${i}, this.value)">
+                    ${s.alternatives.map(alt =>
+                        `<option value="${alt.dj_id}" ${alt.dj_id === s.dj_id ? 'selected' : ''}>${alt.dj_name} (${alt.count} sets)</option>`
+                    ).join('')}
+                </select>
+            </td>
+        </tr>`;
+    });
+
+    tableHtml += '</tbody></table></div>';
+    document.getElementById('autoAssignBody').innerHTML = summaryHtml + tableHtml;
+    document.getElementById('autoAssignFooter').style.display = 'flex';
+}
+
+function toggleSuggestion(idx, checked) {
+    autoAssignData[idx].selected = checked;
+    renderAutoAssign();
+}
+
+function changeDJ(idx, newDjId) {
+    const alt = autoAssignData[idx].alternatives.find(a => a.dj_id == newDjId);
+    if (alt) {
+        autoAssignData[idx].dj_id = alt.dj_id;
+        autoAssignData[idx].dj_name = alt.dj_name;
+        autoAssignData[idx].tarif = alt.tarif;
+        renderAutoAssign();
+    }
+}
+
+// Drag & drop pour echanger des DJs entre lignes
+let dragSrcIdx = null;
+function onDragStart(e) {
+    dragSrcIdx = parseInt(e.currentTarget.dataset.index);
+    e.dataTransfer.effectAllowed = 'move';
+    e.currentTarget.style.opacity = '0.5';
+}
+function onDragOver(e) {
+    e.preventDefault();
+    e.dataTransfer.dropEffect = 'move';
+    e.currentTarget.style.background = 'var(--bg-hover)';
+}
+function onDrop(e) {
+    e.preventDefault();
+    e.currentTarget.style.background = '';
+    const targetIdx = parseInt(e.currentTarget.dataset.index);
+    if (dragSrcIdx !== null && dragSrcIdx !== targetIdx) {
+        // Echanger les DJs
+        const srcDj = {dj_id: autoAssignData[dragSrcIdx].dj_id, dj_name: autoAssignData[dragSrcIdx].dj_name};
+        const tgtDj = {dj_id: autoAssignData[targetIdx].dj_id, dj_name: autoAssignData[targetIdx].dj_name};
+        autoAssignData[dragSrcIdx].dj_id = tgtDj.dj_id;
+        autoAssignData[dragSrcIdx].dj_name = tgtDj.dj_name;
+        autoAssignData[targetIdx].dj_id = srcDj.dj_id;
+        autoAssignData[targetIdx].dj_name = srcDj.dj_name;
+        // Recalculer les tarifs
+        autoAssignData[dragSrcIdx].tarif = autoAssignData[dragSrcIdx].alternatives.find(a => a.dj_id == tgtDj.dj_id)?.tarif || autoAssignData[dragSrcIdx].tarif;
+        autoAssignData[targetIdx].tarif = autoAssignData[targetIdx].alternatives.find(a => a.dj_id == srcDj.dj_id)?.tarif || autoAssignData[targetIdx].tarif;
+        renderAutoAssign();
+    }
+    dragSrcIdx = null;
+}
+
+function autoAssign(reset = false) {
+    const month = document.querySelector('select[name="month"]').value;
+    const year = document.querySelector('select[name="year"]').value;
+
+    document.getElementById('autoAssignBody').innerHTML = `
+        <div class="text-center py-4">
+            <div class="spinner-border" style="color: var(--accent);" role="status"></div>
+            <p class="mt-2" style="color: var(--text-muted);">Calcul en cours...</p>
+        </div>`;
+    document.getElementById('autoAssignFooter').style.display = 'none';
+    djColors = {};
+    bootstrap.Modal.getOrCreateInstance(document.getElementById('autoAssignModal')).show();
+
+    fetch('/admin/auto-assign', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({month: parseInt(month), year: parseInt(year), reset: reset})
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (!data.success) {
+            document.getElementById('autoAssignBody').innerHTML = `
+                <div class="text-center py-4">
+                    <i class="fas fa-exclamation-triangle" style="font-size: 2rem; color: var(--danger);"></i>
+                    <p class="mt-2">Erreur: ${data.error}</p>
+                </div>`;
+            return;
+        }
+
+        if (data.suggestions.length === 0) {
+            document.getElementById('autoAssignBody').innerHTML = `
+                <div class="text-center py-4">
+                    <i class="fas fa-check-circle" style="font-size: 2rem; color: var(--success);"></i>
+                    <p class="mt-2">Aucune date a remplir ou aucune disponibilite.</p>
+                </div>`;
+            return;
+        }
+
+        // Ajouter le flag selected et les infos existing
+        autoAssignData = data.suggestions.map(s => ({...s, selected: true, alternatives: s.alternatives || [{dj_id: s.dj_id, dj_name: s.dj_name, tarif: s.tarif, count: 0}]}));
+
+        // Pré-assigner les couleurs
+        data.dj_summary.forEach(dj => getDjColor(dj.dj_name));
+        autoAssignData.forEach(s => { s.existing = data.dj_summary.find(d => d.dj_name === s.dj_name)?.existing || 0; });
+
+        autoAssignDraft = data.draft;
+        renderAutoAssign();
+    })
+    .catch(err => {
+        document.getElementById('autoAssignBody').innerHTML = `
+            <div class="text-center py-4">
+                <i class="fas fa-exclamation-triangle" style="font-size: 2rem; color: var(--danger);"></i>
+                <p class="mt-2">Erreur: ${err.message}</p>
+            </div>`;
+    });
+}
+
+function toggleAllAutoAssign(el) {
+    autoAssignData.forEach(s => s.selected = el.checked);
+    renderAutoAssign();
+}
+
+function confirmAutoAssign() {
+    const selected = autoAssignData.filter(s => s.selected).map(s => ({
+        date: s.date,
+        dj_id: s.dj_id,
+        time_slot: s.time_slot
+    }));
+
+    if (selected.length === 0) {
+        alert('Aucune suggestion selectionnee.');
+        return;
+    }
+
+    if (!confirm(`Confirmer l'assignation de ${selected.length} date(s) ?`)) return;
+
+    fetch('/admin/bulk-assign', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({assignments: selected})
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            let msg = `${data.created} assignation(s) creee(s) !`;
+            if (data.errors.length > 0) {
+                msg += `\n\nErreurs:\n${data.errors.join('\n')}`;
+            }
+            alert(msg);
+            location.reload();
+        } else {
+            alert('Erreur: ' + data.error);
+        }
+    });
+}
+
+// === Planification de saison : scenarios compares ===
+let seasonData = null;
+
+function seasonPlan() {
+    const month = document.querySelector('select[name="month"]').value;
+    const year = document.querySelector('select[name="year"]').value;
+    const months = document.getElementById('seasonMonths').value;
+    const body = document.getElementById('seasonPlanBody');
+
+    body.innerHTML = `
+        <div class="text-center py-4">
+            <div class="spinner-border" style="color: var(--accent);" role="status"></div>
+            <p class="mt-2" style="color: var(--text-muted);">Calcul des scenarios...</p>
+        </div>`;
+    bootstrap.Modal.getOrCreateInstance(document.getElementById('seasonPlanModal')).show();
+
+    fetch('/admin/season-plan', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({month: parseInt(month), year: parseInt(year), months: parseInt(months)})
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (!data.success) {
+            body.innerHTML = `<p class="text-center py-4">Erreur: ${escapeHtml(data.error)}</p>`;
+            return;
+        }
+        seasonData = data;
+        renderSeasonPlan();
+    })
+    .catch(err => {
+        body.innerHTML = `<p class="text-center py-4">Erreur: ${escapeHtml(err.message)}</p>`;
+    });
+}
+
+function renderSeasonPlan() {
+    const scenarios = seasonData.scenarios;
+    const head = scenarios.map(s => `<th class="text-center">${escapeHtml(s.name)}</th>`).join('');
+    const row = (label, cell) => `<tr><td>${label}</td>${scenarios.map(s =>
+        `<td class="text-center">${s.status === 'ok' ? cell(s) : '<span class="badge bg-secondary">Temps depasse</span>'}</td>`).join('')}</tr>`;
+
+    let html = `<p style="color: var(--text-muted);">${seasonData.months.length} mois, calcule en ${seasonData.elapsed_ms} ms</p>
+        <div class="table-responsive"><table class="table table-sm align-middle">
+        <thead><tr><th></th>${head}</tr></thead><tbody>`;
+    html += row('Couverture', s => `${s.coverage.filled_dates}/${s.coverage.total_dates} dates (${s.coverage.rate}%)`);
+    html += row('Depense suggeree', s => `${s.spend}&euro;`);
+    html += row('Sets par DJ (min / max)', s => `${s.load.min} / ${s.load.max}`);
+    html += row('Ecart-type de charge', s => s.load.stdev);
+    html += row('DJs sollicites', s => s.load.djs_used);
+    html += row('', s => `<button class="btn btn-accent btn-sm" onclick="applySeasonScenario(${scenarios.indexOf(s)})">
+        <i class="fas fa-check me-1"></i>Appliquer</button>`);
+    html += '</tbody></table></div>';
+
+    // Charge par DJ, cote a cote
+    const djs = {};
+    scenarios.forEach((s, i) => (s.dj_load || []).forEach(d => {
+        djs[d.dj_id] = djs[d.dj_id] || {name: d.dj_name, totals: []};
+        djs[d.dj_id].totals[i] = d.total;
+    }));
+    const rows = Object.values(djs).sort((a, b) => Math.max(...b.totals.map(t => t || 0)) - Math.max(...a.totals.map(t => t || 0)));
+    html += `<h6 class="mt-3">Sets sur la saison par DJ</h6>
+        <div class="table-responsive" style="max-height: 320px;"><table class="table table-sm">
+        <thead><tr><th>DJ</th>${head}</tr></thead><tbody>`;
+    rows.forEach(d => {
+        html += `<tr><td>${escapeHtml(d.name)}</td>${scenarios.map((s, i) => `<td class="text-center">${d.totals[i] || 0}</td>`).join('')}</tr>`;
+    });
+    html += '</tbody></table></div>';
+
+    document.getElementById('seasonPlanBody').innerHTML = html;
+}
+
+function applySeasonScenario(idx) {
+    const scenario = seasonData.scenarios[idx];
+    const assignments = scenario.months.flatMap(m => m.suggestions.map(s => ({
+        date: s.date,
+        dj_id: s.dj_id,
+        time_slot: s.time_slot
+    })));
+    if (assignments.length === 0) {
+        alert('Aucune suggestion dans ce scenario.');
+        return;
+    }
+    if (!confirm(`Appliquer « ${scenario.name} » : ${assignments.length} assignation(s) ?`)) return;
+
+    fetch('/admin/bulk-assign', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({assignments: assignments})
+    })
+    .then(r => r.json())
+    .then(data => {
+        if (data.success) {
+            let msg = `${data.created} assignation(s) creee(s) !`;
+            if (data.errors.length > 0) {
+                msg += `\n\nErreurs:\n${data.errors.join('\n')}`;
+            }
+            alert(msg);
+            location.reload();
+        } else {
+            alert('Erreur: ' + data.error);
+        }
+    });
+}
+
+// === Flux live (SSE) : mise a jour des cases du calendrier sans recharger ===
+function startLiveFeed() {
+    if (!window.EventSource) return;
+    const month = document.querySelector('select[name="month"]').value;
+    const year = document.querySelector('select[name="year"]').value;
+    const source = new EventSource(`/admin/live?month=${month}&year=${year}`);
+
+    source.addEventListener('change', e => {
+        const data = JSON.parse(e.data);
+        const cell = document.querySelector(`.calendar-day-admin[data-date="${data.date}"]`);
+        if (!cell || !data.html) return;
+        cell.className = `calendar-day-admin ${data.status}`;
+        cell.innerHTML = data.html;
+        cell.classList.add('live-updated');
+    });
+
+    // Evenements perdus (onglet trop lent) : seul cas ou l'on recharge la page
+    source.addEventListener('resync', () => location.reload());
+}
+
+startLiveFeed();
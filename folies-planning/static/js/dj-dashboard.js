@@ -0,0 +1,75 @@
+// Dashboard DJ : saisie des disponibilites
+
+function toggleAvailability(date, currentStatus) {
+    const dayElement = document.querySelector(`[data-date="${date}"]`);
+    if (dayElement.classList.contains('past') || dayElement.classList.contains('assigned')) {
+        return;
+    }
+
+    const modalHTML = `
+        <div class="modal fade" id="timeSlotModal" tabindex="-1">
+            <div class="modal-dialog modal-dialog-centered">
+                <div class="modal-content">
+                    <div class="modal-header">
+                        <h5 class="modal-title"><i class="fas fa-clock me-2" style="color: var(--accent);"></i>Disponibilite</h5>
+                        <button type="button" class="btn-close" data-bs-dismiss="modal"></button>
+                    </div>
+                    <div class="modal-body">
+                        <p style="color: var(--text-secondary);" class="mb-3">Pour quelle tranche horaire es-tu dispo ?</p>
+                        <div class="d-grid gap-2">
+                            <button class="btn btn-ghost" onclick="saveAvailability('${date}', true, 'complete')">
+                                <i class="fas fa-moon me-2"></i>Soiree complete (00h-6h)
+                            </button>
+                            <button class="btn btn-ghost" onclick="saveAvailability('${date}', true, 'warmup')">
+                                <i class="fas fa-sun me-2"></i>Warm-up (00h-2h)
+                            </button>
+                            <button class="btn btn-ghost" onclick="saveAvailability('${date}', true, 'peaktime')">
+                                <i class="fas fa-fire me-2"></i>Peak time (2h-6h)
+                            </button>
+                            <button class="btn btn-ghost" onclick="saveAvailability('${date}', true, 'peaktime_duo')" style="border-left: 3px solid var(--magenta);">
+                                <i class="fas fa-user-group me-2" style="color: var(--magenta);"></i>Peak time a 2 (2h-6h) - 100&euro;
+                            </button>
+                            <hr style="border-color: var(--border);">
+                            <button class="btn btn-danger-custom" onclick="saveAvailability('${date}', false, 'complete')">
+                                <i class="fas fa-times me-2"></i>Non disponible
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    const oldModal = document.getElementById('timeSlotModal');
+    if (oldModal) oldModal.remove();
+
+    document.body.insertAdjacentHTML('beforeend', modalHTML);
+    const modal = new bootstrap.Modal(document.getElementById('timeSlotModal'));
+    modal.show();
+}
+
+function saveAvailability(date, isAvailable, timeSlot) {
+    fetch('/dj/toggle-availability', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            date: date,
+            is_available: isAvailable,
+            time_slot: timeSlot
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const modal = bootstrap.Modal.getInstance(document.getElementById('timeSlotModal'));
+            if (modal) modal.hide();
+            location.reload();
+        } else {
+            alert('Erreur: ' + data.error);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Erreur lors de la mise a jour');
+    });
+}
@@ -0,0 +1,171 @@
+"""Statistiques mensuelles par DJ (table dj_month_stats)
+
+Les compteurs sont mis à jour dans la transaction de chaque écriture par
+un UPSERT atomique (``col = col + delta``), sans relire la ligne : deux
+workers qui écrivent en même temps ne perdent pas d'incrément.
+
+rebuild_stats() recalcule toute la table depuis availabilities et
+assignments, archives comprises (commande ``flask rebuild-stats``).
+"""
+from sqlalchemy.dialects.sqlite import insert
+
+from models import db, Availability, Assignment, AvailabilityArchive, AssignmentArchive, DjMonthStats, TimeSlot
+
+SLOT_COLUMNS = {
+    TimeSlot.COMPLETE: 'sets_complete',
+    TimeSlot.WARMUP: 'sets_warmup',
+    TimeSlot.PEAKTIME: 'sets_peaktime',
+    TimeSlot.PEAKTIME_DUO: 'sets_peaktime_duo',
+}
+COUNTER_COLUMNS = list(SLOT_COLUMNS.values()) + ['availability_days', 'total_tarif']
+
+
+def _increment(user_id, year, month, **deltas):
+    values = {'user_id': user_id, 'year': year, 'month': month}
+    values.update({col: 0 for col in COUNTER_COLUMNS})
+    values.update(deltas)
+
+    table = DjMonthStats.__table__
+    stmt = insert(table).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'year', 'month'],
+        set_={col: table.c[col] + stmt.excluded[col] for col in deltas}
+    )
+    db.session.execute(stmt)
+
+
+def apply_assignment(assignment, sign=1):
+    """Compter (+1) ou décompter (-1) un set dans les stats du mois"""
+    column = SLOT_COLUMNS.get(assignment.time_slot)
+    deltas = {'total_tarif': sign * (assignment.tarif or 0)}
+    if column:
+        deltas[column] = sign
+    _increment(assignment.user_id, assignment.date.year, assignment.date.month, **deltas)
+
+
+def apply_availability(user_id, day_date, delta):
+    """Ajuster le nombre de jours de dispo (delta = +1, -1 ou 0)"""
+    if delta:
+        _increment(user_id, day_date.year, day_date.month, availability_days=delta)
+
+
+def apply_availability_days(deltas):
+    """Ajustements groupés {(user_id, year, month): delta} en un seul executemany (import CSV)"""
+    rows = [
+        dict({col: 0 for col in COUNTER_COLUMNS}, user_id=user_id, year=year, month=month, availability_days=delta)
+        for (user_id, year, month), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    table = DjMonthStats.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'year', 'month'],
+        set_={'availability_days': table.c.availability_days + stmt.excluded.availability_days}
+    )
+    db.session.execute(stmt, rows)
+
+
+def rebuild_stats():
+    """Recalculer entièrement dj_month_stats (requêtes d'agrégation sur actif + archive)"""
+    set_rows, avail_rows = [], []
+    # Actif + archive : les compteurs couvrent tout l'historique
+    for assignment_model, availability_model in ((Assignment, Availability), (AssignmentArchive, AvailabilityArchive)):
+        year = db.extract('year', assignment_model.date)
+        month = db.extract('month', assignment_model.date)
+        set_rows += db.session.query(
+            assignment_model.user_id, year, month, assignment_model.time_slot,
+            db.func.count(assignment_model.id), db.func.coalesce(db.func.sum(assignment_model.tarif), 0)
+        ).group_by(assignment_model.user_id, year, month, assignment_model.time_slot).all()
+
+        avail_year = db.extract('year', availability_model.date)
+        avail_month = db.extract('month', availability_model.date)
+        avail_rows += db.session.query(
+            availability_model.user_id, avail_year, avail_month, db.func.count(availability_model.id)
+        ).filter(
+            availability_model.is_available == True
+        ).group_by(availability_model.user_id, avail_year, avail_month).all()
+
+    rows = {}
+
+    def row_for(user_id, y, m):
+        key = (user_id, int(y), int(m))
+        if key not in rows:
+            rows[key] = dict(user_id=key[0], year=key[1], month=key[2], **{col: 0 for col in COUNTER_COLUMNS})
+        return rows[key]
+
+    for user_id, y, m, time_slot, count, tarif in set_rows:
+        row = row_for(user_id, y, m)
+        column = SLOT_COLUMNS.get(time_slot)
+        if column:
+            row[column] += count
+        row['total_tarif'] += tarif
+
+    for user_id, y, m, count in avail_rows:
+        row_for(user_id, y, m)['availability_days'] += count
+
+    DjMonthStats.query.delete()
+    if rows:
+        db.session.execute(DjMonthStats.__table__.insert(), list(rows.values()))
+    db.session.commit()
+    return len(rows)
+
+
+def month_stats(year, month, user_id=None):
+    """Lignes précalculées du mois, indexées par user_id"""
+    query = DjMonthStats.query.filter_by(year=year, month=month)
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    return {row.user_id: row for row in query.all()}
+
+
+def _sets_expr():
+    return (DjMonthStats.sets_complete + DjMonthStats.sets_warmup
+            + DjMonthStats.sets_peaktime + DjMonthStats.sets_peaktime_duo)
+
+
+def set_counts(today, user_id=None):
+    """Sets passés et à venir par DJ : {user_id: (passés, à venir)}
+
+    Les mois entiers viennent de dj_month_stats ; seul le mois en cours est
+    découpé autour d'aujourd'hui par une requête sur assignments.
+    """
+    period = DjMonthStats.year * 12 + DjMonthStats.month
+    current = today.year * 12 + today.month
+    query = db.session.query(
+        DjMonthStats.user_id,
+        db.func.sum(db.case((period < current, _sets_expr()), else_=0)),
+        db.func.sum(db.case((period > current, _sets_expr()), else_=0))
+    ).filter(period != current).group_by(DjMonthStats.user_id)
+    if user_id is not None:
+        query = query.filter(DjMonthStats.user_id == user_id)
+
+    counts = {uid: [past or 0, upcoming or 0] for uid, past, upcoming in query.all()}
+
+    first_day = today.replace(day=1)
+    next_month = date_after_month(first_day)
+    current_query = db.session.query(
+        Assignment.user_id,
+        db.func.sum(db.case((Assignment.date < today, 1), else_=0)),
+        db.func.sum(db.case((Assignment.date >= today, 1), else_=0))
+    ).filter(
+        Assignment.date >= first_day,
+        Assignment.date < next_month
+    ).group_by(Assignment.user_id)
+    if user_id is not None:
+        current_query = current_query.filter(Assignment.user_id == user_id)
+
+    for uid, past, upcoming in current_query.all():
+        entry = counts.setdefault(uid, [0, 0])
+        entry[0] += past or 0
+        entry[1] += upcoming or 0
+
+    return {uid: tuple(values) for uid, values in counts.items()}
+
+
+def date_after_month(first_day):
+    """Premier jour du mois suivant"""
+    if first_day.month == 12:
+        return first_day.replace(year=first_day.year + 1, month=1)
+    return first_day.replace(month=first_day.month + 1)
+
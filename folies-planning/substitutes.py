@@ -0,0 +1,56 @@
+"""Remplaçants pour un set (désistement de dernière minute)
+
+Les candidats sont les DJs actifs disponibles à la date, non assignés ce
+soir-là, dont la dispo couvre le créneau à remplacer. Ils sont classés,
+dans l'ordre, par :
+
+1. adéquation du créneau : dispo exacte avant dispo compatible (une
+   soirée complète couvre un warm-up ou un peak) ;
+2. charge du mois : le moins de sets d'abord ;
+3. récence : le plus loin de son set le plus proche d'abord ;
+4. coût : le moins de cachets déjà engagés sur le mois d'abord (à nombre
+   de sets égal, un DJ aux sets du jeudi a coûté moins qu'un DJ du samedi).
+
+Le cachet du set repris (tarif) est le même pour tous les candidats : il
+est affiché, pas utilisé pour le classement.
+
+Tout vient de l'index en mémoire (availability_index.py), sans requête
+dédiée en dehors du rafraîchissement par le journal.
+"""
+from models import calculate_tarif
+from availability_index import index as availability_index, SLOT_FIT
+
+RECENCY_WINDOW_DAYS = 60
+
+
+def find_substitutes(assignment, limit=10):
+    """Meilleurs remplaçants pour un set, du plus pertinent au moins pertinent"""
+    day = assignment.date
+    view = availability_index.day_view(day)
+    fit = SLOT_FIT[assignment.time_slot]
+    tarif = calculate_tarif(day, assignment.time_slot)
+
+    candidates = []
+    for user_id, slot in view['available'].items():
+        if user_id in view['assigned'] or user_id == assignment.user_id or slot not in fit:
+            continue
+        distances = [abs((d - day).days) for d in view['set_dates'].get(user_id, []) if d != day]
+        candidates.append({
+            'user_id': user_id,
+            'dj_name': view['users'].get(user_id, '?'),
+            'available_slot': slot.key,
+            'exact_slot': fit[slot] == 0,
+            'month_sets': view['month_load'].get(user_id, 0),
+            'month_spend': view['month_spend'].get(user_id, 0),
+            'days_from_nearest_set': min(distances + [RECENCY_WINDOW_DAYS]),
+            'tarif': tarif,
+        })
+
+    candidates.sort(key=lambda c: (
+        not c['exact_slot'],
+        c['month_sets'],
+        -c['days_from_nearest_set'],
+        c['month_spend'],
+        c['dj_name'],
+    ))
+    return candidates[:limit]
@@ -0,0 +1,86 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SEND_EMAIL_NOTIFICATIONS'] = 'false'  # Lu par notifications.py sur la classe Config
+
+from config import Config  # noqa: E402
+
+
+@pytest.fixture
+def config(tmp_path):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SEND_EMAIL_NOTIFICATIONS = False
+        PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Les tests n'ont pas besoin d'un hash lent
+    return TestConfig
+
+
+@pytest.fixture
+def app(config):
+    """Application CLI sur une base SQLite jetable"""
+    from factory import create_cli_app
+
+    app = create_cli_app(config)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def web_app(config):
+    """Application web complète (blueprints, compression, bootstrap de la base)"""
+    from flask import g
+    from factory import create_app
+    from availability_index import index
+
+    app = create_app(config)
+    index._cursor = None
+
+    # Les requêtes du client de test réutilisent le contexte poussé ici, donc son g :
+    # l'utilisateur chargé par Flask-Login ne doit pas passer d'un client à l'autre
+    @app.teardown_request
+    def forget_user(exc):
+        g.pop('_login_user', None)
+
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def db(app):
+    """Base neuve au schéma à jour (comme bootstrap_database)"""
+    from models import db
+    from migrations import stamp_head
+    from availability_index import index
+
+    db.create_all()
+    stamp_head()
+    index._cursor = None  # L'index du process se recharge sur cette base à la première lecture
+    yield db
+    db.session.remove()
+
+
+@pytest.fixture
+def make_dj(db):
+    from models import User
+
+    def make_dj(username, **fields):
+        user = User(username=username, email=f'{username}@test.local', dj_name=username.upper(), **fields)
+        user.password_hash = 'x'
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_dj
+
+
+@pytest.fixture
+def admin_client(web_app):
+    """Client connecté avec l'admin par défaut (créé par bootstrap_database)"""
+    client = web_app.test_client()
+    response = client.post('/login', data={'username': Config.DEFAULT_ADMIN_USERNAME,
+                                           'password': Config.DEFAULT_ADMIN_PASSWORD})
+    assert response.status_code == 302
+    return client
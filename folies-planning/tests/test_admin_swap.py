@@ -0,0 +1,57 @@
+"""Échange du DJ d'un set (/admin/swap-assignment)"""
+from datetime import date, timedelta
+
+import pytest
+
+import views.admin
+from models import db, User, Availability, Assignment, TimeSlot
+
+
+@pytest.fixture
+def sent(web_app, monkeypatch):
+    web_app.config['SEND_EMAIL_NOTIFICATIONS'] = True
+    sent = []
+    monkeypatch.setattr(views.admin, 'send_assignment_notification',
+                        lambda app, dj, assignment: sent.append(('assigned', dj.username)))
+    monkeypatch.setattr(views.admin, 'send_reassignment_notification',
+                        lambda app, dj, assignment: sent.append(('reassigned', dj.username)))
+    return sent
+
+
+def make_set(day):
+    alice = User(username='alice', email='alice@test.local', dj_name='ALICE', password_hash='x')
+    bob = User(username='bob', email='bob@test.local', dj_name='BOB', password_hash='x')
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    assignment = Assignment(user_id=alice.id, date=day, time_slot=TimeSlot.WARMUP, tarif=50)
+    db.session.add_all([assignment, Availability(user_id=bob.id, date=day, is_available=True,
+                                                 time_slot=TimeSlot.COMPLETE)])
+    db.session.commit()
+    return assignment.id, bob.id
+
+
+def test_swap_notifies_both_djs(admin_client, sent):
+    assignment_id, bob_id = make_set(date.today() + timedelta(days=3))
+    response = admin_client.post('/admin/swap-assignment', json={'assignment_id': assignment_id, 'user_id': bob_id})
+    assert response.get_json() == {'success': True}
+    assert db.session.get(Assignment, assignment_id).user_id == bob_id
+    assert sent == [('assigned', 'bob'), ('reassigned', 'alice')]
+
+
+def test_swap_rejects_past_dates(admin_client, sent):
+    assignment_id, bob_id = make_set(date.today() - timedelta(days=1))
+    response = admin_client.post('/admin/swap-assignment', json={'assignment_id': assignment_id, 'user_id': bob_id})
+    assert response.get_json()['success'] is False
+    assert db.session.get(Assignment, assignment_id).user.username == 'alice'
+    assert sent == []
+
+
+def test_swap_survives_email_errors(admin_client, sent, monkeypatch):
+    def smtp_down(app, dj, assignment):
+        raise ConnectionError('SMTP indisponible')
+
+    monkeypatch.setattr(views.admin, 'send_reassignment_notification', smtp_down)
+    assignment_id, bob_id = make_set(date.today() + timedelta(days=3))
+    response = admin_client.post('/admin/swap-assignment', json={'assignment_id': assignment_id, 'user_id': bob_id})
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True}
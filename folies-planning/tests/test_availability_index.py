@@ -0,0 +1,42 @@
+"""Index des disponibilités : mois gardés en mémoire"""
+from datetime import date, timedelta
+
+import availability_index
+from availability_index import AvailabilityIndex
+from models import Availability, TimeSlot, User
+
+
+def test_months_are_bounded_lru(db, make_dj, monkeypatch):
+    monkeypatch.setattr(availability_index, 'MAX_CACHED_MONTHS', 3)
+    alice = make_dj('alice')
+    db.session.add(Availability(user_id=alice.id, date=date(2030, 1, 10), is_available=True,
+                                time_slot=TimeSlot.COMPLETE))
+    db.session.commit()
+
+    index = AvailabilityIndex()
+    january = index.month(2030, 1)
+    index.month(2030, 2)
+    index.month(2030, 3)
+    assert index.month(2030, 1) is january  # Janvier redevient le plus récent
+    index.month(2030, 4)
+    assert sorted(index._months) == [(2030, 1), (2030, 3), (2030, 4)]
+    assert index.month_view(2030, 1)[0] == {date(2030, 1, 10): {alice.id: TimeSlot.COMPLETE}}
+
+
+def test_dj_added_by_admin_is_indexed(admin_client, web_app):
+    day = date.today() + timedelta(days=5)
+    availability_index.index.day_view(day)  # Index déjà chargé avant l'ajout
+    response = admin_client.post('/admin/add-dj', data={'dj_name': 'NEW', 'username': 'newdj',
+                                                        'email': 'newdj@test.local', 'password': 'pw-newdj'})
+    assert response.status_code == 302
+
+    client = web_app.test_client()
+    assert client.post('/login', data={'username': 'newdj', 'password': 'pw-newdj'}).status_code == 302
+    response = client.post('/dj/toggle-availability', json={'date': day.isoformat(), 'is_available': True,
+                                                           'time_slot': 'complete'})
+    assert response.get_json() == {'success': True}
+
+    new_dj = User.query.filter_by(username='newdj').one()
+    view = availability_index.index.day_view(day)
+    assert view['users'][new_dj.id] == 'NEW'
+    assert view['available'] == {new_dj.id: TimeSlot.COMPLETE}
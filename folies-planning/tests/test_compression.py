@@ -0,0 +1,53 @@
+"""Compression des réponses et ETag des représentations compressées"""
+import gzip
+from datetime import date
+
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from compression import CompressionMiddleware, encoded_etag, etag_variants
+
+
+def test_encoded_etag():
+    assert encoded_etag('"abc"', 'gzip') == '"abc-gzip"'
+    assert encoded_etag('W/"abc"', 'br') == 'W/"abc-br"'
+    assert etag_variants('abc') == ['abc', 'abc-br', 'abc-gzip']
+
+
+def test_compressed_response_gets_suffixed_etag():
+    def app(environ, start_response):
+        response = Response('x' * 2000, mimetype='text/plain')
+        response.set_etag('abc')
+        return response(environ, start_response)
+
+    client = Client(CompressionMiddleware(app))
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == '"abc-gzip"'
+    assert gzip.decompress(response.data) == b'x' * 2000
+
+    plain = client.get('/')
+    assert plain.headers['ETag'] == '"abc"'
+
+
+def test_ics_revalidation_with_compressed_etag(web_app):
+    from models import db, User, Assignment, TimeSlot
+
+    dj = User(username='alice', email='alice@test.local', dj_name='ALICE', ics_token='secret-token')
+    dj.password_hash = 'x'
+    db.session.add(dj)
+    db.session.flush()
+    db.session.add_all(Assignment(user_id=dj.id, date=date(2026, 3, day), time_slot=TimeSlot.COMPLETE, tarif=100)
+                       for day in range(1, 20))
+    db.session.commit()
+
+    client = web_app.test_client()
+    first = client.get('/dj/secret-token/sets.ics', headers={'Accept-Encoding': 'gzip'})
+    assert first.status_code == 200
+    assert first.headers['Content-Encoding'] == 'gzip'
+    etag = first.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    again = client.get('/dj/secret-token/sets.ics', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
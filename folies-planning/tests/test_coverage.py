@@ -0,0 +1,50 @@
+"""Couverture des soirées et conflits (requête d'agrégation de coverage.py)"""
+from datetime import date
+
+import pytest
+
+from coverage import COVERAGE_FULL, COVERAGE_NONE, COVERAGE_PARTIAL, find_conflicts, missing_slots, period_coverage
+from models import db, Availability, Assignment, TimeSlot
+
+THU, FRI, SAT = date(2030, 3, 7), date(2030, 3, 8), date(2030, 3, 9)
+
+
+@pytest.fixture
+def djs(make_dj):
+    return [make_dj(name).id for name in ('alice', 'bob', 'carol', 'dave')]
+
+
+def available(user_id, day, slot=TimeSlot.COMPLETE):
+    db.session.add(Availability(user_id=user_id, date=day, is_available=True, time_slot=slot))
+
+
+def assigned(user_id, day, slot):
+    db.session.add(Assignment(user_id=user_id, date=day, time_slot=slot, tarif=0))
+
+
+def test_coverage_and_conflicts(djs):
+    alice, bob, carol, dave = djs
+    # Jeudi : warm-up + peak à deux -> couvert ; candidats déjà assignés exclus
+    for user_id in djs:
+        available(user_id, THU)
+    assigned(alice, THU, TimeSlot.WARMUP)
+    assigned(bob, THU, TimeSlot.PEAKTIME_DUO)
+    assigned(carol, THU, TimeSlot.PEAKTIME_DUO)
+    # Vendredi : warm-up seul -> partiel, deux candidats -> conflit
+    assigned(alice, FRI, TimeSlot.WARMUP)
+    available(bob, FRI, TimeSlot.PEAKTIME)
+    available(carol, FRI, TimeSlot.WARMUP)
+    # Samedi : un seul candidat, pas de set -> ni couvert ni conflit
+    available(dave, SAT)
+    db.session.commit()
+
+    days = period_coverage(THU, SAT)
+    assert [days[d]['coverage'] for d in (THU, FRI, SAT)] == [COVERAGE_FULL, COVERAGE_PARTIAL, COVERAGE_NONE]
+    assert days[THU]['candidates'] == 1
+    assert days[FRI]['peak_candidates'] == 1 and days[FRI]['warmup_candidates'] == 1
+    assert {dj['id'] for dj in days[FRI]['djs']} == {bob, carol}
+    assert [day['date'] for day in find_conflicts(THU, SAT)] == [FRI]
+
+    assert missing_slots(days[THU]) == []
+    assert missing_slots(days[FRI]) == [TimeSlot.PEAKTIME]
+    assert missing_slots(days[SAT]) == [TimeSlot.WARMUP, TimeSlot.PEAKTIME]
@@ -0,0 +1,48 @@
+"""Alertes critiques du cron : curseurs des soirées signalées"""
+from datetime import date, timedelta
+
+import cron_reminders
+from config import Config
+from changelog import save_cursor
+from models import ChangeCursor
+
+
+def test_past_alert_cursors_are_pruned(app, db, monkeypatch):
+    monkeypatch.setattr(cron_reminders, 'app', app)
+    monkeypatch.setattr(cron_reminders, 'uncovered_nights', lambda start, end: [])
+    monkeypatch.setattr(Config, 'ADMIN_ALERT_CRITICAL_THRESHOLD', 1)
+    today = date.today()
+    for day in (today - timedelta(days=40), today - timedelta(days=1), today, today + timedelta(days=1)):
+        save_cursor(f'alerte-critique:{day.isoformat()}', 1)
+    save_cursor('stats', 5)
+
+    cron_reminders.check_critical_alerts()
+
+    assert sorted(cursor.consumer for cursor in ChangeCursor.query) == [
+        f'alerte-critique:{today.isoformat()}',
+        f'alerte-critique:{(today + timedelta(days=1)).isoformat()}',
+        'stats',
+    ]
+
+
+def test_daily_digest_skips_nights_just_sent_as_critical(app, db, monkeypatch):
+    from models import TimeSlot
+
+    today = date.today()
+    soon, later = today + timedelta(days=1), today + timedelta(days=5)
+    nights = [{'date': day, 'missing': [TimeSlot.WARMUP], 'warmup_candidates': 0, 'peak_candidates': 3}
+              for day in (soon, later)]
+    sent = []
+    monkeypatch.setattr(cron_reminders, 'app', app)
+    monkeypatch.setattr(cron_reminders, 'uncovered_nights',
+                        lambda start, end: [night for night in nights if start <= night['date'] <= end])
+    monkeypatch.setattr(cron_reminders, 'send_admin_digest',
+                        lambda app, email, nights, critical=False, **kwargs: sent.append(
+                            (critical, [night['date'] for night in nights])))
+    monkeypatch.setattr(Config, 'ADMIN_ALERT_CRITICAL_THRESHOLD', 1)
+    monkeypatch.setattr(Config, 'ADMIN_ALERT_CRITICAL_HOURS', 48)
+    monkeypatch.setattr(Config, 'ADMIN_ALERT_DAYS', 7)
+
+    cron_reminders.check_availability_alerts(already_alerted=cron_reminders.check_critical_alerts())
+
+    assert sent == [(True, [soon]), (False, [later])]
@@ -0,0 +1,55 @@
+"""Import CSV des DJs et des disponibilités"""
+from datetime import date
+
+import pytest
+
+from csv_import import ImportFileError, import_availabilities, import_users
+from models import User, Availability, Assignment, TimeSlot
+
+TODAY = date(2030, 3, 1)
+
+
+def lines(*rows):
+    return iter(row + '\n' for row in rows)
+
+
+def test_import_users_report_and_dry_run(db, make_dj):
+    make_dj('alice')
+    rows = ('username;email;dj_name;password',  # Export Excel français
+            'bob;bob@test.local;BOB;secret',
+            'alice;alice@test.local;ALICE 2;',
+            'carol;alice@test.local;CAROL;secret',
+            'dave;dave@test.local;DAVE;',
+            'bob;bob2@test.local;BOB;secret')
+    dry = import_users(lines(*rows), dry_run=True)
+    assert (dry['created'], dry['updated'], dry['rejected']) == (1, 1, 3)
+    assert User.query.count() == 1  # Rien d'écrit
+
+    report = import_users(lines(*rows), chunk_size=2)
+    assert (report['created'], report['updated'], report['rejected']) == (1, 1, 3)
+    assert [error['line'] for error in report['errors']] == [4, 5, 6]
+    assert User.query.filter_by(username='alice').one().dj_name == 'ALICE 2'
+    assert User.query.filter_by(username='bob').one().password_hash.startswith('pbkdf2:')
+
+
+def test_import_users_missing_columns(db):
+    with pytest.raises(ImportFileError):
+        import_users(lines('username,email'))
+
+
+def test_import_availabilities(db, make_dj):
+    alice = make_dj('alice')
+    db.session.add(Assignment(user_id=alice.id, date=date(2030, 3, 8), time_slot=TimeSlot.WARMUP, tarif=50))
+    db.session.commit()
+    report = import_availabilities(lines(
+        'username,date,time_slot,is_available',
+        'alice,07/03/2030,warmup,',
+        'alice,2030-03-08,,1',      # Déjà assignée
+        'alice,2030-02-20,,1',      # Passée
+        'alice,2030-03-09,soirée,1',
+        'ghost,2030-03-09,,1',
+        'alice,2030-03-14,,non',
+    ), today=TODAY)
+    assert (report['created'], report['rejected']) == (2, 4)
+    rows = {a.date: (a.is_available, a.time_slot) for a in Availability.query}
+    assert rows == {date(2030, 3, 7): (True, TimeSlot.WARMUP), date(2030, 3, 14): (False, None)}
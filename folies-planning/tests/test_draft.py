@@ -0,0 +1,38 @@
+"""Brouillon d'auto-assignation (draft.py)"""
+from datetime import date
+
+import draft
+from models import db, Availability, DraftPlan, TimeSlot
+
+
+def add_availabilities(dj, days):
+    db.session.add_all(Availability(user_id=dj.id, date=day, is_available=True, time_slot=TimeSlot.COMPLETE)
+                       for day in days)
+    db.session.commit()
+
+
+def test_create_plan_is_idempotent(db):
+    first = draft._create_plan(2030, 3)
+    second = draft._create_plan(2030, 3)
+    assert first.id == second.id
+    assert DraftPlan.query.count() == 1
+
+
+def test_concurrent_plan_creation(db, make_dj, monkeypatch):
+    add_availabilities(make_dj('alice'), [date(2030, 3, 7), date(2030, 3, 8)])
+    create_plan = draft._create_plan
+
+    def created_meanwhile(year, month):
+        # Une autre requête crée et valide le brouillon entre la lecture et l'INSERT
+        with db.engine.begin() as other:
+            other.execute(DraftPlan.__table__.insert().values(year=year, month=month, seed=1, sequence=0, existing='{}'))
+        return create_plan(year, month)
+
+    monkeypatch.setattr(draft, '_create_plan', created_meanwhile)
+    plan = draft.draft_plan(2030, 3, date(2030, 3, 1))
+    assert [s['date'] for s in plan['suggestions']] == ['2030-03-07', '2030-03-08']
+    assert DraftPlan.query.count() == 1
+
+    again = draft.draft_plan(2030, 3, date(2030, 3, 1))
+    assert again['incremental']
+    assert again['suggestions'] == plan['suggestions']
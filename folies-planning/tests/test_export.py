@@ -0,0 +1,44 @@
+"""Export par pages (pagination par clé sur (date, id), actif + archive)"""
+import csv
+import io
+import json
+from datetime import date
+
+from archive import archive_before
+from export import iter_csv, iter_ndjson, iter_pages
+from models import db, Assignment, TimeSlot
+
+
+def make_sets(make_dj):
+    # Plusieurs sets le même jour : la page doit reprendre au bon id
+    djs = [make_dj(name).id for name in ('alice', 'bob', 'carol')]
+    days = [date(2028, 1, 5)] * 3 + [date(2029, 6, 1)] + [date(2030, 3, 7)] * 2
+    for user_id, day in zip(djs * 2, days):
+        db.session.add(Assignment(user_id=user_id, date=day, time_slot=TimeSlot.WARMUP, tarif=50))
+    db.session.commit()
+    archive_before(date(2029, 1, 1), log=lambda *args: None)
+
+
+def test_pages_cover_active_and_archive_once(db, make_dj):
+    make_sets(make_dj)
+    rows = [row for page in iter_pages('assignments', page_size=2) for row in page]
+    keys = [(row['date'], row['id']) for row in rows]
+    assert len(keys) == 6
+    assert keys == sorted(set(keys))
+    assert [row['dj_name'] for row in rows] == ['ALICE', 'BOB', 'CAROL', 'ALICE', 'BOB', 'CAROL']
+
+    in_range = [row for page in iter_pages('assignments', date(2028, 1, 5), date(2029, 12, 31), page_size=1)
+                for row in page]
+    assert [row['date'] for row in in_range] == [date(2028, 1, 5)] * 3 + [date(2029, 6, 1)]
+
+
+def test_ndjson_and_csv(db, make_dj):
+    make_sets(make_dj)
+    lines = ''.join(iter_ndjson('assignments', page_size=4)).splitlines()
+    first = json.loads(lines[0])
+    assert len(lines) == 6
+    assert first['date'] == '2028-01-05' and first['time_slot'] == 'warmup' and first['dj_name'] == 'ALICE'
+
+    rows = list(csv.DictReader(io.StringIO(''.join(iter_csv('assignments', page_size=4)))))
+    assert len(rows) == 6 and rows[-1]['date'] == '2030-03-07'
+    assert ''.join(iter_csv('availabilities')).strip() == 'id,date,user_id,dj_name,is_available,time_slot,notes,created_at,updated_at'
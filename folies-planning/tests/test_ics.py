@@ -0,0 +1,42 @@
+"""Flux ICS : token attribué à la création du compte, pliage des lignes"""
+from csv_import import import_users
+from ics import _line
+from migrations import run_migrations
+from models import User
+
+
+def test_token_given_at_creation(make_dj):
+    alice, bob = make_dj('alice'), make_dj('bob')
+    assert alice.ics_token and bob.ics_token
+    assert alice.ics_token != bob.ics_token
+
+
+def test_csv_import_gives_tokens(db, make_dj):
+    legacy = make_dj('legacy')
+    legacy.ics_token = None
+    db.session.commit()
+    lines = iter(['username,email,dj_name,password\n',
+                  'carol,carol@test.local,CAROL,secret\n',
+                  'legacy,legacy@test.local,LEGACY,\n'])
+    import_users(lines)
+    tokens = dict(db.session.execute(db.select(User.username, User.ics_token)).all())
+    assert tokens['carol'] and tokens['legacy']
+
+
+def test_migration_backfills_missing_tokens(db, make_dj):
+    for name in ('alice', 'bob', 'carol'):
+        make_dj(name).ics_token = None
+    db.session.commit()
+    db.session.execute(db.text('DELETE FROM schema_version WHERE version = 10'))
+    db.session.commit()
+
+    run_migrations(chunk_size=2, log=lambda *args: None)
+    tokens = [user.ics_token for user in User.query]
+    assert all(tokens) and len(set(tokens)) == 3
+
+
+def test_line_folding_keeps_utf8_characters():
+    folded = _line('DESCRIPTION:' + 'é' * 60)
+    parts = folded[:-2].split(b'\r\n ')
+    assert all(len(part) <= 75 for part in parts)
+    assert b''.join(parts).decode('utf-8') == 'DESCRIPTION:' + 'é' * 60
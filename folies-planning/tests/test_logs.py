@@ -0,0 +1,44 @@
+"""File de logs : fichier des connexions et listener recréé après un fork"""
+import logging
+
+import pytest
+
+import logs
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch):
+    """configure_logging rejouable : état du module et handlers racine restaurés"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    monkeypatch.setattr(logs, '_listener', None)
+    monkeypatch.setattr(logs, '_listener_args', None)
+    yield
+    logs._stop_listener()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_auth_log_only_gets_auth_logger(tmp_path, fresh_logging):
+    auth_log = tmp_path / 'auth.log'
+    logs.configure_logging(auth_log=str(auth_log), auth_logger=logs.AUTH_LOGGER)
+    logging.getLogger('factory').info('Admin créé : admin / secret')
+    logging.getLogger(logs.AUTH_LOGGER).warning('Login failed for user: 203.0.113.5')
+    logs._stop_listener()
+
+    lines = auth_log.read_text().splitlines()
+    assert len(lines) == 1
+    assert 'Login failed for user: 203.0.113.5' in lines[0]
+
+
+def test_restart_listener_builds_new_listener(tmp_path, fresh_logging):
+    auth_log = tmp_path / 'auth.log'
+    logs.configure_logging(auth_log=str(auth_log), auth_logger=logs.AUTH_LOGGER)
+    first = logs._listener
+    first.stop()  # Comme dans un worker forké : le thread hérité n'existe plus
+
+    logs.restart_listener()
+    assert logs._listener is not first
+    logging.getLogger(logs.AUTH_LOGGER).info('Successful login: alice from 127.0.0.1')
+    logs._stop_listener()
+    assert 'Successful login: alice' in auth_log.read_text()
@@ -0,0 +1,28 @@
+"""Accès à /metrics et comptage des lignes par table"""
+import metrics
+
+
+def test_metrics_local_only_without_token(web_app):
+    client = web_app.test_client()
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.5'}).status_code == 404
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.5'}).status_code == 404
+
+
+def test_metrics_token(web_app):
+    web_app.config['METRICS_TOKEN'] = 'secret'
+    client = web_app.test_client()
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'},
+                          environ_base={'REMOTE_ADDR': '203.0.113.5'})
+    assert response.status_code == 200
+    assert b'folies_table_rows{table="users"}' in response.data
+
+
+def test_row_counts_are_cached(db, make_dj, monkeypatch):
+    monkeypatch.setitem(metrics._row_counts, 'at', None)
+    make_dj('alice')
+    assert dict(metrics.table_row_counts(ttl=300))['users'] == 1
+    make_dj('bob')
+    assert dict(metrics.table_row_counts(ttl=300))['users'] == 1
+    assert dict(metrics.table_row_counts(ttl=0))['users'] == 2
@@ -0,0 +1,152 @@
+"""Reprise des migrations (migrate_db.py) après une interruption"""
+import re
+import sqlite3
+from datetime import date
+
+import pytest
+
+from migrations import MigrationContext, TIME_SLOT_TABLES, current_version, head_version, run_migrations
+
+
+def quiet(*args):
+    pass
+
+
+def execute(db, sql, params=None):
+    return db.session.execute(db.text(sql), params or {})
+
+
+def downgrade_to_v7(db):
+    """Base au schéma de la version 7 : time_slot en texte, sans CHECK"""
+    tables = [table for table, *_ in TIME_SLOT_TABLES] + ['draft_suggestions']
+    for table in tables:
+        create_sql, = execute(db, "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :t", {'t': table}).one()
+        indexes = [row[0] for row in execute(
+            db, "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL", {'t': table})]
+        create_sql = re.sub(r',\s*CONSTRAINT \w+ CHECK \(\w+ IN \([\d, ]+\)\)', '', create_sql)
+        execute(db, f'DROP TABLE {table}')
+        # Colonne ajoutée par ALTER TABLE en version 1 : NULL possible sur les anciens sets
+        execute(db, create_sql.replace('SMALLINT NOT NULL', 'VARCHAR(20)').replace('SMALLINT', 'VARCHAR(20)'))
+        for index_sql in indexes:
+            if 'idx_availability_archive_date' not in index_sql:  # Migration 9
+                execute(db, index_sql)
+    execute(db, 'DELETE FROM schema_version WHERE version > 7')
+    db.session.commit()
+
+
+@pytest.fixture
+def v7(db, make_dj):
+    downgrade_to_v7(db)
+    alice, bob = make_dj('alice'), make_dj('bob')
+    slots = ['complete', 'warmup', 'peaktime', 'peaktime_duo', None]
+    for day in range(1, 11):
+        execute(db, 'INSERT INTO availabilities (user_id, date, is_available, time_slot) VALUES (:u, :d, :a, :s)',
+                {'u': alice.id, 'd': date(2026, 3, day), 'a': slots[day % 5] is not None, 's': slots[day % 5]})
+        execute(db, 'INSERT INTO assignments (user_id, date, time_slot, tarif) VALUES (:u, :d, :s, 100)',
+                {'u': bob.id, 'd': date(2026, 3, day), 's': slots[day % 5]})
+    execute(db, "INSERT INTO assignments_archive (user_id, date, time_slot, tarif) VALUES (:u, '2024-03-01', 'warmup', 50)",
+            {'u': bob.id})
+    db.session.commit()
+    return db
+
+
+def column_type(db, table, column='time_slot'):
+    return next(row[2] for row in execute(db, f'PRAGMA table_info({table})') if row[1] == column)
+
+
+def index_names(db, table):
+    return {row[0] for row in execute(db, "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t",
+                                      {'t': table})}
+
+
+def assert_migrated(db):
+    assert current_version() == head_version()
+    for table, *_ in TIME_SLOT_TABLES:
+        assert column_type(db, table) == 'SMALLINT'
+        assert not execute(db, "SELECT 1 FROM sqlite_master WHERE name = :t", {'t': f'{table}_new'}).first()
+    assert execute(db, 'SELECT COUNT(*) FROM availabilities').scalar() == 10
+    assert execute(db, 'SELECT COUNT(*) FROM assignments').scalar() == 10
+    assert execute(db, 'SELECT COUNT(*) FROM migration_progress').scalar() == 0
+    assert 'idx_assignment_date' in index_names(db, 'assignments')
+    assert 'idx_availability_date' in index_names(db, 'availabilities')
+
+
+def test_time_slot_migration_converts_values(v7):
+    run_migrations(chunk_size=3, log=quiet)
+
+    assert_migrated(v7)
+    slots = dict(execute(v7, "SELECT strftime('%d', date), time_slot FROM assignments").fetchall())
+    assert slots == {'01': 2, '02': 3, '03': 4, '04': 1, '05': 1, '06': 2, '07': 3, '08': 4, '09': 1, '10': 1}
+    assert execute(v7, "SELECT COUNT(*) FROM availabilities WHERE time_slot IS NULL").scalar() == 2
+    assert execute(v7, 'SELECT time_slot FROM assignments_archive').scalar() == 2
+    with pytest.raises(Exception, match='CHECK'):
+        execute(v7, "UPDATE assignments SET time_slot = 7")
+    v7.session.rollback()
+
+
+def test_interrupted_backfill_resumes_without_duplicates(v7, monkeypatch):
+    original = MigrationContext.execute
+    inserts = []
+
+    def failing_execute(self, sql, params=None):
+        if sql.startswith('INSERT INTO assignments_new'):
+            inserts.append(sql)
+            if len(inserts) == 2:
+                raise RuntimeError('coupure')
+        return original(self, sql, params)
+
+    monkeypatch.setattr(MigrationContext, 'execute', failing_execute)
+    with pytest.raises(RuntimeError):
+        run_migrations(chunk_size=3, log=quiet)
+    assert current_version() == 7
+    assert execute(v7, 'SELECT last_id FROM migration_progress WHERE version = 8').scalar() == 3
+    assert execute(v7, 'SELECT COUNT(*) FROM assignments_new').scalar() == 3
+
+    monkeypatch.undo()
+    run_migrations(chunk_size=3, log=quiet)
+    assert_migrated(v7)
+
+
+def test_swap_is_atomic(v7):
+    ctx = MigrationContext(8, log=quiet)
+    with pytest.raises(sqlite3.OperationalError):
+        ctx.execute_atomic([('DROP TABLE assignments', ()), ('ALTER TABLE missing RENAME TO other', ())])
+    assert ctx.table_exists('assignments')
+    assert execute(v7, 'SELECT COUNT(*) FROM assignments').scalar() == 10
+
+
+def test_resume_when_only_new_table_is_left(v7, monkeypatch):
+    # Comportement d'avant execute_atomic : DROP validé seul, puis arrêt avant le RENAME
+    def drop_then_crash(self, statements):
+        sql, _ = statements[0]
+        self.execute(sql)
+        v7.session.commit()
+        raise RuntimeError('coupure')
+
+    monkeypatch.setattr(MigrationContext, 'execute_atomic', drop_then_crash)
+    with pytest.raises(RuntimeError):
+        run_migrations(chunk_size=3, log=quiet)
+    assert not MigrationContext(8).table_exists('availabilities')
+    assert MigrationContext(8).table_exists('availabilities_new')
+
+    monkeypatch.undo()
+    run_migrations(chunk_size=3, log=quiet)
+    assert_migrated(v7)
+
+
+def test_bootstrap_refuses_pending_migrations(db):
+    from factory import bootstrap_database
+
+    execute(db, 'DELETE FROM schema_version WHERE version = :v', {'v': head_version()})
+    db.session.commit()
+    with pytest.raises(RuntimeError, match='migrate_db.py'):
+        bootstrap_database()
+
+
+def test_bootstrap_new_database(app):
+    from factory import bootstrap_database
+    from models import User
+
+    bootstrap_database()
+    assert current_version() == head_version()
+    assert User.query.filter_by(is_admin=True).count() == 1
@@ -0,0 +1,43 @@
+"""Pool de hachage des mots de passe : places rendues dans tous les cas"""
+import time
+
+import pytest
+
+import passwords
+
+
+def free_slots():
+    """Places libres, une fois les callbacks de fin de calcul passés (thread du pool)"""
+    _, slots = passwords._get_pool()
+    deadline = time.monotonic() + 1
+    while slots._value < passwords._settings['max_pending'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return slots._value
+
+
+def test_hash_and_verify(app):
+    password_hash = passwords.hash_password('secret')
+    assert passwords.verify_password(password_hash, 'secret')
+    assert not passwords.verify_password(password_hash, 'autre')
+    assert not passwords.needs_rehash(password_hash)
+    assert free_slots() == passwords._settings['max_pending']
+
+
+def test_slot_released_when_submit_fails(app, monkeypatch):
+    executor, _ = passwords._get_pool()
+
+    def refuse(*args):
+        raise RuntimeError('cannot schedule new futures after shutdown')
+
+    monkeypatch.setattr(executor, 'submit', refuse)
+    with pytest.raises(RuntimeError):
+        passwords.hash_password('secret')
+    with pytest.raises(RuntimeError):
+        passwords.hash_many(['a', 'b'])
+    assert free_slots() == passwords._settings['max_pending']
+
+
+def test_slot_released_when_hash_fails(app):
+    with pytest.raises(ValueError):
+        passwords.verify_password('methode-inconnue$sel$hash', 'secret')
+    assert free_slots() == passwords._settings['max_pending']
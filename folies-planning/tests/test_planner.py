@@ -0,0 +1,82 @@
+"""Auto-assignation d'un mois (plan_month) et validation des scénarios de saison"""
+from datetime import date
+
+import pytest
+
+from models import TimeSlot
+import planner
+from planner import plan_month, run_scenarios, validate_scenario
+
+# Jeudis, vendredis et samedis de mars 2030
+NIGHTS = [date(2030, 3, day) for day in (7, 8, 9, 14, 15, 16)]
+
+
+def test_plan_month_spreads_sets_evenly():
+    available = {d: {1: TimeSlot.COMPLETE, 2: TimeSlot.COMPLETE, 3: TimeSlot.COMPLETE} for d in NIGHTS}
+    result = plan_month(2030, 3, available, {}, date(2030, 3, 1), seed=42)
+    per_dj = {}
+    for suggestion in result['suggestions']:
+        per_dj[suggestion['dj_id']] = per_dj.get(suggestion['dj_id'], 0) + 1
+    assert len(result['suggestions']) == len(NIGHTS)
+    assert sorted(per_dj.values()) == [2, 2, 2]
+
+
+def test_plan_month_skips_full_nights_and_past_dates():
+    available = {d: {1: TimeSlot.COMPLETE, 2: TimeSlot.WARMUP} for d in NIGHTS}
+    assigned = {NIGHTS[2]: {3: TimeSlot.COMPLETE}, NIGHTS[3]: {3: TimeSlot.PEAKTIME}}
+    result = plan_month(2030, 3, available, assigned, NIGHTS[1], seed=1)
+    assert result['fillable'] == set(NIGHTS[1:]) - {NIGHTS[2]}
+    warmup_night = next(s for s in result['suggestions'] if s['date'] == NIGHTS[3].isoformat())
+    assert warmup_night['time_slot'] == TimeSlot.WARMUP  # Le peak est déjà pris
+
+
+def test_seeded_dates_resolve_the_same_alone():
+    available = {d: {1: TimeSlot.COMPLETE, 2: TimeSlot.COMPLETE} for d in NIGHTS}
+    full = plan_month(2030, 3, available, {}, date(2030, 3, 1), seed=7)
+    chosen = {s['date']: s['dj_id'] for s in full['suggestions']}
+    planned = {}
+    for s in full['suggestions']:
+        if s['date'] != NIGHTS[0].isoformat():
+            planned[s['dj_id']] = planned.get(s['dj_id'], 0) + 1
+    alone = plan_month(2030, 3, available, {}, date(2030, 3, 1), seed=7, only={NIGHTS[0]}, planned=planned)
+    assert [s['dj_id'] for s in alone['suggestions']] == [chosen[NIGHTS[0].isoformat()]]
+
+
+def test_budget_and_max_sets():
+    available = {d: {1: TimeSlot.COMPLETE} for d in NIGHTS}
+    assert len(plan_month(2030, 3, available, {}, date(2030, 3, 1), seed=1, max_sets=2)['suggestions']) == 2
+    capped = plan_month(2030, 3, available, {}, date(2030, 3, 1), seed=1, budget=400)
+    assert capped['spend'] <= 400
+
+
+def test_validate_scenario():
+    assert validate_scenario({'name': 'Équité', 'carry_over': '0.5', 'max_sets': 3}) == {
+        'name': 'Équité', 'carry_over': 0.5, 'seed': 0, 'max_sets': 3}
+    for raw in ([], {'carry_over': 2}, {'max_sets': 0}, {'budget': -1}, {'seed': 'abc'}):
+        with pytest.raises(ValueError):
+            validate_scenario(raw)
+
+
+def snapshot():
+    available = {d: {1: TimeSlot.COMPLETE, 2: TimeSlot.COMPLETE} for d in NIGHTS}
+    return {'start': date(2030, 3, 1), 'names': {1: 'A', 2: 'B'},
+            'months': [{'year': 2030, 'month': 3, 'available': available, 'assigned': {}}]}
+
+
+def test_run_scenarios_reuses_one_forkserver_pool():
+    scenarios = [validate_scenario({'name': f's{seed}', 'seed': seed}) for seed in range(3)]
+    first = run_scenarios(snapshot(), scenarios, time_budget=30, workers=2)
+    executor = planner._pool[2]
+    second = run_scenarios(snapshot(), scenarios, time_budget=30, workers=2)
+
+    assert [r['status'] for r in first] == ['ok'] * 3
+    assert [r['coverage'] for r in first] == [r['coverage'] for r in second]
+    assert planner._pool[2] is executor
+    assert executor._mp_context.get_start_method() == 'forkserver'
+
+
+def test_run_scenarios_past_deadline_stops():
+    scenarios = [validate_scenario({'name': f's{seed}', 'seed': seed}) for seed in range(4)]
+    results = run_scenarios(snapshot(), scenarios, time_budget=0, workers=2)
+    assert [r['status'] for r in results] == ['timeout'] * 4
+    assert all('months' not in r or r['months'] == [] for r in results)
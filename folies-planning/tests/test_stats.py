@@ -0,0 +1,67 @@
+"""Compteurs incrémentaux de dj_month_stats face au recalcul complet (rebuild_stats)"""
+from datetime import date, timedelta
+
+from csv_import import import_availabilities
+from models import db, User, Assignment, DjMonthStats
+from stats import COUNTER_COLUMNS, rebuild_stats
+
+
+def snapshot():
+    return {(row.user_id, row.year, row.month): tuple(getattr(row, col) for col in COUNTER_COLUMNS)
+            for row in DjMonthStats.query
+            if any(getattr(row, col) for col in COUNTER_COLUMNS)}  # Une ligne remise à zéro vaut une ligne absente
+
+
+def dj_client(web_app, username):
+    user = User(username=username, email=f'{username}@test.local', dj_name=username.upper(), is_active=True)
+    user.set_password('pw')
+    db.session.add(user)
+    db.session.commit()
+    client = web_app.test_client()
+    assert client.post('/login', data={'username': username, 'password': 'pw'}).status_code == 302
+    return user.id, client
+
+
+def test_incremental_stats_match_rebuild(web_app, admin_client):
+    days = [date.today() + timedelta(days=n) for n in (3, 10, 25, 40, 70)]
+    alice_id, alice = dj_client(web_app, 'alice')
+    bob_id, bob = dj_client(web_app, 'bob')
+
+    def toggle(client, day, available, slot='complete'):
+        response = client.post('/dj/toggle-availability',
+                               json={'date': day.isoformat(), 'is_available': available, 'time_slot': slot})
+        assert response.get_json()['success'], response.get_json()
+
+    for day in days:
+        toggle(alice, day, True)
+    toggle(alice, days[0], True, 'warmup')
+    toggle(alice, days[1], False)
+    toggle(alice, days[1], True, 'warmup')
+    toggle(bob, days[0], True, 'peaktime')
+    toggle(bob, days[2], True)
+    toggle(bob, days[3], False)
+    import_availabilities(iter(['username,date,time_slot,is_available\n',
+                                f'bob,{days[3].isoformat()},complete,1\n',
+                                f'bob,{days[4].isoformat()},warmup,1\n',
+                                f'alice,{days[4].isoformat()},,0\n']))
+
+    def assign(dj_id, day):
+        response = admin_client.post('/admin/assign-dj', json={'date': day.isoformat(), 'dj_id': dj_id})
+        assert response.get_json()['success'], response.get_json()
+
+    assign(alice_id, days[0])
+    assign(bob_id, days[0])
+    assign(alice_id, days[1])
+    assign(bob_id, days[2])
+    assign(bob_id, days[3])
+
+    warmup = Assignment.query.filter_by(user_id=alice_id, date=days[1]).one()
+    admin_client.post('/admin/unassign-dj-by-id', json={'assignment_id': warmup.id})
+    on_bob = Assignment.query.filter_by(user_id=bob_id, date=days[2]).one()
+    assert admin_client.post('/admin/swap-assignment',
+                             json={'assignment_id': on_bob.id, 'user_id': alice_id}).get_json()['success']
+
+    incremental = snapshot()
+    assert incremental
+    rebuild_stats()
+    assert snapshot() == incremental
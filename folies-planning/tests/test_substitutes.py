@@ -0,0 +1,28 @@
+"""Classement des remplaçants d'un set (find_substitutes)"""
+from datetime import date
+
+from models import db, Availability, Assignment, TimeSlot, calculate_tarif
+from substitutes import find_substitutes
+
+THURSDAY, FRIDAY, SATURDAY = date(2030, 3, 14), date(2030, 3, 15), date(2030, 3, 16)
+
+
+def test_equal_load_ranks_lower_month_spend_first(make_dj):
+    alice, bob, carol = make_dj('alice'), make_dj('bob'), make_dj('carol')
+    # Même nombre de sets, à un jour du vendredi chacun : seul le cachet du mois diffère
+    db.session.add_all([
+        Assignment(user_id=alice.id, date=SATURDAY, time_slot=TimeSlot.COMPLETE, tarif=0),
+        Assignment(user_id=bob.id, date=THURSDAY, time_slot=TimeSlot.COMPLETE, tarif=0),
+        Availability(user_id=alice.id, date=FRIDAY, is_available=True, time_slot=TimeSlot.COMPLETE),
+        Availability(user_id=bob.id, date=FRIDAY, is_available=True, time_slot=TimeSlot.COMPLETE),
+    ])
+    assignment = Assignment(user_id=carol.id, date=FRIDAY, time_slot=TimeSlot.WARMUP, tarif=0)
+    db.session.add(assignment)
+    db.session.commit()
+
+    ranked = find_substitutes(assignment)
+
+    assert [c['dj_name'] for c in ranked] == ['BOB', 'ALICE']
+    assert [c['month_spend'] for c in ranked] == [calculate_tarif(THURSDAY, TimeSlot.COMPLETE),
+                                                  calculate_tarif(SATURDAY, TimeSlot.COMPLETE)]
+    assert {c['tarif'] for c in ranked} == {calculate_tarif(FRIDAY, TimeSlot.WARMUP)}
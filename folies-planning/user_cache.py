@@ -0,0 +1,61 @@
+"""Cache des utilisateurs connectés pour le user_loader
+
+Chaque requête authentifiée (pages, appels AJAX, flux live) recharge
+l'utilisateur de la session. On garde les colonnes de l'utilisateur en
+mémoire quelques secondes : le user_loader reconstruit l'objet et le
+rattache à la session SQLAlchemy avec ``merge(load=False)``, sans requête
+SQL. L'objet est alors dans l'identity map de la requête : les
+``User.query.get(id)`` suivants le réutilisent eux aussi.
+
+Les routes admin qui modifient un DJ (approbation, refus, activation,
+suppression) appellent invalidate_user() après leur commit. Le cache est
+propre à chaque processus : le TTL borne le délai de propagation vers les
+autres workers.
+"""
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from models import db, User
+from metrics import cache_lookup
+
+DEFAULT_TTL = 30
+MAX_ENTRIES = 5000
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def _snapshot(user):
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def get_user(user_id, ttl=DEFAULT_TTL):
+    """Utilisateur rattaché à la session courante, depuis le cache si possible"""
+    entry = _entries.get(user_id)
+    hit = entry is not None and entry[0] > time.monotonic()
+    cache_lookup('user', hit)
+    if hit:
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    user = db.session.get(User, user_id)
+    if user is not None:
+        with _lock:
+            if len(_entries) >= MAX_ENTRIES:
+                _entries.clear()
+            _entries[user_id] = (time.monotonic() + ttl, _snapshot(user))
+    return user
+
+
+def invalidate_user(user_id):
+    with _lock:
+        _entries.pop(user_id, None)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,1138 @@
+"""Espace admin : planning, équipe DJs, auto-assignation, exports"""
+from datetime import datetime, timedelta, date
+import calendar as cal
+import io
+import logging
+import os
+import time
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, Response, current_app, stream_with_context
+from flask_login import login_required, current_user
+
+from models import db, User, Availability, Assignment, TimeSlot, calculate_tarif
+from changelog import record_change, record_assignment, record_user
+from user_cache import invalidate_user
+from stats import apply_assignment, month_stats, set_counts
+from coverage import period_coverage, coverage_summary
+from archive import assignment_history, delete_user_history
+from substitutes import find_substitutes
+from availability_index import index as availability_index, SLOT_FIT
+from draft import draft_plan
+from export import EXPORT_KINDS, EXPORT_FORMATS, export_stream
+from csv_import import import_csv, ImportFileError
+from planner import season_months, season_snapshot, run_scenarios, validate_scenario, suggestion_json, DEFAULT_SCENARIOS
+from notifications import send_assignment_notification, send_assignment_digests, send_reassignment_notification
+from metrics import AUTO_ASSIGN_DURATION, PDF_DURATION
+from profiling import profile_dir, route_summaries, list_profiles
+from live import broker as live_broker, publish_change, sse_stream, ChangeFeedPoller
+from views.dj import generate_calendar
+
+admin_bp = Blueprint('admin', __name__)
+
+logger = logging.getLogger(__name__)
+
+# Helper function pour une case du calendrier admin
+def build_admin_day(day_date, assignments_list, slot_counts, today):
+    is_past = day_date < today
+
+    # Compter les dispos par créneau
+    warmup_count = slot_counts.get(TimeSlot.WARMUP, 0)
+    peaktime_count = slot_counts.get(TimeSlot.PEAKTIME, 0)
+    complete_count = slot_counts.get(TimeSlot.COMPLETE, 0)
+    peaktime_duo_count = slot_counts.get(TimeSlot.PEAKTIME_DUO, 0)
+
+    total_avail = warmup_count + peaktime_count + complete_count + peaktime_duo_count
+
+    # Déterminer le statut
+    if assignments_list:
+        status = 'assigned'
+    elif is_past:
+        status = 'past'
+    elif total_avail > 1:
+        status = 'multiple'
+    elif total_avail == 1:
+        status = 'single'
+    else:
+        status = 'none'
+
+    return {
+        'day': day_date.day,
+        'date': day_date.isoformat(),
+        'assignments': assignments_list,
+        'is_past': is_past,
+        'warmup_count': warmup_count,
+        'peaktime_count': peaktime_count,
+        'complete_count': complete_count,
+        'peaktime_duo_count': peaktime_duo_count,
+        'status': status
+    }
+
+def admin_day_summary(day_date):
+    """Case du calendrier admin pour un seul jour (2 requêtes)"""
+    assignments_list = Assignment.query.filter_by(date=day_date).all()
+    slot_counts = dict(
+        db.session.query(Availability.time_slot, db.func.count(Availability.id))
+        .filter(Availability.date == day_date, Availability.is_available == True)
+        .group_by(Availability.time_slot)
+        .all()
+    )
+    return build_admin_day(day_date, assignments_list, slot_counts, date.today())
+
+def publish_day_change(kind, day_date, **data):
+    """Diffuser un changement aux onglets admin abonnés au mois (SSE)
+
+    La case du jour est rendue une seule fois ici, quel que soit le nombre d'abonnés.
+    """
+    if not live_broker.subscriber_count(day_date.year, day_date.month):
+        return
+    try:
+        day = admin_day_summary(day_date)
+        publish_change(kind, day_date,
+                       status=day['status'],
+                       html=render_template('admin/_day_cell.html', day=day),
+                       **data)
+    except Exception:
+        logger.exception("Erreur diffusion live", extra={'date': day_date})
+
+def broadcast_changes(events):
+    """Consommateur du journal pour le flux live : une diffusion par date touchée"""
+    last_by_date = {}
+    for event in events:
+        if event.date and event.entity in ('availability', 'assignment'):
+            last_by_date[event.date] = event
+    for day_date, event in sorted(last_by_date.items()):
+        publish_day_change(f'{event.entity}_{event.kind}', day_date,
+                           seq=event.id,
+                           user_id=event.user_id)
+
+change_feed = ChangeFeedPoller(live_broker, broadcast_changes)
+
+# Helper function pour le calendrier admin
+def generate_admin_calendar(year, month):
+        today = date.today()
+        month_calendar = cal.monthcalendar(year, month)
+        
+        # Récupérer tous les assignments du mois
+        assignments = Assignment.query.filter(
+            db.extract('month', Assignment.date) == month,
+            db.extract('year', Assignment.date) == year
+        ).all()
+        
+        # Grouper les assignments par date
+        assign_by_date = {}
+        for a in assignments:
+            if a.date not in assign_by_date:
+                assign_by_date[a.date] = []
+            assign_by_date[a.date].append(a)
+        
+        # Récupérer toutes les disponibilités du mois
+        availabilities = Availability.query.filter(
+            db.extract('month', Availability.date) == month,
+            db.extract('year', Availability.date) == year,
+            Availability.is_available == True
+        ).all()
+        
+        # Grouper par date et créneau
+        avail_by_date = {}
+        for avail in availabilities:
+            key = (avail.date, avail.time_slot)
+            if key not in avail_by_date:
+                avail_by_date[key] = []
+            avail_by_date[key].append(avail)
+        
+        # Construire le calendrier
+        calendar_data = []
+        for week in month_calendar:
+            week_data = []
+            for day in week:
+                if day == 0:
+                    week_data.append(None)
+                else:
+                    day_date = date(year, month, day)
+                    slot_counts = {
+                        slot: len(avail_by_date.get((day_date, slot), []))
+                        for slot in TimeSlot
+                    }
+                    week_data.append(build_admin_day(day_date, assign_by_date.get(day_date, []), slot_counts, today))
+            calendar_data.append(week_data)
+        
+        return calendar_data
+
+# Route Admin Dashboard
+@admin_bp.route('/admin/dashboard')
+@login_required
+def admin_dashboard():
+    if not current_user.is_admin:
+        flash('Accès refusé.', 'danger')
+        return redirect(url_for('dj.dj_dashboard'))
+    
+    # Paramètres de date
+    month = request.args.get('month', type=int, default=datetime.now().month)
+    year = request.args.get('year', type=int, default=datetime.now().year)
+    
+    today = date.today()
+    first_day = date(year, month, 1)
+    last_day = date(year, month, cal.monthrange(year, month)[1])
+    
+    # Stats globales
+    total_djs = User.query.filter_by(is_admin=False, is_active=True).count()
+    
+    assignments_month = Assignment.query.filter(
+        Assignment.date >= first_day,
+        Assignment.date <= last_day
+    ).count()
+    
+    # Couverture des soirées et conflits : une requête d'agrégation (coverage.py)
+    start = max(first_day, today)
+    coverage = coverage_summary(period_coverage(first_day, last_day), today)
+    future_days = max(0, (last_day - start).days + 1)
+    
+    stats = {
+        'total_djs': total_djs,
+        'assignments_month': assignments_month,
+        'conflicts': len(coverage['conflicts']),
+        'unassigned_days': future_days - coverage['full'] - coverage['partial'],
+        'partial_days': coverage['partial']
+    }
+    
+    # Calendrier admin
+    calendar_data = generate_admin_calendar(year, month)
+    
+    # Conflits détaillés
+    conflicts_data = coverage['conflicts']
+    
+    # Liste des DJs avec leurs stats
+    all_djs = User.query.filter_by(is_admin=False).all()
+    rows = month_stats(year, month)
+    counts = set_counts(today)
+    for dj in all_djs:
+        dj.disponibilites = rows[dj.id].availability_days if dj.id in rows else 0
+        dj.assignments_count = counts.get(dj.id, (0, 0))[1]
+    
+    months = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+              'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+    
+    # Demandes d'inscription en attente
+    pending_djs = User.query.filter_by(is_admin=False, is_active=False).all()
+    pending_count = len(pending_djs)
+    
+    return render_template('admin/dashboard.html',
+                         stats=stats,
+                         calendar_data=calendar_data,
+                         conflicts_data=conflicts_data,
+                         all_djs=all_djs,
+                         pending_djs=pending_djs,
+                         pending_count=pending_count,
+                         current_month=month,
+                         current_year=year,
+                         months=months)
+
+# Flux live (SSE) des changements du mois pour le calendrier admin
+@admin_bp.route('/admin/live')
+@login_required
+def admin_live():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    month = request.args.get('month', type=int, default=datetime.now().month)
+    year = request.args.get('year', type=int, default=datetime.now().year)
+
+    change_feed.ensure_started(current_app._get_current_object())
+    return Response(
+        sse_stream(live_broker, year, month),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Désactiver le buffering nginx
+        }
+    )
+
+# Route pour ajouter un DJ
+@admin_bp.route('/admin/add-dj', methods=['POST'])
+@login_required
+def admin_add_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    dj_name = request.form.get('dj_name')
+    username = request.form.get('username')
+    email = request.form.get('email')
+    phone = request.form.get('phone')
+    password = request.form.get('password')
+    
+    # Validation
+    if User.query.filter_by(username=username).first():
+        flash('Ce nom d\'utilisateur existe déjà.', 'danger')
+        return redirect(url_for('admin.admin_dashboard') + '?tab=djs')
+    
+    if User.query.filter_by(email=email).first():
+        flash('Cet email existe déjà.', 'danger')
+        return redirect(url_for('admin.admin_dashboard') + '?tab=djs')
+    
+    try:
+        new_dj = User(
+            username=username,
+            email=email,
+            dj_name=dj_name,
+            phone=phone,
+            is_admin=False,
+            is_active=True
+        )
+        new_dj.set_password(password)
+        
+        db.session.add(new_dj)
+        db.session.flush()
+        record_user(new_dj, 'created')
+        db.session.commit()
+        
+        flash(f'DJ {dj_name} créé avec succès !', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur: {str(e)}', 'danger')
+    
+    return redirect(url_for('admin.admin_dashboard') + '#djs')
+
+@admin_bp.route('/admin/assign-dj', methods=['POST'])
+@login_required
+def admin_assign_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    date_str = data.get('date')
+    dj_id = data.get('dj_id')
+    
+    try:
+        day_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        
+        # Vérifier que la date n'est pas dans le passé
+        if day_date < date.today():
+            return jsonify({'success': False, 'error': 'Cannot assign past dates'})
+        
+        # Vérifier que le DJ est disponible
+        availability = Availability.query.filter_by(
+            user_id=dj_id,
+            date=day_date,
+            is_available=True
+        ).first()
+        
+        if not availability:
+            return jsonify({'success': False, 'error': 'DJ not available on this date'})
+        
+        original_time_slot = availability.time_slot
+
+        # Récupérer tous les assignments existants pour cette date
+        existing_assignments = Assignment.query.filter_by(date=day_date).all()
+        assigned_slots = {a.time_slot for a in existing_assignments}
+
+        has_complete = TimeSlot.COMPLETE in assigned_slots
+        has_warmup = TimeSlot.WARMUP in assigned_slots
+        has_peaktime = TimeSlot.PEAKTIME in assigned_slots
+        has_peaktime_duo = TimeSlot.PEAKTIME_DUO in assigned_slots
+        peaktime_duo_count = sum(1 for a in existing_assignments if a.time_slot == TimeSlot.PEAKTIME_DUO)
+
+        # Déterminer le créneau à assigner
+        actual_time_slot = original_time_slot
+
+        # Si déjà une soirée complète assignée → impossible
+        if has_complete:
+            return jsonify({'success': False, 'error': 'Complete night already assigned'})
+
+        # Compter le total de DJs sur le créneau peak (solo + duo)
+        total_peak_djs = peaktime_duo_count + (1 if has_peaktime else 0)
+
+        # Peaktime duo : compatible avec peaktime solo existant
+        if original_time_slot == TimeSlot.PEAKTIME_DUO:
+            if total_peak_djs >= 2:
+                return jsonify({'success': False, 'error': 'Peak time déjà plein (2 DJs max)'})
+            actual_time_slot = TimeSlot.PEAKTIME_DUO
+        elif original_time_slot == TimeSlot.PEAKTIME:
+            # Si un peaktime_duo existe, ce DJ rejoint en duo
+            if has_peaktime_duo:
+                if total_peak_djs >= 2:
+                    return jsonify({'success': False, 'error': 'Peak time déjà plein (2 DJs max)'})
+                actual_time_slot = TimeSlot.PEAKTIME_DUO
+            elif has_peaktime:
+                return jsonify({'success': False, 'error': 'Peak time already assigned'})
+            else:
+                actual_time_slot = TimeSlot.PEAKTIME
+        else:
+            peak_occupied = has_peaktime or has_peaktime_duo
+
+            # Si warmup déjà pris
+            if has_warmup:
+                if original_time_slot == TimeSlot.WARMUP:
+                    return jsonify({'success': False, 'error': 'Warmup already assigned'})
+                elif original_time_slot == TimeSlot.COMPLETE:
+                    if peak_occupied:
+                        return jsonify({'success': False, 'error': 'Soirée déjà complète'})
+                    actual_time_slot = TimeSlot.PEAKTIME
+
+            # Si peak déjà pris
+            elif peak_occupied:
+                if original_time_slot == TimeSlot.COMPLETE:
+                    actual_time_slot = TimeSlot.WARMUP
+
+            # Vérifier que le créneau final n'est pas déjà pris (sauf peaktime_duo)
+            if actual_time_slot != TimeSlot.PEAKTIME_DUO and actual_time_slot in assigned_slots:
+                return jsonify({'success': False, 'error': f'{actual_time_slot.key.capitalize()} already assigned'})
+        
+        # Créer l'assignment avec le créneau adapté
+        assignment = Assignment(
+            user_id=dj_id,
+            date=day_date,
+            time_slot=actual_time_slot,
+            tarif=calculate_tarif(day_date, actual_time_slot),
+            created_by=current_user.id
+        )
+        
+        db.session.add(assignment)
+        db.session.flush()
+        apply_assignment(assignment)
+        record_assignment(assignment, 'created')
+        db.session.commit()
+        
+        # ✉️ ENVOI EMAIL DE CONFIRMATION
+        # ✉️ ENVOI EMAIL DE CONFIRMATION
+        if current_app.config.get('SEND_EMAIL_NOTIFICATIONS', False):
+            try:
+                dj = User.query.get(dj_id)
+                send_assignment_notification(current_app._get_current_object(), dj, assignment)
+                logger.info("Email de confirmation envoyé", extra={'recipients': [dj.email]})
+            except Exception:
+                logger.exception("Erreur envoi email de confirmation", extra={'dj_id': dj_id})
+        
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+# Route pour toggle status DJ
+@admin_bp.route('/admin/toggle-dj-status', methods=['POST'])
+@login_required
+def admin_toggle_dj_status():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    dj_id = data.get('dj_id')
+    
+    try:
+        dj = User.query.get(dj_id)
+        if not dj or dj.is_admin:
+            return jsonify({'success': False, 'error': 'DJ not found'})
+        
+        dj.is_active = not dj.is_active
+        record_user(dj, 'activated' if dj.is_active else 'deactivated')
+        db.session.commit()
+        invalidate_user(dj.id)
+        
+        return jsonify({'success': True, 'new_status': dj.is_active})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+# Route pour supprimer un DJ
+@admin_bp.route('/admin/delete-dj', methods=['POST'])
+@login_required
+def admin_delete_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    dj_id = data.get('dj_id')
+    
+    try:
+        dj = User.query.get(dj_id)
+        if not dj or dj.is_admin:
+            return jsonify({'success': False, 'error': 'DJ not found'})
+        
+        # Cascade delete via relationship
+        record_user(dj, 'deleted')
+        delete_user_history(dj.id)
+        db.session.delete(dj)
+        db.session.commit()
+        invalidate_user(dj.id)
+        
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+# Route pour approuver un DJ
+@admin_bp.route('/admin/approve-dj', methods=['POST'])
+@login_required
+def admin_approve_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    dj_id = data.get('dj_id')
+    
+    try:
+        dj = User.query.get(dj_id)
+        if not dj or dj.is_admin:
+            return jsonify({'success': False, 'error': 'DJ not found'})
+        
+        dj.is_active = True
+        record_user(dj, 'approved')
+        db.session.commit()
+        invalidate_user(dj.id)
+        
+        flash(f'DJ {dj.dj_name} approuvé avec succès !', 'success')
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+# Route pour refuser un DJ
+@admin_bp.route('/admin/reject-dj', methods=['POST'])
+@login_required
+def admin_reject_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    dj_id = data.get('dj_id')
+    
+    try:
+        dj = User.query.get(dj_id)
+        if not dj or dj.is_admin:
+            return jsonify({'success': False, 'error': 'DJ not found'})
+        
+        record_user(dj, 'rejected')
+        db.session.delete(dj)
+        db.session.commit()
+        invalidate_user(dj.id)
+        
+        flash(f'Demande de {dj.dj_name} refusée.', 'info')
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+@admin_bp.route('/admin/day-details')
+@login_required
+def admin_day_details():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    date_str = request.args.get('date')
+    day_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    
+    # Assignments existants
+    assignments = Assignment.query.filter_by(date=day_date).all()
+
+    # Déterminer quels créneaux sont encore disponibles
+    assigned_slots = {a.time_slot for a in assignments}
+    has_complete = TimeSlot.COMPLETE in assigned_slots
+    has_warmup = TimeSlot.WARMUP in assigned_slots
+    has_peaktime = TimeSlot.PEAKTIME in assigned_slots
+    has_peaktime_duo = TimeSlot.PEAKTIME_DUO in assigned_slots
+    peaktime_duo_count = sum(1 for a in assignments if a.time_slot == TimeSlot.PEAKTIME_DUO)
+
+    # DJs disponibles
+    availabilities = Availability.query.filter_by(
+        date=day_date,
+        is_available=True
+    ).all()
+
+    html = f'<h6 class="mb-3">Date : {day_date.strftime("%A %d %B %Y")}</h6>'
+
+    slot_emoji = {TimeSlot.WARMUP: '🌅', TimeSlot.PEAKTIME: '🔥', TimeSlot.COMPLETE: '🌙', TimeSlot.PEAKTIME_DUO: '👥'}
+    slot_name = {TimeSlot.WARMUP: 'Warm-up', TimeSlot.PEAKTIME: 'Peak time', TimeSlot.COMPLETE: 'Complète', TimeSlot.PEAKTIME_DUO: 'Peak à 2'}
+
+    # Afficher les assignments existants
+    if assignments:
+        html += '<h6>Déjà assignés :</h6><div class="mb-3">'
+        for assignment in assignments:
+            html += f'''
+            <div class="alert alert-info d-flex justify-content-between align-items-center mb-2">
+                <strong>
+                    {slot_emoji.get(assignment.time_slot, '')}
+                    {assignment.user.dj_name} - {slot_name.get(assignment.time_slot, '')}
+                    ({assignment.tarif}€)
+                </strong>
+                <span class="d-flex gap-1">
+                    <button class="btn btn-sm btn-warning" onclick="showSubstitutes({assignment.id})">
+                        <i class="fas fa-people-arrows"></i> Remplacer
+                    </button>
+                    <button class="btn btn-sm btn-danger" onclick="unassignDJById({assignment.id})">
+                        <i class="fas fa-times"></i> Retirer
+                    </button>
+                </span>
+            </div>
+            '''
+        html += '</div>'
+
+    # Si soirée complète déjà assignée, on ne peut plus rien faire
+    if has_complete:
+        html += '<div class="alert alert-warning">Soirée complète déjà assignée, aucune autre assignation possible.</div>'
+        return jsonify({
+            'success': True,
+            'date_formatted': day_date.strftime('%A %d %B %Y'),
+            'html': html
+        })
+
+    # Filtrer les DJs disponibles selon ce qui reste à assigner
+    available_djs = []
+    for avail in availabilities:
+        # Vérifier si ce DJ est déjà assigné ce jour
+        already_assigned = any(a.user_id == avail.user_id for a in assignments)
+        if already_assigned:
+            continue
+
+        # Peaktime duo : peut rejoindre si pas encore 2 DJs sur le créneau 2h-6h
+        # Compatible avec peaktime solo (le solo devient duo à 100€ chacun)
+        if avail.time_slot == TimeSlot.PEAKTIME_DUO:
+            total_peak_slots = peaktime_duo_count + (1 if has_peaktime else 0)
+            if total_peak_slots < 2 and not has_complete:
+                avail.assignable_as = TimeSlot.PEAKTIME_DUO
+                available_djs.append(avail)
+            continue
+
+        # Peaktime solo : compatible avec peaktime_duo existant (rejoint comme duo)
+        if avail.time_slot == TimeSlot.PEAKTIME:
+            if has_peaktime_duo:
+                total_peak_slots = peaktime_duo_count
+                if total_peak_slots < 2 and not has_complete:
+                    avail.assignable_as = TimeSlot.PEAKTIME_DUO
+                    available_djs.append(avail)
+            elif not has_peaktime and not has_complete:
+                available_djs.append(avail)
+            continue
+
+        # Si warmup ET créneau peak déjà pris
+        peak_occupied = has_peaktime or has_peaktime_duo
+        if has_warmup and peak_occupied:
+            if avail.time_slot == TimeSlot.COMPLETE:
+                available_djs.append(avail)
+        elif has_warmup:
+            if avail.time_slot == TimeSlot.COMPLETE:
+                avail.assignable_as = TimeSlot.PEAKTIME
+                available_djs.append(avail)
+        elif peak_occupied:
+            if avail.time_slot == TimeSlot.WARMUP:
+                available_djs.append(avail)
+            elif avail.time_slot == TimeSlot.COMPLETE:
+                avail.assignable_as = TimeSlot.WARMUP
+                available_djs.append(avail)
+        else:
+            available_djs.append(avail)
+
+    if available_djs:
+        html += '<h6>DJs Disponibles :</h6><div class="list-group mb-3">'
+        for avail in available_djs:
+            display_slot = getattr(avail, 'assignable_as', avail.time_slot)
+            display_name = slot_name.get(display_slot, display_slot)
+            display_emoji = slot_emoji.get(display_slot, '')
+
+            html += f'''
+            <div class="list-group-item d-flex justify-content-between align-items-center">
+                <span>
+                    <i class="fas fa-user me-2"></i>{avail.user.dj_name}
+                    <span class="badge bg-secondary ms-2">{display_emoji} {display_name}</span>
+                </span>
+                <button class="btn btn-sm btn-primary" onclick="assignDJ('{date_str}', {avail.user.id})">
+                    Assigner
+                </button>
+            </div>
+            '''
+        html += '</div>'
+    else:
+        html += '<div class="alert alert-warning">Aucun DJ disponible pour les créneaux restants</div>'
+
+    return jsonify({
+        'success': True,
+        'date_formatted': day_date.strftime('%A %d %B %Y'),
+        'html': html
+    })
+# Route pour retirer un assignment
+@admin_bp.route('/admin/unassign-dj', methods=['POST'])
+@login_required
+def admin_unassign_dj():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    date_str = data.get('date')
+    
+    try:
+        day_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        
+        assignment = Assignment.query.filter_by(date=day_date).first()
+        if not assignment:
+            return jsonify({'success': False, 'error': 'No assignment found'})
+        
+        apply_assignment(assignment, -1)
+        record_assignment(assignment, 'deleted')
+        db.session.delete(assignment)
+        db.session.commit()
+        
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+# Route pour retirer un assignment par ID (supporte peaktime_duo)
+@admin_bp.route('/admin/unassign-dj-by-id', methods=['POST'])
+@login_required
+def admin_unassign_dj_by_id():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    data = request.get_json()
+    assignment_id = data.get('assignment_id')
+
+    try:
+        assignment = Assignment.query.get(assignment_id)
+        if not assignment:
+            return jsonify({'success': False, 'error': 'No assignment found'})
+
+        apply_assignment(assignment, -1)
+        record_assignment(assignment, 'deleted')
+        db.session.delete(assignment)
+        db.session.commit()
+
+        return jsonify({'success': True})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+# Remplaçants classés pour un set (désistement)
+@admin_bp.route('/admin/substitutes')
+@login_required
+def admin_substitutes():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    assignment = Assignment.query.get(request.args.get('assignment_id', type=int))
+    if not assignment:
+        return jsonify({'success': False, 'error': 'No assignment found'})
+
+    start = time.perf_counter()
+    substitutes = find_substitutes(assignment, limit=request.args.get('limit', type=int, default=10))
+    return jsonify({
+        'success': True,
+        'assignment': {
+            'id': assignment.id,
+            'date': assignment.date.isoformat(),
+            'time_slot': assignment.time_slot.key,
+            'dj_name': assignment.user.dj_name,
+        },
+        'substitutes': substitutes,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
+
+# Route pour remplacer le DJ d'un set (échange en un clic)
+@admin_bp.route('/admin/swap-assignment', methods=['POST'])
+@login_required
+def admin_swap_assignment():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    data = request.get_json()
+
+    try:
+        assignment = Assignment.query.get(data.get('assignment_id'))
+        if not assignment:
+            return jsonify({'success': False, 'error': 'No assignment found'})
+        if assignment.date < date.today():
+            return jsonify({'success': False, 'error': 'Cannot reassign past dates'})
+        substitute = User.query.get(data.get('user_id'))
+        if not substitute or substitute.is_admin or not substitute.is_active:
+            return jsonify({'success': False, 'error': 'DJ not found'})
+
+        # Revérifier en base : l'index peut avoir un temps de retard
+        availability = Availability.query.filter_by(
+            user_id=substitute.id, date=assignment.date, is_available=True
+        ).first()
+        if not availability or availability.time_slot not in SLOT_FIT[assignment.time_slot]:
+            return jsonify({'success': False, 'error': 'DJ not available for this slot'})
+        if Assignment.query.filter_by(user_id=substitute.id, date=assignment.date).first():
+            return jsonify({'success': False, 'error': 'DJ already assigned on this date'})
+
+        # Le set quitte l'ancien DJ (stats, journal pour son flux ICS) puis passe au remplaçant
+        previous = assignment.user
+        apply_assignment(assignment, -1)
+        record_change('assignment', assignment.id, 'reassigned', day_date=assignment.date, user_id=assignment.user_id)
+        assignment.user_id = substitute.id
+        assignment.tarif = calculate_tarif(assignment.date, assignment.time_slot)
+        db.session.flush()
+        apply_assignment(assignment)
+        record_assignment(assignment, 'updated')
+        db.session.commit()
+
+        # Les deux DJs sont prévenus ; l'échange est déjà validé, une erreur d'envoi est seulement loguée
+        if current_app.config.get('SEND_EMAIL_NOTIFICATIONS', False):
+            try:
+                app = current_app._get_current_object()
+                send_assignment_notification(app, substitute, assignment)
+                send_reassignment_notification(app, previous, assignment)
+                logger.info("Emails d'échange envoyés", extra={'recipients': [substitute.email, previous.email]})
+            except Exception:
+                logger.exception("Erreur envoi email d'échange", extra={'assignment_id': assignment.id})
+
+        return jsonify({'success': True})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+# Route auto-assignation équitable
+@admin_bp.route('/admin/auto-assign', methods=['POST'])
+@login_required
+def admin_auto_assign():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    data = request.get_json()
+    year = data.get('year', datetime.now().year)
+    month = data.get('month', datetime.now().month)
+
+    # Brouillon du mois (draft.py) : calculé une fois, puis seules les dates
+    # touchées depuis par le journal des changements sont re-résolues
+    start = time.perf_counter()
+    plan = draft_plan(year, month, date.today() + timedelta(days=1), reset=bool(data.get('reset')))
+    elapsed = time.perf_counter() - start
+    AUTO_ASSIGN_DURATION.labels('incremental' if plan['incremental'] else 'full').observe(elapsed)
+    suggestions = plan['suggestions']
+    dates_to_fill = plan['total_dates']
+
+    # Résumé par DJ
+    dj_summary = {}
+    for s in suggestions:
+        dj_id = s['dj_id']
+        if dj_id not in dj_summary:
+            dj_summary[dj_id] = {
+                'dj_name': s['dj_name'],
+                'existing': plan['existing'].get(dj_id, 0),
+                'suggested': 0,
+                'total_tarif': 0
+            }
+        dj_summary[dj_id]['suggested'] += 1
+        dj_summary[dj_id]['total_tarif'] += s['tarif']
+
+    return jsonify({
+        'success': True,
+        'suggestions': [suggestion_json(s) for s in suggestions],
+        'dj_summary': list(dj_summary.values()),
+        'total_dates': dates_to_fill,
+        'filled_dates': len(suggestions),
+        'draft': {
+            'incremental': plan['incremental'],
+            'resolved_dates': plan['resolved_dates'],
+            'elapsed_ms': round(elapsed * 1000, 1)
+        }
+    })
+
+
+# Route planification de saison : plusieurs mois, scénarios comparés
+@admin_bp.route('/admin/season-plan', methods=['POST'])
+@login_required
+def admin_season_plan():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    data = request.get_json() or {}
+    year = int(data.get('year', datetime.now().year))
+    month = int(data.get('month', datetime.now().month))
+    count = int(data.get('months', 3))
+    if not 1 <= count <= current_app.config['SEASON_MAX_MONTHS']:
+        return jsonify({'success': False, 'error': f"Entre 1 et {current_app.config['SEASON_MAX_MONTHS']} mois"}), 400
+    try:
+        scenarios = [validate_scenario(s) for s in data.get('scenarios') or DEFAULT_SCENARIOS]
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    months = season_months(year, month, count)
+    snapshot = season_snapshot(months, availability_index, date.today() + timedelta(days=1))
+    start = time.perf_counter()
+    results = run_scenarios(snapshot, scenarios,
+                            current_app.config['PLANNER_TIME_BUDGET'],
+                            current_app.config['PLANNER_WORKERS'])
+
+    return jsonify({
+        'success': True,
+        'months': [{'year': y, 'month': m} for y, m in months],
+        'scenarios': results,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
+    })
+
+
+# Route validation bulk des suggestions
+@admin_bp.route('/admin/bulk-assign', methods=['POST'])
+@login_required
+def admin_bulk_assign():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    data = request.get_json()
+    assignments_data = data.get('assignments', [])
+
+    created = 0
+    errors = []
+    created_assignments = []
+
+    for item in assignments_data:
+        try:
+            day_date = datetime.strptime(item['date'], '%Y-%m-%d').date()
+            dj_id = item['dj_id']
+            time_slot = TimeSlot.parse(item['time_slot'])
+
+            # Vérifier que le DJ a bien une dispo
+            avail = Availability.query.filter_by(
+                user_id=dj_id,
+                date=day_date,
+                is_available=True
+            ).first()
+            if not avail:
+                errors.append(f"{item['date']}: DJ non disponible")
+                continue
+
+            # Vérifier pas de conflit de slot
+            existing = Assignment.query.filter_by(
+                date=day_date,
+                time_slot=time_slot
+            ).all()
+            if time_slot == TimeSlot.PEAKTIME_DUO:
+                if len(existing) >= 2:
+                    errors.append(f"{item['date']}: Slot peaktime_duo déjà plein")
+                    continue
+            elif existing:
+                errors.append(f"{item['date']}: Slot {time_slot.key} déjà pris")
+                continue
+
+            # Vérifier que le DJ n'est pas déjà assigné ce jour
+            dj_existing = Assignment.query.filter_by(
+                date=day_date,
+                user_id=dj_id
+            ).first()
+            if dj_existing:
+                errors.append(f"{item['date']}: DJ déjà assigné")
+                continue
+
+            tarif = calculate_tarif(day_date, time_slot)
+            assignment = Assignment(
+                user_id=dj_id,
+                date=day_date,
+                time_slot=time_slot,
+                tarif=tarif,
+                created_by=current_user.id
+            )
+            db.session.add(assignment)
+            created_assignments.append(assignment)
+            created += 1
+
+        except Exception as e:
+            errors.append(f"{item.get('date', '?')}: {str(e)}")
+
+    try:
+        db.session.flush()
+        for assignment in created_assignments:
+            apply_assignment(assignment)
+            record_assignment(assignment, 'created')
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Erreur DB: {str(e)}'})
+
+    # Un email récapitulatif par DJ pour tout le lot
+    send_assignment_digests(current_app._get_current_object(), created_assignments)
+
+    return jsonify({
+        'success': True,
+        'created': created,
+        'errors': errors
+    })
+
+
+# Route calendrier DJ individuel (admin)
+@admin_bp.route('/admin/dj-calendar/<int:dj_id>')
+@login_required
+def admin_dj_calendar(dj_id):
+    if not current_user.is_admin:
+        flash('Accès refusé.', 'danger')
+        return redirect(url_for('dj.dj_dashboard'))
+    
+    dj = User.query.get_or_404(dj_id)
+    if dj.is_admin:
+        flash('Impossible d\'afficher le calendrier d\'un admin.', 'warning')
+        return redirect(url_for('admin.admin_dashboard'))
+    
+    # Paramètres de date
+    month = request.args.get('month', type=int, default=datetime.now().month)
+    year = request.args.get('year', type=int, default=datetime.now().year)
+    
+    today = date.today()
+    
+    # Stats du DJ (précalculées dans dj_month_stats)
+    month_row = month_stats(year, month, user_id=dj_id).get(dj_id)
+    disponibilites_mois = month_row.availability_days if month_row else 0
+    
+    sets_passes, sets_venir = set_counts(today, user_id=dj_id).get(dj_id, (0, 0))
+    
+    # Taux de disponibilité (sur les 30 derniers jours)
+    thirty_days_ago = today - timedelta(days=30)
+    total_days = 30
+    days_available = Availability.query.filter_by(
+        user_id=dj_id,
+        is_available=True
+    ).filter(
+        Availability.date >= thirty_days_ago,
+        Availability.date < today
+    ).count()
+    
+    taux_dispo = int((days_available / total_days) * 100) if total_days > 0 else 0
+    
+    stats = {
+        'disponibilites_mois': disponibilites_mois,
+        'sets_venir': sets_venir,
+        'sets_passes': sets_passes,
+        'taux_dispo': taux_dispo
+    }
+    
+    # Calendrier
+    calendar_data = generate_calendar(year, month, dj_id)
+    
+    # Prochains sets
+    upcoming_sets = Assignment.query.filter_by(user_id=dj_id).filter(
+        Assignment.date >= today
+    ).order_by(Assignment.date).limit(5).all()
+    
+    # Sets passés (actif + archive)
+    past_sets = assignment_history(user_id=dj_id, end=today - timedelta(days=1), descending=True, limit=5)
+    
+    months = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+              'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+    
+    return render_template('admin/dj_calendar.html',
+                         dj=dj,
+                         stats=stats,
+                         calendar_data=calendar_data,
+                         upcoming_sets=upcoming_sets,
+                         past_sets=past_sets,
+                         current_month=month,
+                         current_year=year,
+                         months=months,
+                         today=today)
+
+# Route pour export PDF du planning
+@admin_bp.route('/admin/export-planning-pdf')
+@login_required
+def admin_export_planning_pdf():
+    if not current_user.is_admin:
+        flash('Accès refusé.', 'danger')
+        return redirect(url_for('dj.dj_dashboard'))
+    
+    month = request.args.get('month', type=int, default=datetime.now().month)
+    year = request.args.get('year', type=int, default=datetime.now().year)
+    
+    try:
+        # Import paresseux : ReportLab n'est chargé qu'au premier export
+        from pdf import generate_planning_pdf
+        with PDF_DURATION.time():
+            pdf_buffer = generate_planning_pdf(year, month)
+        
+        months_fr = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+                     'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+        filename = f"Planning_LES_FOLIES_{months_fr[month-1]}_{year}.pdf"
+        
+        return send_file(
+            pdf_buffer,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=filename
+        )
+    except Exception as e:
+        flash(f'Erreur lors de la génération du PDF: {str(e)}', 'danger')
+        return redirect(url_for('admin.admin_dashboard'))
+
+# Export en flux des disponibilités / sets sur une période (voir export.py)
+@admin_bp.route('/admin/api/export')
+@login_required
+def admin_api_export():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    kind = request.args.get('kind', 'assignments')
+    fmt = request.args.get('format', 'ndjson')
+    if kind not in EXPORT_KINDS:
+        return jsonify({'success': False, 'error': f"kind invalide (attendu : {', '.join(EXPORT_KINDS)})"}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': f"format invalide (attendu : {', '.join(EXPORT_FORMATS)})"}), 400
+
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates attendues au format AAAA-MM-JJ'}), 400
+    if start and end and start > end:
+        return jsonify({'success': False, 'error': 'from doit précéder to'}), 400
+
+    filename = f"{kind}_{start or 'debut'}_{end or 'fin'}.{fmt}"
+    return Response(
+        stream_with_context(export_stream(kind, fmt, start, end)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+# Import CSV des DJs ou des disponibilités (voir csv_import.py), dry_run=1 pour simuler
+@admin_bp.route('/admin/api/import', methods=['POST'])
+@login_required
+def admin_api_import():
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'success': False, 'error': 'Fichier CSV manquant'}), 400
+    kind = request.form.get('kind', '')
+    dry_run = request.form.get('dry_run', '').lower() in ('1', 'true', 'on')
+
+    lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    try:
+        report = import_csv(kind, lines, dry_run=dry_run)
+    except ImportFileError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'error': 'Fichier non UTF-8 (les lots précédents sont importés)'}), 400
+
+    logger.info("Import CSV %s%s : %d créées, %d mises à jour, %d rejetées", kind, ' (simulation)' if dry_run else '',
+                report['created'], report['updated'], report['rejected'], extra={'elapsed_ms': report['elapsed_ms']})
+    return jsonify({'success': True, **report})
+
+# Route profils cProfile des routes admin (voir profiling.py)
+@admin_bp.route('/admin/profiles')
+@login_required
+def admin_profiles():
+    if not current_user.is_admin:
+        flash('Accès refusé.', 'danger')
+        return redirect(url_for('dj.dj_dashboard'))
+
+    limit = request.args.get('limit', type=int, default=20)
+    directory = profile_dir()
+
+    return render_template('admin/profiles.html',
+                         summaries=route_summaries(directory, limit=limit),
+                         profiles=list_profiles(directory)[:50],
+                         sample_rate=current_app.config.get('PROFILE_SAMPLE_RATE', 0),
+                         limit=limit)
+
+# Route téléchargement d'un profil brut (python -m pstats, snakeviz)
+@admin_bp.route('/admin/profiles/<name>')
+@login_required
+def admin_profile_download(name):
+    if not current_user.is_admin:
+        flash('Accès refusé.', 'danger')
+        return redirect(url_for('dj.dj_dashboard'))
+
+    if name not in {p['name'] for p in list_profiles(profile_dir())}:
+        return jsonify({'error': 'Profil introuvable'}), 404
+    return send_file(os.path.join(profile_dir(), name), mimetype='application/octet-stream',
+                     as_attachment=True, download_name=name)
@@ -0,0 +1,135 @@
+"""Authentification : connexion, inscription, déconnexion"""
+import logging
+from urllib.parse import urlsplit
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+
+from models import db, User
+from passwords import PasswordHashBusy, needs_rehash
+from user_cache import invalidate_user
+from logs import AUTH_LOGGER
+
+# Connexions : aussi écrites dans AUTH_LOG_FILE (fail2ban), voir logs.py
+auth_logger = logging.getLogger(AUTH_LOGGER)
+
+auth_bp = Blueprint('auth', __name__)
+
+# Routes principales
+@auth_bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        if current_user.is_admin:
+            return redirect(url_for('admin.admin_dashboard'))
+        else:
+            return redirect(url_for('dj.dj_dashboard'))
+    return redirect(url_for('auth.login'))
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        if current_user.is_admin:
+            return redirect(url_for('admin.admin_dashboard'))
+        return redirect(url_for('dj.dj_dashboard'))
+    
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        
+        user = User.query.filter_by(username=username).first()
+        
+        try:
+            password_ok = user is not None and user.check_password(password)
+        except PasswordHashBusy as e:
+            auth_logger.warning(f'Login refused, password hashing saturated: {request.remote_addr}')
+            flash(str(e), 'warning')
+            return render_template('auth/login.html'), 503
+        
+        if password_ok:
+            # Hash ancien (méthode ou paramètres changés) : recalculé avec PASSWORD_HASH_METHOD
+            if needs_rehash(user.password_hash):
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                    invalidate_user(user.id)
+                except PasswordHashBusy:
+                    pass  # Ce sera pour la prochaine connexion
+            
+            if not user.is_active:
+                flash('Votre compte est en attente d\'activation par l\'administrateur.', 'warning')
+                auth_logger.warning(f'Login attempt for inactive user: {username} from {request.remote_addr}')
+                return redirect(url_for('auth.login'))
+            
+            login_user(user, remember=True)
+            auth_logger.info(f'Successful login: {username} from {request.remote_addr}')
+            
+            next_page = request.args.get('next')
+            if not next_page or urlsplit(next_page).netloc != '':
+                next_page = url_for('admin.admin_dashboard') if user.is_admin else url_for('dj.dj_dashboard')
+            return redirect(next_page)
+        
+        # ⚠️ LOGGER L'ÉCHEC POUR FAIL2BAN
+        auth_logger.warning(f'Login failed for user: {request.remote_addr}')
+        flash('Nom d\'utilisateur ou mot de passe incorrect', 'danger')
+    
+    return render_template('auth/login.html')
+# Route inscription GET
+@auth_bp.route('/register', methods=['GET'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.index'))
+    return render_template('auth/register.html')
+
+# Route inscription POST
+@auth_bp.route('/register', methods=['POST'])
+def do_register():
+    dj_name = request.form.get('dj_name')
+    username = request.form.get('username')
+    email = request.form.get('email')
+    phone = request.form.get('phone')
+    password = request.form.get('password')
+    password_confirm = request.form.get('password_confirm')
+    
+    # Validation
+    if password != password_confirm:
+        flash('Les mots de passe ne correspondent pas.', 'danger')
+        return redirect(url_for('auth.register'))
+    
+    if User.query.filter_by(username=username).first():
+        flash('Ce nom d\'utilisateur existe déjà.', 'danger')
+        return redirect(url_for('auth.register'))
+    
+    if User.query.filter_by(email=email).first():
+        flash('Cet email existe déjà.', 'danger')
+        return redirect(url_for('auth.register'))
+    
+    try:
+        # Créer le compte INACTIF (en attente de validation)
+        new_dj = User(
+            username=username,
+            email=email,
+            dj_name=dj_name,
+            phone=phone,
+            is_admin=False,
+            is_active=False
+        )
+        new_dj.set_password(password)
+        
+        db.session.add(new_dj)
+        db.session.commit()
+        
+        flash('Inscription réussie ! Votre compte sera activé par l\'administrateur.', 'success')
+        return redirect(url_for('auth.login'))
+        
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur lors de l\'inscription: {str(e)}', 'danger')
+        return redirect(url_for('auth.register'))
+
+@auth_bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Déconnexion réussie.', 'success')
+    return redirect(url_for('auth.login'))
+
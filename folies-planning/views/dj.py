@@ -0,0 +1,201 @@
+"""Espace DJ : dashboard et disponibilités"""
+from datetime import datetime, date
+import calendar as cal
+
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, Response, abort, stream_with_context
+from flask_login import login_required, current_user
+
+from models import db, User, Availability, Assignment, TimeSlot
+from changelog import record_availability
+from stats import apply_availability, month_stats, set_counts
+from ics import feed_version, feed_etag, cached_feed, stream_and_cache
+from compression import etag_variants
+
+dj_bp = Blueprint('dj', __name__)
+
+# Helper function pour générer le calendrier
+def generate_calendar(year, month, user_id):
+    today = date.today()
+    
+    # Obtenir le calendrier du mois
+    month_calendar = cal.monthcalendar(year, month)
+    
+    # Récupérer les disponibilités de l'utilisateur
+    availabilities = Availability.query.filter_by(user_id=user_id).filter(
+        db.extract('month', Availability.date) == month,
+        db.extract('year', Availability.date) == year
+    ).all()
+    
+    avail_dict = {a.date: a for a in availabilities}
+    
+    # Récupérer les assignments
+    assignments = Assignment.query.filter_by(user_id=user_id).filter(
+        db.extract('month', Assignment.date) == month,
+        db.extract('year', Assignment.date) == year
+    ).all()
+    
+    assign_dict = {a.date: a for a in assignments}
+    
+    # Construire les données du calendrier
+    calendar_data = []
+    for week in month_calendar:
+        week_data = []
+        for day in week:
+            if day == 0:
+                week_data.append(None)
+            else:
+                day_date = date(year, month, day)
+                is_past = day_date < today
+                is_assigned = day_date in assign_dict
+                
+                availability = avail_dict.get(day_date)
+                is_available = availability.is_available if availability else False
+                time_slot = availability.time_slot if availability and availability.time_slot else TimeSlot.COMPLETE
+                
+                status = 'past' if is_past else ('assigned' if is_assigned else ('available' if is_available else 'unavailable'))
+                
+                week_data.append({
+                    'day': day,
+                    'date': day_date.isoformat(),
+                    'is_available': is_available,
+                    'time_slot': time_slot,
+                    'is_assigned': is_assigned,
+                    'is_past': is_past,
+                    'status': status
+                })
+        calendar_data.append(week_data)
+    
+    return calendar_data
+
+# Routes DJ
+@dj_bp.route('/dj/dashboard')
+@login_required
+def dj_dashboard():
+    if current_user.is_admin:
+        return redirect(url_for('admin.admin_dashboard'))
+    
+    # Paramètres de date
+    month = request.args.get('month', type=int, default=datetime.now().month)
+    year = request.args.get('year', type=int, default=datetime.now().year)
+    
+    # Stats
+    today = date.today()
+    
+    month_row = month_stats(year, month, user_id=current_user.id).get(current_user.id)
+    disponibilites = month_row.availability_days if month_row else 0
+    
+    assignments = set_counts(today, user_id=current_user.id).get(current_user.id, (0, 0))[1]
+    
+    upcoming_sets = Assignment.query.filter_by(user_id=current_user.id).filter(
+        Assignment.date >= today
+    ).order_by(Assignment.date).limit(5).all()
+    
+    stats = {
+        'disponibilites': disponibilites,
+        'assignments': assignments,
+        'prochains_sets': len(upcoming_sets)
+    }
+    
+    # Calendrier
+    calendar_data = generate_calendar(year, month, current_user.id)
+    
+    months = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+              'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+    
+    # Lien d'abonnement au flux ICS (token attribué à la création du compte, voir models.new_ics_token)
+    ics_url = url_for('dj.dj_sets_ics', token=current_user.ics_token, _external=True) if current_user.ics_token else None
+    
+    return render_template('dj/dashboard.html',
+                         stats=stats,
+                         calendar_data=calendar_data,
+                         upcoming_sets=upcoming_sets,
+                         ics_url=ics_url,
+                         current_month=month,
+                         current_year=year,
+                         months=months,
+                         today=today)
+
+@dj_bp.route('/dj/toggle-availability', methods=['POST'])
+@login_required
+def toggle_availability():
+    if current_user.is_admin:
+        return jsonify({'success': False, 'error': 'Admin ne peut pas modifier les disponibilités'})
+    
+    data = request.get_json()
+    date_str = data.get('date')
+    is_available = data.get('is_available')
+    
+    try:
+        time_slot = TimeSlot.parse(data.get('time_slot', 'complete'))
+        day_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        
+        # Vérifier que ce n'est pas une date passée
+        if day_date < date.today():
+            return jsonify({'success': False, 'error': 'Cannot modify past dates'})
+        
+        # Vérifier qu'il n'y a pas d'assignment
+        existing_assignment = Assignment.query.filter_by(
+            user_id=current_user.id,
+            date=day_date
+        ).first()
+        
+        if existing_assignment:
+            return jsonify({'success': False, 'error': 'Date already assigned'})
+        
+        # Créer ou mettre à jour la disponibilité
+        availability = Availability.query.filter_by(
+            user_id=current_user.id,
+            date=day_date
+        ).first()
+        
+        if availability:
+            apply_availability(current_user.id, day_date, int(bool(is_available)) - int(bool(availability.is_available)))
+            availability.is_available = is_available
+            availability.time_slot = time_slot if is_available else None
+            availability.updated_at = datetime.utcnow()
+            record_availability(availability, 'updated')
+        else:
+            availability = Availability(
+                user_id=current_user.id,
+                date=day_date,
+                is_available=is_available,
+                time_slot=time_slot if is_available else None
+            )
+            db.session.add(availability)
+            db.session.flush()
+            apply_availability(current_user.id, day_date, int(bool(is_available)))
+            record_availability(availability, 'created')
+        
+        db.session.commit()
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)})
+
+
+# Flux iCalendar des sets (sans login : le token fait office de secret)
+@dj_bp.route('/dj/<token>/sets.ics')
+def dj_sets_ics(token):
+    user = User.query.filter_by(ics_token=token, is_active=True).first()
+    if not user or user.is_admin:
+        abort(404)
+    
+    version = feed_version(user.id)
+    etag = feed_etag(user.id, version)
+    # Le client renvoie l'ETag reçu, suffixé si la réponse était compressée
+    matched = next((tag for tag in etag_variants(etag) if request.if_none_match.contains(tag)), None)
+    if matched:
+        response = Response(status=304)
+        etag = matched
+    else:
+        body = cached_feed(user.id, version)
+        if body is None:
+            body = stream_with_context(stream_and_cache(user, version))
+        response = Response(body, mimetype='text/calendar')
+        response.headers['Content-Disposition'] = 'inline; filename="sets.ics"'
+    
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
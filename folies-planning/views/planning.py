@@ -0,0 +1,81 @@
+"""Planning mensuel en lecture seule"""
+from datetime import timedelta
+
+from flask import Blueprint, render_template, request
+from flask_login import login_required
+
+from models import Assignment
+
+planning_bp = Blueprint('planning', __name__)
+
+@planning_bp.route('/planning-mensuel')
+@login_required
+def planning_mensuel():
+    """Planning mensuel en lecture seule pour les DJs"""
+    from datetime import datetime, date as date_obj
+    from calendar import monthrange
+
+    # Récupérer le mois demandé (ou mois actuel)
+    year = request.args.get('year', datetime.now().year, type=int)
+    month = request.args.get('month', datetime.now().month, type=int)
+
+    # Calculer les dates du mois (utiliser date, pas datetime, pour matcher le type db.Date)
+    first_day = date_obj(year, month, 1)
+    last_day_num = monthrange(year, month)[1]
+    last_day = date_obj(year, month, last_day_num)
+    
+    # Récupérer UNIQUEMENT les assignments (pas les disponibilités)
+    assignments = Assignment.query.filter(
+        Assignment.date >= first_day,
+        Assignment.date <= last_day
+    ).order_by(Assignment.date, Assignment.time_slot).all()
+    
+    # Organiser par date
+    planning_by_date = {}
+    current_date = first_day
+    while current_date <= last_day:
+        date_str = current_date.strftime('%Y-%m-%d')
+        day_assignments = [a for a in assignments if a.date == current_date]
+        planning_by_date[date_str] = {
+            'date': current_date,
+            'assignments': day_assignments,
+            'day_name': current_date.strftime('%A'),
+            'is_weekend': current_date.weekday() in [3, 4, 5]  # Jeu/Ven/Sam
+        }
+        current_date = current_date + timedelta(days=1)
+
+    # Organiser par semaines (lundi = début de semaine)
+    weeks = []
+    current_date = first_day
+    # Remplir les jours vides avant le 1er du mois
+    first_weekday = first_day.weekday()  # 0=lundi
+    current_week = [None] * first_weekday
+
+    while current_date <= last_day:
+        date_str = current_date.strftime('%Y-%m-%d')
+        current_week.append(planning_by_date[date_str])
+        if len(current_week) == 7:
+            weeks.append(current_week)
+            current_week = []
+        current_date = current_date + timedelta(days=1)
+
+    # Remplir les jours vides après la fin du mois
+    if current_week:
+        while len(current_week) < 7:
+            current_week.append(None)
+        weeks.append(current_week)
+
+    # Mois suivant/précédent
+    prev_month = month - 1 if month > 1 else 12
+    prev_year = year if month > 1 else year - 1
+    next_month = month + 1 if month < 12 else 1
+    next_year = year if month < 12 else year + 1
+    
+    return render_template('planning_mensuel.html',
+                         planning_by_date=planning_by_date,
+                         weeks=weeks,
+                         current_month=datetime(year, month, 1),
+                         prev_month=prev_month,
+                         prev_year=prev_year,
+                         next_month=next_month,
+                         next_year=next_year)